@@ -61,6 +61,57 @@ defmodule Resolvinator.Messages do
     |> Repo.all()
   end
 
+  @doc """
+  Lists one page of the conversation between two users, oldest first.
+
+  Pages run newest first on (inserted_at, id): pass the id of the oldest
+  message already loaded as `:before` to get the page preceding it. An
+  unknown `:before` id gives an empty page.
+
+  Options:
+    * :before - Only messages older than the message with this id
+    * :limit - Maximum number of results (default: 200, at most 1000)
+  """
+  def list_conversation(user_id, peer_id, opts \\ []) do
+    limit = opts |> Keyword.get(:limit, 200) |> min(1000)
+
+    query =
+      from m in Message,
+        where:
+          (m.from_user_id == ^user_id and m.to_user_id == ^peer_id) or
+            (m.from_user_id == ^peer_id and m.to_user_id == ^user_id),
+        order_by: [desc: m.inserted_at, desc: m.id],
+        limit: ^limit
+
+    case before_cursor(opts[:before]) do
+      :error ->
+        []
+
+      cursor ->
+        query
+        |> older_than(cursor)
+        |> Repo.all()
+        |> Enum.reverse()
+    end
+  end
+
+  defp before_cursor(nil), do: nil
+
+  defp before_cursor(id) do
+    with {:ok, id} <- Ecto.UUID.cast(id),
+         %Message{} = message <- Repo.get(Message, id) do
+      message
+    else
+      _ -> :error
+    end
+  end
+
+  defp older_than(query, nil), do: query
+
+  defp older_than(query, %Message{inserted_at: inserted_at, id: id}) do
+    where(query, [m], m.inserted_at < ^inserted_at or (m.inserted_at == ^inserted_at and m.id < ^id))
+  end
+
   @doc """
   Lists unread messages for a specific user.
   """
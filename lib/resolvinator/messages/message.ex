@@ -2,18 +2,23 @@ defmodule Resolvinator.Messages.Message do
   use Ecto.Schema
   import Ecto.Changeset
 
+  @primary_key {:id, :binary_id, autogenerate: true}
+  @foreign_key_type :binary_id
+
   schema "messages" do
     field :content, :string
-    field :from_user_id, :integer
-    field :to_user_id, :integer
+    field :from_user_id, :binary_id
+    field :to_user_id, :binary_id
     field :read, :boolean, default: false
+    # Whether content is client-side ciphertext the server can't read
+    field :encrypted, :boolean, default: false
 
-    timestamps()
+    timestamps(type: :utc_datetime)
   end
 
   def changeset(message, attrs) do
     message
-    |> cast(attrs, [:content, :from_user_id, :to_user_id])
+    |> cast(attrs, [:content, :from_user_id, :to_user_id, :read, :encrypted])
     |> validate_required([:content, :from_user_id, :to_user_id])
   end
-end 
\ No newline at end of file
+end
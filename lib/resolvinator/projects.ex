@@ -150,6 +150,32 @@ defmodule Resolvinator.Projects do
     Repo.get_by(Project, name: name)
   end
 
+  @doc """
+  Returns true if the user may read the project, which today means they
+  created it. Ids that aren't UUIDs are never allowed.
+
+  ## Examples
+
+      iex> can_access?(project_id, creator_id)
+      true
+
+      iex> can_access?(project_id, other_user_id)
+      false
+
+  """
+  def can_access?(project_id, user_id) do
+    with {:ok, project_id} <- Ecto.UUID.cast(project_id),
+         {:ok, user_id} <- Ecto.UUID.cast(user_id) do
+      # creator_id is a column but not a schema field, so query the table
+      from(p in "projects",
+        where: p.id == type(^project_id, :binary_id) and p.creator_id == type(^user_id, :binary_id)
+      )
+      |> Repo.exists?()
+    else
+      :error -> false
+    end
+  end
+
   @doc """
   Claims ownership of a project for a user.
 
@@ -576,6 +576,38 @@ defmodule Resolvinator.Risks do
     {results, page_info}
   end
 
+  @doc """
+  Lists a project's risks changed at or after `since`, oldest first, for
+  clients resyncing after a reconnect. Bypasses the cache, which could
+  hand back a list older than `since`.
+  """
+  def list_risks_changed_since(project_id, %DateTime{} = since) do
+    Risk
+    |> where([r], r.project_id == ^project_id and r.updated_at >= ^since)
+    |> order_by([r], asc: r.updated_at)
+    |> Repo.all()
+  end
+
+  @doc """
+  Lists the ids of every risk in a project, so clients can drop the ones
+  deleted while they were offline.
+  """
+  def list_project_risk_ids(project_id) do
+    Risk
+    |> where([r], r.project_id == ^project_id)
+    |> select([r], r.id)
+    |> Repo.all()
+  end
+
+  @doc """
+  Lists every risk in a project, unpaginated, as a resync snapshot.
+  """
+  def list_all_project_risks(project_id) do
+    Risk
+    |> where([r], r.project_id == ^project_id)
+    |> Repo.all()
+  end
+
   @doc """
   Gets a project risk with caching support.
   """
@@ -0,0 +1,26 @@
+defmodule ResolvinatorWeb.CompressedPayload do
+  @moduledoc """
+  zlib-compressed JSON payloads carried in Phoenix V2 binary frames.
+
+  Clients whose transport cannot negotiate permessage-deflate (QWebSocket)
+  push large payloads as `{:binary, "zlib:" <> deflated_json}`. Channels
+  decode those with `decode/1` in `handle_in/3`, and can push large payloads
+  back in the same format with `push(socket, event, encode(payload))`.
+  """
+
+  @prefix "zlib:"
+  @default_threshold 16_384
+
+  def encode(payload, threshold \\ @default_threshold) do
+    json = Jason.encode!(payload)
+
+    if byte_size(json) > threshold do
+      {:binary, @prefix <> :zlib.compress(json)}
+    else
+      payload
+    end
+  end
+
+  def decode({:binary, @prefix <> data}), do: Jason.decode(:zlib.uncompress(data))
+  def decode(payload), do: {:ok, payload}
+end
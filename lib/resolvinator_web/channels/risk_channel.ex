@@ -0,0 +1,78 @@
+defmodule ResolvinatorWeb.RiskChannel do
+  use ResolvinatorWeb, :channel
+  alias Resolvinator.{Projects, Risks}
+  require Logger
+
+  # Clients rejoin with the newest version they hold as "since" and get back
+  # only the risks changed after it, plus the ids that still exist; without
+  # a usable "since" they get the full list. Versions are updated_at stamps.
+  @impl true
+  def join("risks:" <> project_id, params, socket) do
+    case Ecto.UUID.cast(project_id) do
+      {:ok, project_id} ->
+        if authorized?(socket, project_id) do
+          {:ok, sync_reply(project_id, params), assign(socket, :project_id, project_id)}
+        else
+          {:error, %{reason: "unauthorized"}}
+        end
+      :error ->
+        {:error, %{reason: "invalid project"}}
+    end
+  end
+
+  # Broadcast by Resolvinator.Risks on every create, update and delete
+  @impl true
+  def handle_info({[:risk, action], risk}, socket) do
+    push(socket, "risk:#{action}", risk_entry(risk))
+    {:noreply, socket}
+  end
+
+  def handle_info(_message, socket), do: {:noreply, socket}
+
+  defp sync_reply(project_id, params) do
+    # Taken before querying so nothing changed mid-reply is skipped next time
+    version = DateTime.utc_now() |> DateTime.truncate(:second) |> DateTime.to_iso8601()
+
+    section =
+      case parse_since(params["since"]) do
+        {:ok, since} ->
+          %{
+            changes: project_id |> Risks.list_risks_changed_since(since) |> Enum.map(&risk_entry/1),
+            ids: Risks.list_project_risk_ids(project_id)
+          }
+        :error ->
+          %{snapshot: project_id |> Risks.list_all_project_risks() |> Enum.map(&risk_entry/1)}
+      end
+
+    %{version: version, risk: section}
+  end
+
+  defp authorized?(socket, project_id) do
+    Projects.can_access?(project_id, socket.assigns.user_id)
+  end
+
+  defp parse_since(since) when is_binary(since) do
+    case DateTime.from_iso8601(since) do
+      {:ok, datetime, _offset} -> {:ok, datetime}
+      {:error, reason} ->
+        Logger.debug("Ignoring unusable since #{inspect(since)}: #{reason}")
+        :error
+    end
+  end
+  defp parse_since(_), do: :error
+
+  defp risk_entry(risk) do
+    %{
+      id: risk.id,
+      project_id: risk.project_id,
+      category_id: risk.category_id,
+      title: risk.title,
+      description: risk.description,
+      status: risk.status,
+      probability: risk.probability,
+      impact_level: risk.impact_level,
+      risk_score: risk.risk_score,
+      updated_at: DateTime.to_iso8601(risk.updated_at)
+    }
+  end
+end
@@ -28,9 +28,9 @@ defmodule ResolvinatorWeb.UserChannel do
   end
 
   @impl true
-  def handle_in("new_message", %{"recipient_id" => recipient_id, "content" => content}, socket) do
+  def handle_in("new_message", %{"recipient_id" => recipient_id, "content" => content} = params, socket) do
     with :ok <- validate_rate_limit(socket, "new_message"),
-         {:ok, message} <- create_message(socket, recipient_id, content) do
+         {:ok, message} <- create_message(socket, recipient_id, content, params["encrypted"] == true) do
       
       # Broadcast to specific user's channel
       PubSub.broadcast(
@@ -46,8 +46,34 @@ defmodule ResolvinatorWeb.UserChannel do
     end
   end
 
+  @impl true
+  def handle_in("history", %{"peer_id" => peer_id} = params, socket) do
+    opts =
+      [before: params["before"], limit: params["limit"]]
+      |> Enum.reject(fn {_key, value} -> is_nil(value) end)
+
+    messages =
+      socket.assigns.user_id
+      |> Resolvinator.Messages.list_conversation(peer_id, opts)
+      |> Enum.map(&history_entry/1)
+
+    {:reply, {:ok, %{messages: messages}}, socket}
+  end
+
+  defp history_entry(message) do
+    %{
+      id: message.id,
+      content: message.content,
+      from_user_id: message.from_user_id,
+      to_user_id: message.to_user_id,
+      read: message.read,
+      encrypted: message.encrypted,
+      created_at: DateTime.to_iso8601(message.inserted_at)
+    }
+  end
+
   defp authorized?(socket, user_id) do
-    String.to_integer(user_id) == socket.assigns.user_id
+    user_id == to_string(socket.assigns.user_id)
   end
 
   @rate_limits %{
@@ -66,12 +92,13 @@ defmodule ResolvinatorWeb.UserChannel do
     end
   end
 
-  defp create_message(socket, recipient_id, content) do
+  defp create_message(socket, recipient_id, content, encrypted) do
     # Assuming you have a Messages context
     %{
       from_user_id: socket.assigns.user_id,
-      to_user_id: String.to_integer(recipient_id),
+      to_user_id: recipient_id,
       content: content,
+      encrypted: encrypted,
       inserted_at: DateTime.utc_now()
     }
     |> then(&{:ok, &1})  # Simulate successful creation for now
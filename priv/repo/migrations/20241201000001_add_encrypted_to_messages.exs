@@ -0,0 +1,12 @@
+defmodule Resolvinator.Repo.Migrations.AddEncryptedToMessages do
+  use Ecto.Migration
+
+  def change do
+    alter table(:messages) do
+      add :encrypted, :boolean, default: false, null: false
+    end
+
+    # Conversation history is paged newest first on (inserted_at, id)
+    create index(:messages, [:from_user_id, :to_user_id, :inserted_at, :id])
+  end
+end
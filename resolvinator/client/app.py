@@ -1,28 +1,57 @@
+from .startup import StartupTimer
+
+# Started before anything heavy is imported
+startup = StartupTimer()
+
 from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QDockWidget
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QStandardPaths, QSettings
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional
+import argparse
+import os
 import signal
 import sys
 import logging
-from .websocket_client import WebSocketClient, WebSocketState
+from .websocket_client3 import WebSocketState
+from .connection_manager import ConnectionManager
 from .event_manager import EventManager, SystemEvent, EventPriority
-from .notification_manager import NotificationManager, NotificationType, NotificationPriority
-from .notification_center import NotificationCenter
-from .messaging_client import MessagingClient, Message
+from .events import NotificationType, NotificationPriority
+
+# Messaging (cryptography, SQLite) and the notification widgets load after
+# the window is up and connecting; see MainWindow.load_optional
+if TYPE_CHECKING:
+    from .messaging_client import MessagingClient, Message
+    from .notification_manager import NotificationManager
+    from .notification_center import NotificationCenter
+
+startup.mark("imported")
+
+logger = logging.getLogger(__name__)
+
+def load_setting(key: str, env: str, default: str = "") -> str:
+    """A setting from the environment, else the app's QSettings"""
+    return os.environ.get(env) or str(QSettings("Resolvinator", "Resolvinator").value(key, default))
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.event_manager = EventManager()
-        self.ws_client = WebSocketClient(
-            base_url="ws://localhost:4000",
-            token="your_auth_token"
+        # The message key is stored with the auth token; messaging stays off without it
+        self.encryption_key = load_setting("auth/message_key", "RESOLVINATOR_MESSAGE_KEY")
+        # One socket per server, shared by the window and the messaging client
+        self.connections = ConnectionManager(
+            base_url=load_setting("server/url", "RESOLVINATOR_URL", "ws://localhost:4000"),
+            token=load_setting("auth/token", "RESOLVINATOR_TOKEN", "your_auth_token"),
+            event_manager=self.event_manager
         )
-        
-        # Add messaging client initialization
-        self.messaging_client = MessagingClient(self.event_manager, user_id=1)  # Replace 1 with actual user_id
-        self.messaging_client.message_received.connect(self.handle_new_message)
-        self.messaging_client.user_presence_changed.connect(self.handle_presence_change)
-        
+        self.ws_client = self.connections.client()
+        self.user_id = 1  # Replace 1 with actual user_id
+
+        # Loaded by load_optional once the window is showing
+        self.messaging_client: Optional["MessagingClient"] = None
+        self.notification_manager: Optional["NotificationManager"] = None
+        self.notification_center: Optional["NotificationCenter"] = None
+
         # Connect event manager signals
         self.event_manager.system_event.connect(self.handle_system_event)
         self.event_manager.news_broadcast.connect(self.handle_news_broadcast)
@@ -32,11 +61,33 @@ class MainWindow(QMainWindow):
         self.ws_client.connected.connect(self.on_ws_connected)
         self.ws_client.disconnected.connect(self.on_ws_disconnected)
         self.ws_client.error.connect(self.on_ws_error)
-        
+
+        # Setup UI
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Resolvinator")
+        self.status_bar = self.statusBar()
+
+    def start(self):
+        """Connect now, and load the optional subsystems on the next event-loop tick"""
+        self.connections.connect_all()
+        startup.mark("connecting")
+        QTimer.singleShot(0, self.load_optional)
+
+    def load_optional(self):
+        """Import and build messaging and notifications, which the first paint doesn't need"""
+        if self.notification_manager is not None:
+            return
+        from .message_store import MessageStore
+        from .messaging_client import MessagingClient
+        from .notification_center import NotificationCenter
+        from .notification_manager import NotificationManager
+
         # Initialize notification system
         self.notification_manager = NotificationManager()
         self.notification_center = NotificationCenter()
-        
+
         # Connect notification signals
         self.notification_manager.notification_added.connect(
             self.notification_center.add_notification
@@ -44,20 +95,36 @@ class MainWindow(QMainWindow):
         self.notification_manager.notification_removed.connect(
             self.notification_center.remove_notification
         )
+        self.notification_center.action_triggered.connect(self.handle_notification_action)
 
         # Add notification center to a dock widget
         dock = QDockWidget("Notifications", self)
         dock.setWidget(self.notification_center)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
-        
-        # Setup UI
-        self.setup_ui()
-        
-        # Start connection
-        self.ws_client.connect_to_server()
+
+        if not self.encryption_key:
+            logger.warning("No message key configured (auth/message_key); messaging is disabled")
+            startup.mark("ready")
+            return
+
+        # Messaging joins the already-connecting shared socket
+        data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+        os.makedirs(data_dir, exist_ok=True)
+        self.messaging_client = MessagingClient(
+            self.event_manager, user_id=self.user_id, encryption_key=self.encryption_key,
+            connections=self.connections,
+            store=MessageStore(os.path.join(data_dir, f"messages-{self.user_id}.db"), user_id=self.user_id)
+        )
+        self.messaging_client.message_received.connect(self.handle_new_message)
+        self.messaging_client.presence_changed.connect(self.handle_presence_change)
+        self.messaging_client.connect()
+        startup.mark("ready")
 
     def handle_system_event(self, event: SystemEvent, data: dict):
         """Handle system-wide events"""
+        if self.notification_manager is None:
+            # Beat load_optional to it; notifications are needed now
+            self.load_optional()
         if event == SystemEvent.RESTART_REQUESTED:
             self.prepare_for_restart(data.get("reason", ""))
         elif event == SystemEvent.MAINTENANCE_STARTED:
@@ -90,15 +157,44 @@ class MainWindow(QMainWindow):
                 action="Log In"
             )
 
+    def on_ws_connected(self):
+        self.status_bar.showMessage("Connected", 3000)
+
+    def on_ws_disconnected(self):
+        self.status_bar.showMessage("Disconnected, reconnecting...")
+
+    def on_ws_error(self, error: str):
+        logger.error(f"WebSocket error: {error}")
+        self.status_bar.showMessage(f"Connection error: {error}", 5000)
+
+    def handle_maintenance_mode(self, active: bool):
+        """Show maintenance in the status bar; the socket reconnects by itself afterwards"""
+        if active:
+            self.status_bar.showMessage("Server maintenance in progress")
+        else:
+            self.status_bar.showMessage("Server maintenance finished", 5000)
+
+    def save_application_state(self):
+        """Persist the window layout for the restarted instance"""
+        settings = QSettings("Resolvinator", "Resolvinator")
+        settings.setValue("window/geometry", self.saveGeometry())
+        settings.setValue("window/state", self.saveState())
+
     def handle_news_broadcast(self, title: str, message: str, priority: EventPriority):
         """Handle news broadcasts"""
         if priority == EventPriority.CRITICAL:
-            QMessageBox.critical(self, title, message)
+            self.show_news_box(QMessageBox.Icon.Critical, title, message)
         elif priority == EventPriority.HIGH:
-            QMessageBox.warning(self, title, message)
+            self.show_news_box(QMessageBox.Icon.Warning, title, message)
         else:
             self.status_bar.showMessage(f"{title}: {message}", 5000)
 
+    def show_news_box(self, icon: QMessageBox.Icon, title: str, message: str):
+        """A modal box showing server text as plain text; QMessageBox would render anything that looks like HTML"""
+        box = QMessageBox(icon, title, message, QMessageBox.StandardButton.Ok, self)
+        box.setTextFormat(Qt.TextFormat.PlainText)
+        box.exec()
+
     def handle_operation_interrupt(self):
         """Handle interrupted operations"""
         self.status_bar.showMessage("Operations interrupted", 3000)
@@ -110,7 +206,7 @@ class MainWindow(QMainWindow):
         self.save_application_state()
         
         # Disconnect from WebSocket
-        self.ws_client.disconnect()
+        self.connections.disconnect_all()
         
         # Show restart message
         QMessageBox.information(
@@ -142,11 +238,15 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.No:
                 event.ignore()
                 return
+            # Cancel whatever is still running, waiting at most the drain budget
+            self.event_manager.drain_operations(reason="closing")
 
-        self.ws_client.disconnect()
+        if self.messaging_client is not None:
+            self.messaging_client.close()
+        self.connections.disconnect_all()
         event.accept()
 
-    def handle_new_message(self, message: Message):
+    def handle_new_message(self, message: "Message"):
         """Handle incoming messages"""
         self.notification_manager.add_notification(
             type=NotificationType.USER,
@@ -155,10 +255,24 @@ class MainWindow(QMainWindow):
             message=f"From {message.from_user_id}: {message.content}"
         )
 
-    def handle_presence_change(self, user_id: int, is_online: bool):
+    def handle_notification_action(self, notification_id: str, action: str):
+        """An action button was clicked; the notification has served its purpose"""
+        self.status_bar.showMessage(action, 3000)
+        self.notification_manager.remove_notification(notification_id)
+
+    def handle_presence_change(self, joined: list, left: list):
         """Handle user presence updates"""
-        status = "online" if is_online else "offline"
-        self.status_bar.showMessage(f"User {user_id} is now {status}", 3000)
+        if len(joined) + len(left) == 1:
+            user_id, status = (joined[0], "online") if joined else (left[0], "offline")
+            self.status_bar.showMessage(f"User {user_id} is now {status}", 3000)
+        else:
+            self.status_bar.showMessage(f"{len(joined)} users came online, {len(left)} went offline", 3000)
+
+def finish_startup(options: argparse.Namespace, app: QApplication):
+    if options.startup_report:
+        print(startup.report(), flush=True)
+    if options.exit_after_startup:
+        app.quit()
 
 def main():
     # Configure logging
@@ -167,7 +281,14 @@ def main():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print the startup milestones as JSON once everything has loaded")
+    parser.add_argument("--exit-after-startup", action="store_true", help="quit once everything has loaded")
+    options, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.mark("application")
     
     # Handle system signals
     def signal_handler(signum, frame):
@@ -188,7 +309,12 @@ def main():
     
     window = MainWindow()
     window.show()
-    
+    startup.mark("window_shown")
+    window.start()
+    if options.startup_report or options.exit_after_startup:
+        # Queued after load_optional, so it sees every milestone
+        QTimer.singleShot(0, lambda: finish_startup(options, app))
+
     # Example news broadcast
     QTimer.singleShot(2000, lambda: window.event_manager.broadcast_news(
         "Welcome",
@@ -0,0 +1,81 @@
+"""A flapping connection's error broadcasts, with and without coalescing.
+
+Replays --rate identical "WebSocket Error" broadcasts a second for
+--seconds on a simulated clock, plus one critical notice a second, through
+the Coalescer EventManager uses, and counts what reaches the news_broadcast
+handlers. Then times broadcast_news() itself with coalescing off and on.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_coalesce [--rate 40] [--seconds 10] [--window 1.0]
+"""
+import argparse
+import heapq
+import logging
+
+from ..coalesce import Coalescer
+from ..event_manager import EventManager
+from ..events import EventPriority
+from .frames import measure
+
+class SimulatedTime:
+    """Clock and schedule() for Coalescer, advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+        self._timers = []
+        self._sequence = 0
+
+    def clock(self) -> float:
+        return self.now
+
+    def schedule(self, delay: float, callback):
+        self._sequence += 1
+        heapq.heappush(self._timers, (self.now + delay, self._sequence, callback))
+
+    def advance(self, to: float):
+        while self._timers and self._timers[0][0] <= to:
+            when, _, callback = heapq.heappop(self._timers)
+            self.now = when
+            callback()
+        self.now = to
+
+def replay(rate: float, seconds: float, window: float):
+    time = SimulatedTime()
+    emitted = []
+    news = Coalescer(lambda args, repeats: emitted.append(repeats), time.schedule, window, clock=time.clock)
+    critical = 0
+    for n in range(int(rate * seconds)):
+        time.advance(n / rate)
+        news.submit("WebSocket Error", ("WebSocket Error", "WebSocket error: 1 - Connection refused"), ())
+        if n % int(rate) == 0:
+            critical += 1  # CRITICAL bypasses the coalescer
+    time.advance(seconds + window)
+    return len(emitted), critical, news.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=40.0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--window", type=float, default=1.0)
+    args = parser.parse_args()
+
+    broadcasts = int(args.rate * args.seconds)
+    emitted, critical, stats = replay(args.rate, args.seconds, args.window)
+    print(f"{broadcasts:,} identical error broadcasts over {args.seconds:g}s, {args.window:g}s window")
+    print(f"{'':<10}{'emitted':>9}{'log lines':>11}{'suppressed':>12}")
+    print(f"{'before':<10}{broadcasts + critical:>9,}{broadcasts + critical:>11,}{0:>12,}")
+    print(f"{'after':<10}{emitted + critical:>9,}{emitted + critical:>11,}{stats['suppressed']:>12,}")
+    print(f"({critical} critical notices, passed straight through either way)")
+
+    logging.disable(logging.WARNING)
+    print()
+    for label, window in (("off", 0.0), ("on", args.window)):
+        manager = EventManager(coalesce_window=window)
+        manager.news_broadcast.connect(lambda title, message, priority: None)
+        seconds = measure(lambda: [manager.broadcast_news("WebSocket Error", "boom", EventPriority.HIGH)
+                                   for _ in range(10000)]) / 10000
+        print(f"broadcast_news, coalescing {label}: {seconds * 1e6:.2f} us per call")
+
+if __name__ == "__main__":
+    main()
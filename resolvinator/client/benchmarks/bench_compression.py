@@ -0,0 +1,111 @@
+"""Wire size and CPU cost of compressing Phoenix traffic on both client transports.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_compression [frames.txt]
+
+With a file argument, replays recorded text frames (one per line) instead of
+synthetic traffic. The asyncio client gets permessage-deflate from websockets,
+emulated here with raw deflate and a sync flush per message, with and without
+context takeover. The Qt client can't negotiate the extension, so it is
+measured with the serializer's zlib envelope at a few thresholds and levels.
+"""
+import sys
+import time
+import zlib
+from typing import Callable, List, Tuple
+
+from ..codec import PhoenixMessage, V2Serializer
+from .frames import risk_payload, sample_messages
+
+Stats = Tuple[int, float, float]  # wire bytes, compress seconds, decompress seconds
+
+def synthetic_frames(count: int) -> List[str]:
+    """Small risk/project updates plus the occasional bulk risk listing"""
+    serializer = V2Serializer()
+    messages = [PhoenixMessage(m["topic"], m["event"], m["payload"], None, "1")
+                for m in sample_messages(count)]
+    for i in range(0, count, 100):
+        listing = {"risks": [risk_payload(i * 1000 + n, i % 50, 600) for n in range(100)]}
+        messages.append(PhoenixMessage(f"project:{i % 50}", "risks:list", listing, str(i), "1"))
+    return [serializer.encode(m) for m in messages]
+
+def load_frames(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+def permessage_deflate(frames: List[bytes], context_takeover: bool, level: int = 6) -> Stats:
+    """RFC 7692 framing: raw deflate, sync flush, trailing 00 00 ff ff stripped"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    wire = 0
+    compressed = []
+    start = time.perf_counter()
+    for frame in frames:
+        if not context_takeover:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        compressed.append(data[:-4])
+        wire += len(data) - 4
+    compress_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for data in compressed:
+        if not context_takeover:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        decompressor.decompress(data + b"\x00\x00\xff\xff")
+    return wire, compress_time, time.perf_counter() - start
+
+def zlib_envelope(messages: List[PhoenixMessage], threshold: int, level: int) -> Stats:
+    """The Qt path: V2Serializer compresses payloads over the threshold"""
+    sender = V2Serializer(compress_threshold=threshold, compress_level=level)
+    receiver = V2Serializer()
+    start = time.perf_counter()
+    frames = [sender.encode(m) for m in messages]
+    compress_time = time.perf_counter() - start
+
+    # Only inflation is timed on the way back; JSON parsing is the same either way
+    start = time.perf_counter()
+    for frame in frames:
+        if isinstance(frame, bytes):
+            receiver._inflate(frame[frame.index(b"zlib:"):])
+    inflate_time = time.perf_counter() - start
+    wire = sum(len(f) if isinstance(f, bytes) else len(f.encode()) for f in frames)
+    return wire, compress_time, inflate_time
+
+def baseline(messages: List[PhoenixMessage]) -> Stats:
+    serializer = V2Serializer()
+    start = time.perf_counter()
+    frames = [serializer.encode(m) for m in messages]
+    return sum(len(f.encode()) for f in frames), time.perf_counter() - start, 0.0
+
+def report(label: str, stats: Stats, raw: int, count: int):
+    wire, compress_time, decompress_time = stats
+    print(f"{label:<34}{wire / count:>12,.0f}{wire / raw:>8.1%}"
+          f"{compress_time / count * 1e6:>12,.1f}{decompress_time / count * 1e6:>12,.1f}")
+
+def best(run: Callable[[], Stats], repeat: int = 3) -> Stats:
+    return min((run() for _ in range(repeat)), key=lambda s: s[1] + s[2])
+
+def main():
+    frames = load_frames(sys.argv[1]) if len(sys.argv) > 1 else synthetic_frames(10000)
+    serializer = V2Serializer()
+    messages = [serializer.decode(f) for f in frames]
+    encoded = [f.encode() for f in frames]
+    raw = sum(len(f) for f in encoded)
+    count = len(frames)
+
+    print(f"{count} frames, {raw / count:,.0f} bytes/frame uncompressed")
+    print(f"{'transport':<34}{'bytes/frame':>12}{'wire':>8}{'comp us':>12}{'decomp us':>12}")
+    report("uncompressed", best(lambda: baseline(messages)), raw, count)
+    print("asyncio (permessage-deflate)")
+    report("  context takeover", best(lambda: permessage_deflate(encoded, True)), raw, count)
+    report("  no context takeover", best(lambda: permessage_deflate(encoded, False)), raw, count)
+    print("Qt (zlib envelope)")
+    for threshold in (512, 4096, 16384):
+        for level in (1, 6):
+            report(f"  > {threshold} bytes, level {level}",
+                   best(lambda: zlib_envelope(messages, threshold, level)), raw, count)
+
+if __name__ == "__main__":
+    main()
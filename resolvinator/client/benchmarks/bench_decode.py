@@ -0,0 +1,78 @@
+"""Frames/sec through the decode path of both WebSocket clients.
+
+Checks first that every backend decodes the frames exactly as json does.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_decode [frame_count]
+"""
+import asyncio
+import logging
+import sys
+
+from ..codec import available_decoders, get_decoder
+from .check_codecs import check_decoders, EDGE_CASES
+from .frames import measure, sample_frames, unthrottled
+
+def bench_decoder(name: str, frames: list) -> float:
+    decoder = get_decoder(name)
+
+    def run():
+        for frame in frames:
+            decoder.decode(frame)
+
+    return len(frames) / measure(run)
+
+def bench_asyncio_client(name: str, frames: list) -> float:
+    from ..event_manager import EventManager
+    from ..websocket_client import WebSocketClient
+
+    client = WebSocketClient(EventManager(), "ws://localhost:4000/socket/websocket",
+                             decoder=get_decoder(name), rate_limiter=unthrottled())
+
+    async def feed():
+        for frame in frames:
+            await client.handle_message(frame)
+
+    return len(frames) / measure(lambda: asyncio.run(feed()))
+
+def bench_qt_client(name: str, frames: list) -> float:
+    from ..websocket_client3 import WebSocketClient
+
+    client = WebSocketClient("ws://localhost:4000", "bench", decoder=get_decoder(name),
+                             rate_limiter=unthrottled(), decode_in_background=False)
+
+    def run():
+        for frame in frames:
+            client._on_message(frame)
+
+    return len(frames) / measure(run)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    frames = sample_frames(count)
+    logging.disable(logging.WARNING)
+
+    # Only time backends that decode exactly what json does
+    mismatches = check_decoders(frames + EDGE_CASES)
+    if mismatches:
+        sys.exit(f"{len(mismatches)} frames decode differently from json; see check_codecs")
+
+    benches = [
+        ("decode only", bench_decoder),
+        ("asyncio WebSocketClient", bench_asyncio_client),
+        ("Qt WebSocketClient", bench_qt_client),
+    ]
+    print(f"{count} frames, avg {sum(map(len, frames)) // count} bytes")
+    print(f"{'path':<26}{'decoder':<10}{'frames/sec':>14}")
+    for label, bench in benches:
+        for name in available_decoders():
+            try:
+                rate = bench(name, frames)
+            except ImportError as e:
+                print(f"{label:<26}{name:<10}{f'skipped ({e.name})':>14}")
+                break
+            print(f"{label:<26}{name:<10}{rate:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Main-thread cost of a frame burst, decoding inline vs on the DecodeWorker.
+
+Stands in for the Qt client without needing a display: the "GUI thread" is
+the main thread, woken through a threading.Event instead of a queued signal,
+and handling a message means dispatching it through a TopicRouter.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_decode_worker [frame_count] [max_batch]
+"""
+import logging
+import sys
+import threading
+import time
+
+from ..codec import FrameValidator, get_serializer
+from ..decode_worker import DecodeWorker
+from ..router import TopicRouter
+from .frames import sample_frames, unthrottled
+
+def build_pipeline():
+    validator = FrameValidator(get_serializer("1.0.0"))
+    limiter = unthrottled()
+    router = TopicRouter()
+    router.register("risks:*", "*", lambda message: None)
+    router.register("project:*", "*", lambda message: None)
+
+    def validate(frame):
+        message = validator.validate(frame)
+        if message is not None and limiter.allow(message.topic, message.event):
+            return message
+        return None
+
+    return validate, router
+
+def run_inline(frames: list):
+    validate, router = build_pipeline()
+    wall, cpu = time.perf_counter(), time.thread_time()
+    for frame in frames:
+        router.dispatch(validate(frame))
+    return time.perf_counter() - wall, time.thread_time() - cpu, len(frames)
+
+def run_worker(frames: list, max_batch: int):
+    validate, router = build_pipeline()
+    wake = threading.Event()
+    worker = DecodeWorker(validate, wake.set)
+    worker.start()
+
+    wall, cpu = time.perf_counter(), time.thread_time()
+    for frame in frames:
+        worker.submit(frame)
+    handled = wakeups = 0
+    while handled < len(frames):
+        wake.wait()
+        wake.clear()
+        more = True
+        while more:
+            # Each pass is one event-loop tick on the GUI thread
+            batch, more = worker.take(max_batch)
+            wakeups += 1
+            for message in batch:
+                router.dispatch(message)
+            handled += len(batch)
+    result = time.perf_counter() - wall, time.thread_time() - cpu, wakeups
+    worker.stop()
+    return result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    max_batch = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    frames = sample_frames(count)
+    logging.disable(logging.WARNING)
+
+    print(f"{count} frames in one burst, max_batch={max_batch}")
+    print(f"{'path':<16}{'wall ms':>10}{'main-thread ms':>16}{'main us/frame':>15}{'GUI wake-ups':>14}")
+    for label, run in (("inline", lambda: run_inline(frames)),
+                       ("decode worker", lambda: run_worker(frames, max_batch))):
+        wall, cpu, wakeups = run()
+        print(f"{label:<16}{wall * 1000:>10,.1f}{cpu * 1000:>16,.1f}{cpu / count * 1e6:>15,.2f}{wakeups:>14,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""A storm of LOW news followed by a shutdown notice, inside a running Qt loop.
+
+Posts --events distinct LOW news broadcasts whose handler takes
+--handler-ms each, then a SHUTDOWN_REQUESTED system event, all from one
+event-loop callback. "direct" calls the handlers as they are posted, as
+EventManager used to; "dispatcher" goes through EventManager's priority
+dispatcher. Reports when the shutdown handler ran, the longest the loop
+went without running a 1 ms timer (how long the UI would freeze), and how
+long the news waited.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_dispatcher [--events 2000] [--handler-ms 0.2] [--budget-ms 4]
+"""
+import argparse
+import logging
+import sys
+import time
+
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+from ..event_manager import EventManager, SystemEvent
+from ..events import EventPriority
+
+def busy(seconds: float):
+    finish = time.perf_counter() + seconds
+    while time.perf_counter() < finish:
+        pass
+
+def run(app: QCoreApplication, direct: bool, events: int, handler: float, budget: float) -> dict:
+    manager = EventManager(dispatch_budget=budget)
+    result = {"gap": 0.0}
+    news_handled = []
+
+    manager.news_broadcast.connect(lambda title, message, priority: (busy(handler), news_handled.append(1)))
+    manager.system_event.connect(lambda event, data: result.setdefault("shutdown", time.perf_counter()))
+
+    # The loop's heartbeat: the longest stretch between ticks is the freeze
+    ticker = QTimer()
+    ticker.setInterval(1)
+    last_tick = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        result["gap"] = max(result["gap"], now - last_tick[0])
+        last_tick[0] = now
+        if len(news_handled) == events and "shutdown" in result:
+            result.setdefault("done", now)
+            ticker.stop()
+            app.quit()
+    ticker.timeout.connect(tick)
+
+    def storm():
+        result["started"] = time.perf_counter()
+        for n in range(events):
+            if direct:
+                manager.news_broadcast.emit("Digest", f"Item {n}", EventPriority.LOW)
+            else:
+                manager.broadcast_news("Digest", f"Item {n}", EventPriority.LOW)
+        if direct:
+            manager.system_event.emit(SystemEvent.SHUTDOWN_REQUESTED, {})
+        else:
+            manager.publish_system_event(SystemEvent.SHUTDOWN_REQUESTED, {})
+
+    ticker.start()
+    QTimer.singleShot(20, storm)
+    app.exec()
+    result["waits"] = manager.dispatch_stats()["wait"]["LOW"]
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--handler-ms", type=float, default=0.2)
+    parser.add_argument("--budget-ms", type=float, default=4.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    app = QCoreApplication(sys.argv[:1])
+
+    print(f"{args.events:,} LOW news at {args.handler_ms:g} ms each, then SHUTDOWN_REQUESTED; "
+          f"{args.budget_ms:g} ms slices")
+    print(f"{'':<12}{'shutdown ms':>12}{'max freeze ms':>15}{'all done ms':>13}{'LOW wait p99 ms':>17}")
+    for label, direct in (("direct", True), ("dispatcher", False)):
+        result = run(app, direct, args.events, args.handler_ms / 1000, args.budget_ms / 1000)
+        p99 = result["waits"]["p99"]
+        print(f"{label:<12}{(result['shutdown'] - result['started']) * 1000:>12.1f}{result['gap'] * 1000:>15.1f}"
+              f"{(result['done'] - result['started']) * 1000:>13.0f}"
+              f"{p99 * 1000 if p99 is not None and not direct else float('nan'):>17.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Resyncing the EntityCache after a reconnect: full snapshot vs since-delta.
+
+Loads projects x risks into a cache, then changes a fraction of the risks
+and deletes a few while the client is "offline". Compares rejoining with a
+full snapshot per project against rejoining with "since" (changed risks plus
+the surviving ids): reply size as JSON and time to apply. Also times replaying
+events the cache already holds, and by_project() against scanning every
+cached risk.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_entity_cache [projects] [risks_per_project] [changed_pct]
+"""
+import json
+import random
+import sys
+
+from ..entity_cache import EntityCache
+from .frames import measure, risk_payload
+
+def version(second: int) -> str:
+    return f"2024-05-01T{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}Z"
+
+def build_server(projects: int, per_project: int) -> dict:
+    """project_id -> {risk_id: payload}"""
+    random.seed(1)
+    server = {}
+    for project_id in range(projects):
+        risks = {}
+        for n in range(per_project):
+            risk = risk_payload(project_id * per_project + n, project_id)
+            risk["updated_at"] = version(0)
+            risks[risk["id"]] = risk
+        server[project_id] = risks
+    return server
+
+def go_offline(server: dict, changed_pct: float, deleted_per_project: int = 2):
+    """Change some risks and delete a few, all at version(60)"""
+    for risks in server.values():
+        ids = list(risks)
+        for risk_id in random.sample(ids, int(len(ids) * changed_pct / 100)):
+            risks[risk_id] = dict(risks[risk_id], status="mitigating", updated_at=version(60))
+        for risk_id in random.sample(ids, deleted_per_project):
+            del risks[risk_id]
+
+def snapshot_reply(risks: dict, at: int) -> dict:
+    return {"version": version(at), "risk": {"snapshot": list(risks.values())}}
+
+def delta_reply(risks: dict, since: str, at: int) -> dict:
+    changes = [risk for risk in risks.values() if risk["updated_at"] >= since]
+    return {"version": version(at), "risk": {"changes": changes, "ids": list(risks)}}
+
+def loaded_cache(server: dict) -> EntityCache:
+    """A cache that last synced at version(30)"""
+    cache = EntityCache()
+    for project_id, risks in server.items():
+        cache.apply_sync(f"risks:{project_id}", snapshot_reply(risks, 30))
+    return cache
+
+def resync(server: dict, baseline: dict, delta: bool):
+    """Best time to apply one reply per project to a cache holding `baseline`, plus reply bytes and changes"""
+    best, changed = float("inf"), 0
+    for _ in range(5):
+        cache = loaded_cache(baseline)
+        replies = {}
+        for project_id, risks in server.items():
+            topic = f"risks:{project_id}"
+            since = cache.join_params(topic).get("since")
+            replies[topic] = delta_reply(risks, since, 120) if delta else snapshot_reply(risks, 120)
+
+        def run():
+            nonlocal changed
+            changed = sum(cache.apply_sync(topic, reply) for topic, reply in replies.items())
+
+        best = min(best, measure(run, repeat=1))
+    return best, sum(len(json.dumps(reply)) for reply in replies.values()), changed
+
+def main():
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    changed_pct = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+
+    baseline = build_server(projects, per_project)
+    server = {project_id: dict(risks) for project_id, risks in baseline.items()}
+    go_offline(server, changed_pct)
+    print(f"{projects} projects x {per_project} risks, {changed_pct:g}% changed and 2 per project deleted offline")
+    print(f"{'resync':<10}{'reply KB':>10}{'apply ms':>10}{'changed':>9}")
+    for name, delta in (("snapshot", False), ("delta", True)):
+        seconds, size, changed = resync(server, baseline, delta)
+        print(f"{name:<10}{size / 1024:>10,.0f}{seconds * 1000:>10.1f}{changed:>9,}")
+
+    cache = loaded_cache(server)
+    replay = [(f"risks:{risk['project_id']}", "risk:updated", risk)
+              for risks in server.values() for risk in risks.values()]
+
+    def replay_all():
+        for topic, event, payload in replay:
+            cache.apply(topic, event, payload)
+
+    applied = cache.applied
+    per_event = measure(replay_all) / len(replay)
+    print()
+    print(f"replaying {len(replay):,} held events: {per_event * 1e6:.2f} us each, {cache.applied - applied:,} applied")
+
+    target = projects // 2
+    indexed = measure(lambda: cache.by_project(target), repeat=50)
+    scanned = measure(lambda: [risk for (kind, _), risk in cache._entities.items()
+                               if kind == "risk" and risk.get("project_id") == target], repeat=50)
+    print(f"one project's risks: by_project {indexed * 1e6:.0f} us, full scan {scanned * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    main()
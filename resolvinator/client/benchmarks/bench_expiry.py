@@ -0,0 +1,97 @@
+"""Notification expiry: the old one-minute full scan vs ExpiryScheduler.
+
+Loads --count notifications with TTLs between ten seconds and a day, a
+fifth of which the user dismisses early, then plays an hour of simulated
+time. "scan" is the old cleanup_expired(): every 60 s it walks all
+notifications. "heap" pops what has expired each time the single timer
+fires at the earliest deadline, plus its resolution. Reports the cost of
+each operation, the work per wake-up and how late notifications
+disappeared.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_expiry [count]
+"""
+import random
+import sys
+import time
+
+from ..expiry import ExpiryScheduler
+from .frames import percentile
+
+TTLS = (10, 30, 60, 300, 900, 3600, 86400)
+HORIZON = 3600.0
+SCAN_INTERVAL = 60.0
+# Heap wake-up resolutions compared; NotificationManager uses 0.25 s
+RESOLUTIONS = (0.0, 0.25)
+
+def workload(count: int):
+    random.seed(1)
+    deadlines = {f"n{i}": random.choice(TTLS) * random.uniform(0.5, 1.5) for i in range(count)}
+    dismissed = random.sample(list(deadlines), count // 5)
+    return deadlines, dismissed
+
+def run_scan(deadlines: dict, dismissed: list):
+    live = dict(deadlines)
+    for key in dismissed:
+        del live[key]
+    lateness, cost, wakeups = [], 0.0, 0
+    now = SCAN_INTERVAL
+    while now <= HORIZON:
+        started = time.perf_counter()
+        expired = [key for key, deadline in live.items() if deadline <= now]
+        for key in expired:
+            del live[key]
+        cost += time.perf_counter() - started
+        wakeups += 1
+        lateness.extend(now - deadlines[key] for key in expired)
+        now += SCAN_INTERVAL
+    return lateness, cost, wakeups
+
+def run_heap(deadlines: dict, dismissed: list, resolution: float):
+    armed = []
+    scheduler = ExpiryScheduler(arm=armed.append, resolution=resolution)
+
+    started = time.perf_counter()
+    for key, deadline in deadlines.items():
+        scheduler.schedule(key, deadline)
+    insert = (time.perf_counter() - started) / len(deadlines)
+
+    started = time.perf_counter()
+    for key in dismissed:
+        scheduler.cancel(key)
+    cancel = (time.perf_counter() - started) / len(dismissed)
+
+    lateness, cost, wakeups = [], 0.0, 0
+    while armed[-1] is not None and armed[-1] <= HORIZON:
+        # The timer fires at the armed deadline
+        now = armed[-1]
+        started = time.perf_counter()
+        expired = scheduler.pop_expired(now)
+        cost += time.perf_counter() - started
+        wakeups += 1
+        lateness.extend(now - deadlines[key] for key in expired)
+    return lateness, cost, wakeups, insert, cancel
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    deadlines, dismissed = workload(count)
+    print(f"{count:,} notifications, TTLs {TTLS[0]} s to {TTLS[-1] // 3600} h, {len(dismissed):,} dismissed early; "
+          f"{HORIZON / 3600:g} h simulated")
+
+    scan_lateness, scan_cost, scan_wakeups = run_scan(deadlines, dismissed)
+    rows = [("scan", scan_lateness, scan_cost, scan_wakeups)]
+    for resolution in RESOLUTIONS:
+        lateness, cost, wakeups, insert, cancel = run_heap(deadlines, dismissed, resolution)
+        rows.append((f"heap {resolution:g}s", lateness, cost, wakeups))
+
+    print(f"heap insert {insert * 1e6:.2f} us, dismiss {cancel * 1e6:.2f} us")
+    print(f"{'':<11}{'expired':>9}{'wake-ups':>10}{'total ms':>10}{'us/expiry':>11}{'late p50 s':>12}{'late max s':>12}")
+    for name, lateness, cost, wakeups in rows:
+        print(f"{name:<11}{len(lateness):>9,}{wakeups:>10,}{cost * 1000:>10.1f}{cost / len(lateness) * 1e6:>11.2f}"
+              f"{percentile(lateness, 50):>12.2f}{max(lateness):>12.2f}")
+    print(f"one idle scan of {count - len(dismissed):,} notifications: "
+          f"{scan_cost / scan_wakeups * 1000:.1f} ms every {SCAN_INTERVAL:g} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Message history decryption: inline Fernet per message vs HistoryDecryptor.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_history [sizes] [workers]
+
+sizes and workers are comma-separated, e.g. "10000,100000,1000000" "1,2,4,8".
+Reports the total time for a page and how soon its first chunk (chunk_size
+messages) is ready to show.
+"""
+import os
+import sys
+import time
+from typing import List
+
+from cryptography.fernet import Fernet
+
+from ..messages import HistoryDecryptor, message_from_payload
+from .frames import description
+
+# Distinct ciphertexts encrypted up front; larger pages repeat them
+UNIQUE = 10000
+
+def history_payloads(cipher_suite: Fernet, count: int) -> List[dict]:
+    tokens = [cipher_suite.encrypt(description(120).encode()).decode() for _ in range(min(count, UNIQUE))]
+    return [
+        {
+            "id": i,
+            "content": tokens[i % len(tokens)],
+            "from_user_id": 1 + i % 2,
+            "to_user_id": 2 - i % 2,
+            "read": True,
+            "encrypted": True,
+            "created_at": "2024-05-01T12:00:00"
+        }
+        for i in range(count)
+    ]
+
+def run_inline(cipher_suite: Fernet, payloads: List[dict], chunk_size: int):
+    decrypt = lambda content: cipher_suite.decrypt(content.encode()).decode()
+    start = time.perf_counter()
+    first = None
+    for i, payload in enumerate(payloads, 1):
+        message_from_payload(payload, decrypt)
+        if i == chunk_size:
+            first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+def run_pool(decryptor: HistoryDecryptor, payloads: List[dict]):
+    start = time.perf_counter()
+    first = None
+    for _ in decryptor.stream(payloads):
+        if first is None:
+            first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+def main():
+    sizes = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000").split(",")]
+    workers = [int(n) for n in (sys.argv[2] if len(sys.argv) > 2 else f"1,2,4,{os.cpu_count()}").split(",")]
+    cipher_suite = Fernet(Fernet.generate_key())
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'messages':>10}  {'path':<20}{'total ms':>12}{'first ms':>12}{'msgs/sec':>14}")
+    for count in sizes:
+        payloads = history_payloads(cipher_suite, count)
+        total, first = run_inline(cipher_suite, payloads, HistoryDecryptor.CHUNK_SIZE)
+        print(f"{count:>10,}  {'inline':<20}{total * 1000:>12,.1f}{first * 1000:>12,.3f}{count / total:>14,.0f}")
+        for n in sorted(set(workers)):
+            decryptor = HistoryDecryptor(cipher_suite, n)
+            total, first = run_pool(decryptor, payloads)
+            decryptor.shutdown()
+            label = f"pool x{n}"
+            print(f"{count:>10,}  {label:<20}{total * 1000:>12,.1f}{first * 1000:>12,.3f}{count / total:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
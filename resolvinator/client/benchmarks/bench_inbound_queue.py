@@ -0,0 +1,78 @@
+"""An overloaded client: arrival-order outbox vs InboundQueue priority lanes.
+
+A burst of news spam, user messages and risk updates (many of them to the
+same few hundred risks) arrives while the GUI thread is busy, with a system
+shutdown notice near the end. Reports how many messages are handled before
+the notice, what each lane dropped or coalesced, and the per-message cost
+of put() and take().
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_inbound_queue [messages] [max_batch]
+"""
+import random
+import sys
+import time
+
+from ..codec import PhoenixMessage
+from ..decode_worker import _FifoOutbox
+from ..inbound_queue import InboundQueue
+
+def burst(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            messages.append(PhoenixMessage("news", "news:published", {"id": i, "title": f"Item {i}"}))
+        elif kind < 0.5:
+            messages.append(PhoenixMessage("user:1", "message:new", {"id": i, "from_user_id": 2}))
+        else:
+            risk = rng.randrange(300)
+            messages.append(PhoenixMessage(f"risks:{risk % 10}", "risk:updated",
+                                           {"id": risk, "probability": rng.random()}))
+    notice = PhoenixMessage("system", "system_event", {"type": "shutdown_requested"})
+    messages.insert(int(count * 0.9), notice)
+    return messages, notice
+
+def drain(outbox, messages, notice, max_batch: int):
+    started = time.perf_counter()
+    for message in messages:
+        outbox.put(message)
+    queued = time.perf_counter() - started
+
+    handled = 0
+    notice_at = None
+    started = time.perf_counter()
+    more = True
+    while more:
+        batch, more = outbox.take(max_batch)
+        for message in batch:
+            if message is notice:
+                notice_at = handled
+            handled += 1
+    taken = time.perf_counter() - started
+    return handled, notice_at, (queued + taken) / len(messages)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    max_batch = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    messages, notice = burst(count)
+
+    print(f"{len(messages):,} messages in one burst, max_batch={max_batch}")
+    print(f"{'outbox':<16}{'handled':>10}{'before notice':>15}{'put+take us':>13}")
+    fifo = _FifoOutbox()
+    handled, notice_at, cost = drain(fifo, messages, notice, max_batch)
+    print(f"{'arrival order':<16}{handled:>10,}{notice_at:>15,}{cost * 1e6:>13.2f}")
+    lanes = InboundQueue()
+    handled, notice_at, cost = drain(lanes, messages, notice, max_batch)
+    print(f"{'priority lanes':<16}{handled:>10,}{notice_at:>15,}{cost * 1e6:>13.2f}")
+
+    print()
+    print(f"{'lane':<10}{'capacity':>10}{'high water':>12}{'enqueued':>10}{'dropped':>10}{'coalesced':>11}")
+    for name, stats in lanes.stats().items():
+        print(f"{name:<10}{stats['capacity']:>10,}{stats['high_water']:>12,}{stats['enqueued']:>10,}"
+              f"{stats['dropped']:>10,}{stats['coalesced']:>11,}")
+
+if __name__ == "__main__":
+    main()
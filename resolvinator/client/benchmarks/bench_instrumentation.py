@@ -0,0 +1,73 @@
+"""Cost of the instrumentation layer on the PhoenixProtocol receive path.
+
+Times receive_frame() over synthetic risk/project traffic with metrics off
+and on, then the cost of a snapshot and of each exporter write.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_instrumentation [frame_count] [output_dir]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from ..codec import get_serializer
+from ..instrumentation import Metrics, MetricsExporter
+from ..protocol import PhoenixProtocol
+from .frames import measure, sample_frames, unthrottled
+
+def build_protocol(metrics):
+    protocol = PhoenixProtocol(send=lambda frames: None, serializer=get_serializer("1.0.0"),
+                               rate_limiter=unthrottled(), metrics=metrics)
+    protocol.router.register("risks:*", "*", lambda message: None)
+    protocol.router.register("project:*", "*", lambda message: None)
+    return protocol
+
+def bench_receive(frames: list, metrics) -> float:
+    receive_frame = build_protocol(metrics).receive_frame
+
+    def run():
+        for frame in frames:
+            receive_frame(frame)
+
+    return measure(run) / len(frames)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp()
+    frames = sample_frames(count)
+    logging.disable(logging.WARNING)
+
+    # Alternate the two so drift on a busy machine hits both alike
+    off = on = float("inf")
+    for _ in range(3):
+        off = min(off, bench_receive(frames, None))
+        metrics = Metrics()
+        on = min(on, bench_receive(frames, metrics))
+    print(f"{count:,} frames")
+    print(f"{'metrics':<10}{'us/frame':>10}{'overhead':>10}")
+    print(f"{'off':<10}{off * 1e6:>10.2f}{'':>10}")
+    print(f"{'on':<10}{on * 1e6:>10.2f}{(on / off - 1) * 100:>9.1f}%")
+
+    stages = metrics.snapshot()["stages"]
+    print()
+    print(f"{'stage':<10}{'count':>10}{'mean us':>10}{'p99 <=us':>10}")
+    for stage, stats in stages.items():
+        mean = stats["sum"] / stats["count"] if stats["count"] else 0.0
+        p99 = stats["p99"] * 1e6 if stats["p99"] is not None else float("nan")
+        print(f"{stage:<10}{stats['count']:>10,}{mean * 1e6:>10.2f}{p99:>10.1f}")
+
+    print()
+    snapshot = measure(metrics.snapshot, repeat=20)
+    print(f"snapshot {snapshot * 1e6:.0f} us")
+    for format, name in (("prometheus", "client.prom"), ("jsonl", "client.jsonl")):
+        exporter = MetricsExporter(metrics, os.path.join(directory, name), format)
+        started = time.perf_counter()
+        exporter.write()
+        elapsed = time.perf_counter() - started
+        print(f"{format} write {elapsed * 1e6:.0f} us, {os.path.getsize(exporter.path):,} bytes -> {exporter.path}")
+
+if __name__ == "__main__":
+    main()
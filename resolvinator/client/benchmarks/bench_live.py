@@ -0,0 +1,269 @@
+"""End-to-end throughput, latency and memory of the clients against the stand-in server.
+
+Starts standin_server in its own process, then runs each client in a fresh
+process: it joins the risks:/project: topics of --projects projects plus
+system and user:1, warms up, and counts what reaches its handlers for
+--duration seconds. Latency is the wall-clock time from the server building
+a payload to the client's handler seeing it; memory is the client
+process's RSS before connecting, at the end, and its peak.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_live [asyncio|qt|messaging|all] [--rate 50] [--duration 10]
+    python -m resolvinator.client.benchmarks.bench_live all --json results.json
+    python -m resolvinator.client.benchmarks.bench_live all --baseline results.json
+
+--rate is risk updates per second per project topic (0: as fast as the
+server can push). With --baseline the run exits non-zero if any client's
+messages/sec fell, or its p99 latency or RSS growth rose, by more than
+--tolerance, so it can gate a release.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from .frames import percentile, unthrottled
+
+CLIENTS = ("asyncio", "qt", "messaging")
+USER_ID = 1
+# 32 characters, shared by the server and MessagingClient
+MESSAGE_KEY = "resolvinator-bench-message-key!!"
+
+class Recorder:
+    """Counts payloads stamped with sent_at by the stand-in server, while recording"""
+
+    def __init__(self):
+        self.recording = False
+        self.received = 0
+        self.latencies: List[float] = []
+        self.started = 0.0
+        self.seconds = 0.0
+
+    def start(self):
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.seconds = time.perf_counter() - self.started
+
+    def record(self, message):
+        """Router handler"""
+        payload = message.payload
+        if self.recording and isinstance(payload, dict) and "sent_at" in payload:
+            self.observe(time.time() - payload["sent_at"])
+
+    def observe(self, latency: float):
+        if self.recording:
+            self.received += 1
+            self.latencies.append(latency)
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+def topics(projects: int) -> List[str]:
+    return ([f"risks:{i}" for i in range(projects)] + [f"project:{i}" for i in range(projects)]
+            + ["system", f"user:{USER_ID}"])
+
+def report(client: str, recorder: Recorder, rss_start: float, **extra) -> dict:
+    latencies = recorder.latencies
+    return {
+        "client": client,
+        "received": recorder.received,
+        "msgs_per_s": recorder.received / recorder.seconds if recorder.seconds else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "rss_start_mb": rss_start,
+        "rss_end_mb": rss_mb(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "cpu_s": time.process_time(),
+        **extra
+    }
+
+# Runners, each executed in its own process
+
+def run_asyncio(args) -> dict:
+    from ..event_manager import EventManager
+    from ..router import WILDCARD
+    from ..websocket_client import WebSocketClient
+
+    async def run():
+        recorder = Recorder()
+        client = WebSocketClient(EventManager(), f"{args.url}/socket/websocket", rate_limiter=unthrottled())
+        client.router.register(WILDCARD, WILDCARD, recorder.record)
+        for topic in topics(args.projects):
+            await client.join(topic)
+        rss_start = rss_mb()
+        connection = asyncio.create_task(client.connect())
+        await asyncio.sleep(args.warmup)
+        recorder.start()
+        await asyncio.sleep(args.duration)
+        recorder.stop()
+        await client.close()
+        connection.cancel()
+        return report("asyncio", recorder, rss_start)
+
+    return asyncio.run(run())
+
+def qt_app():
+    """The process's QCoreApplication; it has to exist before any client's sockets and timers are built"""
+    from PyQt6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+def run_qt_loop(app, warmup: float, duration: float, on_warm, on_done):
+    """Run app's event loop, calling on_warm after the warm-up and on_done at the end"""
+    from PyQt6.QtCore import QTimer
+    QTimer.singleShot(int(warmup * 1000), on_warm)
+    QTimer.singleShot(int((warmup + duration) * 1000), lambda: (on_done(), app.quit()))
+    app.exec()
+
+def run_qt(args) -> dict:
+    from ..router import WILDCARD
+    from ..websocket_client3 import WebSocketClient
+
+    app = qt_app()
+    recorder = Recorder()
+    client = WebSocketClient(args.url, "bench-token", rate_limiter=unthrottled())
+    client.router.register(WILDCARD, WILDCARD, recorder.record)
+    for topic in topics(args.projects):
+        client.join_channel(topic)
+    rss_start = rss_mb()
+    client.connect_to_server()
+    run_qt_loop(app, args.warmup, args.duration, recorder.start, recorder.stop)
+    client.disconnect()
+    return report("qt", recorder, rss_start, dropped=client.inbound.dropped, coalesced=client.inbound.coalesced)
+
+def run_messaging(args) -> dict:
+    from ..connection_manager import ConnectionManager
+    from ..event_manager import EventManager
+    from ..messaging_client import MessagingClient
+
+    app = qt_app()
+    recorder = Recorder()
+    connections = ConnectionManager(args.url, "bench-token", rate_limiter=unthrottled())
+    client = MessagingClient(EventManager(), USER_ID, MESSAGE_KEY, connections)
+    client.message_received.connect(
+        lambda message: recorder.observe((datetime.now() - message.created_at).total_seconds()))
+    history: Dict[str, float] = {}
+
+    def fetch_history():
+        started = time.perf_counter()
+        client.fetch_history(USER_ID + 1, limit=1000).add_done_callback(
+            lambda page: history.setdefault("history_1000_ms", (time.perf_counter() - started) * 1000))
+
+    def warm():
+        recorder.start()
+        fetch_history()
+
+    rss_start = rss_mb()
+    client.connect()
+    connections.connect_all()
+    run_qt_loop(app, args.warmup, args.duration, warm, recorder.stop)
+    inbound = connections.client().inbound
+    client.close()
+    connections.disconnect_all()
+    return report("messaging", recorder, rss_start, dropped=inbound.dropped, **history)
+
+RUNNERS = {"asyncio": run_asyncio, "qt": run_qt, "messaging": run_messaging}
+
+# Driver
+
+def start_server(args) -> Tuple[subprocess.Popen, str]:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "resolvinator.client.benchmarks.standin_server", "--port", "0",
+         "--rate", str(args.rate), "--payload-size", str(args.payload_size), "--key", MESSAGE_KEY],
+        stdout=subprocess.PIPE, text=True)
+    return server, server.stdout.readline().strip()
+
+def run_client(name: str, url: str, args) -> dict:
+    """Run one client in a fresh process and parse its result line"""
+    command = [sys.executable, "-m", "resolvinator.client.benchmarks.bench_live", name, "--run", "--url", url,
+               "--projects", str(args.projects), "--duration", str(args.duration), "--warmup", str(args.warmup)]
+    try:
+        child = subprocess.run(command, capture_output=True, text=True, timeout=args.warmup + args.duration + 60)
+    except subprocess.TimeoutExpired:
+        return {"client": name, "error": "timed out"}
+    if child.returncode != 0:
+        lines = child.stderr.strip().splitlines()
+        return {"client": name, "error": lines[-1] if lines else f"exit status {child.returncode}"}
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+def regressions(results: List[dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    found = []
+    for result in results:
+        before = baseline.get(result["client"])
+        if before is None or "error" in result or "error" in before:
+            continue
+        if result["msgs_per_s"] < before["msgs_per_s"] * (1 - tolerance):
+            found.append(f"{result['client']}: {result['msgs_per_s']:,.0f} msgs/s, was {before['msgs_per_s']:,.0f}")
+        if result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            found.append(f"{result['client']}: p99 {result['p99_ms']:.1f} ms, was {before['p99_ms']:.1f}")
+        growth, was = result["rss_end_mb"] - result["rss_start_mb"], before["rss_end_mb"] - before["rss_start_mb"]
+        if growth > max(was, 1.0) * (1 + tolerance):
+            found.append(f"{result['client']}: RSS grew {growth:.1f} MB, was {was:.1f}")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("client", nargs="?", default="all", choices=CLIENTS + ("all",))
+    parser.add_argument("--rate", type=float, default=50.0, help="risk updates per second per project topic; 0 is unpaced")
+    parser.add_argument("--payload-size", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--json", help="write results here")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    # Internal: run a single client against --url and print its result
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(RUNNERS[args.client](args)))
+        return
+
+    server, url = start_server(args)
+    try:
+        names = CLIENTS if args.client == "all" else (args.client,)
+        results = [run_client(name, url, args) for name in names]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{args.projects} projects, {args.rate:g} risk updates/s per topic, {args.payload_size}-char payloads, "
+          f"{args.duration:g}s")
+    print(f"{'client':<11}{'msgs/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}{'growth':>8}{'peak':>8}"
+          f"{'cpu s':>8}{'dropped':>9}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['client']:<11}skipped: {result['error']}")
+            continue
+        print(f"{result['client']:<11}{result['msgs_per_s']:>10,.0f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+              f"{result['p99_ms']:>9.2f}{result['rss_end_mb']:>9.1f}{result['rss_end_mb'] - result['rss_start_mb']:>8.1f}"
+              f"{result['peak_rss_mb']:>8.1f}{result['cpu_s']:>8.2f}{result.get('dropped', 0):>9,}")
+        if "history_1000_ms" in result:
+            print(f"{'':<11}1000-message history page in {result['history_1000_ms']:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump({result["client"]: result for result in results}, out, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            found = regressions(results, json.load(baseline), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Scrollback page latency from MessageStore as history grows.
+
+Compares the store's keyset paging with LIMIT/OFFSET paging over the same
+table, at the newest page, halfway back and at the very start.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_message_store [sizes] [db_path]
+
+sizes is comma-separated (default "10000,100000,1000000"); db_path defaults
+to an in-memory database.
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from ..message_store import MessageStore
+from .frames import measure
+
+USER_ID = 1
+PEERS = 20
+PAGE = 50
+
+def fill(store: MessageStore, count: int):
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(count):
+        peer = 2 + i % PEERS
+        outgoing = i % 3 == 0
+        batch.append({
+            "id": i,
+            "from_user_id": USER_ID if outgoing else peer,
+            "to_user_id": peer if outgoing else USER_ID,
+            "content": "gAAAAAB" + "x" * 150,
+            "encrypted": True,
+            "read": True,
+            "created_at": (start + timedelta(seconds=i)).isoformat()
+        })
+        if len(batch) == 10000:
+            store.add(batch)
+            batch = []
+    store.add(batch)
+
+def offset_page(store: MessageStore, peer: int, offset: int):
+    """The same page by OFFSET, fetching the same columns as MessageStore.page"""
+    return store._db.execute(
+        "SELECT id, from_user_id, to_user_id, content, encrypted, read, created_at FROM messages WHERE peer_id = ? ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+        (peer, PAGE, offset)).fetchall()
+
+def main():
+    sizes = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000").split(",")]
+    path = sys.argv[2] if len(sys.argv) > 2 else ":memory:"
+
+    print(f"{PAGE}-message pages, {PEERS} peers")
+    print(f"{'messages':>10}{'insert/s':>12}  {'position':<10}{'keyset us':>12}{'offset us':>12}")
+    for count in sizes:
+        store = MessageStore(path if path == ":memory:" else f"{path}.{count}", user_id=USER_ID)
+        started = time.perf_counter()
+        fill(store, count)
+        rate = count / (time.perf_counter() - started)
+
+        peer = 2
+        per_peer = store.count(peer)
+        positions = {"newest": 0, "middle": per_peer // 2, "oldest": max(per_peer - PAGE, 0)}
+        for label, offset in positions.items():
+            # Cursor at the message just newer than the page the OFFSET query returns
+            cursor = MessageStore.cursor(store.page(peer, None, offset)[0]) if offset else None
+            keyset = measure(lambda: store.page(peer, cursor, PAGE), repeat=50)
+            by_offset = measure(lambda: offset_page(store, peer, offset), repeat=50)
+            size_label = f"{count:,}" if label == "newest" else ""
+            rate_label = f"{rate:,.0f}" if label == "newest" else ""
+            print(f"{size_label:>10}{rate_label:>12}  {label:<10}{keyset * 1e6:>12,.1f}{by_offset * 1e6:>12,.1f}")
+        store.close()
+
+if __name__ == "__main__":
+    main()
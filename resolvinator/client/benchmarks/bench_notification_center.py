@@ -0,0 +1,132 @@
+"""NotificationCenter with a hundred thousand notifications, shown offscreen.
+
+Feeds --count notifications into a visible NotificationCenter in bursts
+of --burst per event-loop tick, as the manager's signals would, and
+reports the longest the loop went without running a 1 ms timer, how long
+until every row was in the view, and the memory it took. Then times a
+repaint at the top and at random scroll positions, each filter and sort
+change, and dismissing a fifth of the notifications in bursts.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m resolvinator.client.benchmarks.bench_notification_center [--count 100000] [--burst 1000]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+from ..events import Notification, NotificationType, NotificationPriority
+from ..notification_center import NotificationCenter, NotificationSort
+from .frames import description, percentile
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * 4096 / 2 ** 20
+
+def notifications(count: int) -> List[Notification]:
+    random.seed(1)
+    start = datetime.now() - timedelta(hours=count / 3600)
+    return [
+        Notification(
+            id=f"n{i}",
+            type=random.choice(list(NotificationType)),
+            priority=random.choice(list(NotificationPriority)),
+            title=f"Risk {i} {random.choice(['escalated', 'updated', 'closed'])}",
+            message=description(random.randint(40, 300)),
+            timestamp=start + timedelta(seconds=i),
+            action=random.choice([None, None, "Open"])
+        )
+        for i in range(count)
+    ]
+
+def feed(app: QApplication, batches: List[Callable[[], None]], center: NotificationCenter) -> dict:
+    """Run one batch per event-loop tick; report the longest loop stall and the time until the view is current"""
+    result = {"gap": 0.0}
+    remaining = list(reversed(batches))
+    last_tick = [time.perf_counter()]
+
+    ticker = QTimer()
+    ticker.setInterval(1)
+
+    def tick():
+        now = time.perf_counter()
+        result["gap"] = max(result["gap"], now - last_tick[0])
+        last_tick[0] = now
+        if remaining:
+            remaining.pop()()
+        elif not center.model.pending():
+            result["done"] = now
+            ticker.stop()
+            app.quit()
+    ticker.timeout.connect(tick)
+
+    result["started"] = time.perf_counter()
+    ticker.start()
+    app.exec()
+    return result
+
+def timed(action: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--burst", type=int, default=1000)
+    args = parser.parse_args()
+    app = QApplication(sys.argv[:1])
+
+    items = notifications(args.count)
+    center = NotificationCenter()
+    center.resize(420, 800)
+    center.show()
+    app.processEvents()
+    viewport = center.view.viewport()
+
+    before = rss_mb()
+    bursts = [items[i:i + args.burst] for i in range(0, len(items), args.burst)]
+    result = feed(app, [lambda b=b: [center.add_notification(n) for n in b] for b in bursts], center)
+    print(f"{args.count:,} notifications in bursts of {args.burst:,}: "
+          f"all shown after {(result['done'] - result['started']) * 1000:.0f} ms, "
+          f"max loop stall {result['gap'] * 1000:.1f} ms, memory +{rss_mb() - before:.0f} MB "
+          f"({center.view.model().rowCount():,} rows)")
+
+    paints = [timed(viewport.grab) for _ in range(20)]
+    print(f"paint at top: p50 {percentile(paints, 50) * 1000:.2f} ms")
+
+    scrollbar = center.view.verticalScrollBar()
+    scrolls = []
+    for _ in range(200):
+        scrollbar.setValue(random.randrange(scrollbar.maximum() + 1))
+        scrolls.append(timed(viewport.grab))
+    print(f"scroll and paint: p50 {percentile(scrolls, 50) * 1000:.2f} ms, "
+          f"p99 {percentile(scrolls, 99) * 1000:.2f} ms")
+
+    changes = [
+        ("filter: security", lambda: center.model.set_filter(types={NotificationType.SECURITY})),
+        ("filter: error and above", lambda: center.model.set_filter(min_priority=NotificationPriority.ERROR)),
+        ("filter: none", lambda: center.model.set_filter()),
+        ("sort: priority", lambda: center.model.set_sort(NotificationSort.PRIORITY)),
+        ("sort: type", lambda: center.model.set_sort(NotificationSort.TYPE)),
+        ("sort: newest", lambda: center.model.set_sort(NotificationSort.NEWEST))
+    ]
+    for label, change in changes:
+        elapsed = timed(lambda: (change(), viewport.grab()))
+        print(f"{label:<24}{elapsed * 1000:>8.1f} ms  ({center.model.rowCount():,} rows)")
+
+    dismissed = random.sample([n.id for n in items], args.count // 5)
+    bursts = [dismissed[i:i + args.burst] for i in range(0, len(dismissed), args.burst)]
+    result = feed(app, [lambda b=b: [center.remove_notification(nid) for nid in b] for b in bursts], center)
+    print(f"dismiss {len(dismissed):,} in bursts of {args.burst:,}: "
+          f"done after {(result['done'] - result['started']) * 1000:.0f} ms, "
+          f"max loop stall {result['gap'] * 1000:.1f} ms ({center.model.rowCount():,} rows left)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Shutting down under load: clearing the operation set vs OperationRegistry.drain().
+
+Starts a mix of work: thread-pool jobs that check their cancel token, jobs
+still queued behind them, asyncio tasks on a loop thread and a few jobs that
+ignore cancellation entirely. "clear" is the old interrupt_operations(): it
+forgets the ids and the work keeps running, so the time reported is how
+long the pool and loop take to actually go idle. "drain" cancels through
+the handles and tokens and waits on one budget.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_operations [operations] [budget]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import sys
+import threading
+import time
+
+from ..operations import CancelToken, OperationRegistry
+from .frames import percentile
+
+WORKERS = 8
+JOB_SECONDS = 3.0
+STUBBORN = 2
+
+def cooperative_job(token: CancelToken):
+    """Three seconds of work in 10 ms slices, stopping at the first slice after cancellation"""
+    finish = time.monotonic() + JOB_SECONDS
+    while time.monotonic() < finish:
+        if token.wait(0.01):
+            token.raise_if_cancelled()
+
+def stubborn_job(token: CancelToken):
+    time.sleep(JOB_SECONDS)
+
+def start_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def start_work(registry: OperationRegistry, count: int, pool: ThreadPoolExecutor, loop):
+    """Half the operations on the pool (most queued), half as asyncio tasks"""
+    for n in range(count):
+        token = CancelToken()
+        if n < STUBBORN:
+            registry.register(handle=pool.submit(stubborn_job, token), name=f"stubborn-{n}", token=token)
+        elif n % 2:
+            registry.register(handle=pool.submit(cooperative_job, token), name=f"job-{n}", token=token)
+        else:
+            task = asyncio.run_coroutine_threadsafe(asyncio.sleep(JOB_SECONDS), loop)
+            registry.register(handle=task, name=f"task-{n}", token=token)
+
+def run_clear(count: int) -> float:
+    registry = OperationRegistry()
+    pool = ThreadPoolExecutor(WORKERS)
+    loop = start_loop()
+    start_work(registry, count, pool, loop)
+    time.sleep(0.1)
+    started = time.perf_counter()
+    registry._operations.clear()  # what interrupt_operations() used to do
+    pool.shutdown(wait=True)
+    while asyncio.all_tasks(loop):
+        time.sleep(0.01)
+    loop.call_soon_threadsafe(loop.stop)
+    return time.perf_counter() - started
+
+def run_drain(count: int, budget: float):
+    registry = OperationRegistry()
+    pool = ThreadPoolExecutor(WORKERS)
+    loop = start_loop()
+    start_work(registry, count, pool, loop)
+    time.sleep(0.1)
+    report = registry.drain(budget)
+    pool.shutdown(wait=False)
+    loop.call_soon_threadsafe(loop.stop)
+    return report, registry
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    logging.disable(logging.WARNING)
+
+    print(f"{count} operations: {STUBBORN} ignore cancellation, {WORKERS} pool threads, {JOB_SECONDS:g} s jobs")
+    print(f"clear: work stopped after {run_clear(count) * 1000:,.0f} ms")
+    report, registry = run_drain(count, budget)
+    runtimes = [operation.runtime for operation in report.finished]
+    states = {}
+    for operation in report.finished:
+        states[operation.state.value] = states.get(operation.state.value, 0) + 1
+    print(f"drain: returned after {report.elapsed * 1000:,.0f} ms (budget {budget * 1000:,.0f} ms), "
+          f"{len(report.finished)} stopped {states}, {len(report.abandoned)} abandoned")
+    print(f"       runtime p50 {percentile(runtimes, 50) * 1000:.0f} ms, max {max(runtimes) * 1000:.0f} ms; "
+          f"abandoned: {', '.join(operation.name for operation in report.abandoned)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Presence handling for a large org: per-user signals vs PresenceStore.
+
+Replays a presence_state snapshot for every member (a reconnect), then a
+stream of small presence_diffs, and counts the change notifications the UI
+would receive each way.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_presence [members] [diffs]
+"""
+import random
+import sys
+import time
+
+from ..presence import PresenceStore
+
+def presence(ref: str) -> dict:
+    return {"metas": [{"phx_ref": ref, "online_at": 1714564800}]}
+
+def build_traffic(members: int, diffs: int, seed: int = 1):
+    rng = random.Random(seed)
+    state = {str(user_id): presence(f"s{user_id}") for user_id in range(members)}
+    online = set(range(members))
+    traffic = []
+    for n in range(diffs):
+        joins, leaves = {}, {}
+        for _ in range(rng.randint(1, 20)):
+            user_id = rng.randrange(members * 2)
+            if user_id in online:
+                leaves[str(user_id)] = presence(f"s{user_id}")
+                online.discard(user_id)
+            else:
+                joins[str(user_id)] = presence(f"s{user_id}")
+                online.add(user_id)
+        traffic.append({"joins": joins, "leaves": leaves})
+    return state, traffic
+
+def legacy(state: dict, traffic: list) -> int:
+    """Old _handle_user_message: one signal per join and leave, no state kept"""
+    signals = len(state)  # the snapshot arrives as every member joining
+    for diff in traffic:
+        signals += len(diff.get("joins", {})) + len(diff.get("leaves", {}))
+    return signals
+
+def main():
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    diffs = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    state, traffic = build_traffic(members, diffs)
+
+    signals = [0]
+    store = PresenceStore(on_change=lambda joined, left: signals.__setitem__(0, signals[0] + 1))
+    started = time.perf_counter()
+    store.apply_state(state)
+    snapshot = time.perf_counter() - started
+    started = time.perf_counter()
+    for diff in traffic:
+        store.apply_diff(diff)
+    applied = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for user_id in range(members * 2):
+        user_id in store
+    lookup = (time.perf_counter() - started) / (members * 2)
+
+    print(f"{members:,} members, {diffs:,} diffs")
+    print(f"{'path':<22}{'signals':>10}")
+    print(f"{'per-user signals':<22}{legacy(state, traffic):>10,}")
+    print(f"{'PresenceStore':<22}{signals[0]:>10,}")
+    print(f"snapshot {snapshot * 1000:.2f} ms, {applied / diffs * 1e6:.2f} us/diff, "
+          f"{lookup * 1e9:.0f} ns/is_online, {store.online_count():,} online")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Throughput of the sans-IO PhoenixProtocol with no socket or event loop in the way.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_protocol [frames.txt | frame_count]
+
+With a file argument, replays recorded text frames (one per line);
+otherwise uses synthetic risk/project traffic. Also times a full rejoin:
+connection_made() with many subscriptions, then every join reply.
+"""
+import logging
+import os
+import sys
+
+from ..codec import PhoenixMessage, available_decoders, get_decoder, get_serializer
+from ..protocol import PhoenixProtocol
+from .frames import measure, sample_frames, unthrottled
+
+def build_protocol(decoder_name: str, sent: list) -> PhoenixProtocol:
+    protocol = PhoenixProtocol(send=sent.extend, serializer=get_serializer(decoder=get_decoder(decoder_name)),
+                               rate_limiter=unthrottled())
+    protocol.router.register("risks:*", "*", lambda message: None)
+    protocol.router.register("project:*", "*", lambda message: None)
+    return protocol
+
+def bench_receive(decoder_name: str, frames: list) -> float:
+    protocol = build_protocol(decoder_name, [])
+    receive_frame = protocol.receive_frame
+
+    def run():
+        for frame in frames:
+            receive_frame(frame)
+
+    return len(frames) / measure(run)
+
+def bench_rejoin(topics: int) -> float:
+    sent = []
+    protocol = build_protocol("json", sent)
+    for i in range(topics):
+        protocol.join(f"risks:{i}")
+    serializer = protocol.serializer
+
+    def run():
+        sent.clear()
+        protocol.connection_made()
+        for frame in sent:
+            join = serializer.decode(frame)
+            reply = PhoenixMessage(join.topic, "phx_reply", {"status": "ok", "response": {}}, join.ref, join.join_ref)
+            protocol.receive(reply)
+        protocol.connection_lost()
+
+    return measure(run)
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else "50000"
+    if os.path.exists(arg):
+        with open(arg, encoding="utf-8") as f:
+            frames = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        frames = sample_frames(int(arg))
+    logging.disable(logging.WARNING)
+
+    print(f"{len(frames)} frames through PhoenixProtocol.receive_frame")
+    print(f"{'decoder':<10}{'frames/sec':>14}{'us/frame':>10}")
+    for name in available_decoders():
+        rate = bench_receive(name, frames)
+        print(f"{name:<10}{rate:>14,.0f}{1e6 / rate:>10.2f}")
+
+    print(f"{'rejoin':<10}{'channels':>14}{'ms':>10}")
+    for topics in (10, 100, 1000):
+        print(f"{'':<10}{topics:>14,}{bench_rejoin(topics) * 1000:>10.2f}")
+
+if __name__ == "__main__":
+    main()
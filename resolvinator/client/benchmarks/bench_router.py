@@ -0,0 +1,56 @@
+"""Dispatch cost as the number of registered topics grows.
+
+Compares TopicRouter against a startswith() chain like the one it
+replaced in the Qt client's _on_message.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_router [message_count]
+"""
+import random
+import sys
+
+from ..codec import PhoenixMessage
+from ..router import TopicRouter
+from .frames import measure
+
+EVENTS = ["created", "updated", "deleted"]
+
+def noop(message):
+    pass
+
+def build_router(topic_count: int) -> TopicRouter:
+    router = TopicRouter()
+    for i in range(topic_count):
+        for event in EVENTS:
+            router.register(f"topic{i}:*", event, noop)
+    router.register("system", "*", noop)
+    return router
+
+def chain_dispatch(prefixes: list, message: PhoenixMessage):
+    topic = message.topic
+    for prefix in prefixes:
+        if topic.startswith(prefix):
+            if message.event in EVENTS:
+                noop(message)
+            return
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    random.seed(1)
+    print(f"{'topics':>8}{'router ns':>12}{'chain ns':>12}")
+    for topic_count in (4, 16, 64, 256, 1024, 4096):
+        router = build_router(topic_count)
+        prefixes = [f"topic{i}:" for i in range(topic_count)]
+        messages = [
+            PhoenixMessage(f"topic{random.randrange(topic_count)}:{random.randrange(100)}",
+                           random.choice(EVENTS), {})
+            for _ in range(count)
+        ]
+        dispatch = router.dispatch
+        routed = measure(lambda: [dispatch(m) for m in messages]) / count * 1e9
+        chained = measure(lambda: [chain_dispatch(prefixes, m) for m in messages], repeat=1) / count * 1e9
+        print(f"{topic_count:>8}{routed:>12,.0f}{chained:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
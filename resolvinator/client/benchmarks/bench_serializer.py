@@ -0,0 +1,47 @@
+"""Bytes on the wire and encode/decode time for V1 vs V2 Phoenix framing.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_serializer [message_count]
+"""
+import base64
+import os
+import sys
+
+from ..codec import PhoenixMessage, V1Serializer, V2Serializer, available_decoders, get_decoder
+from .frames import measure, sample_messages
+
+def to_messages(raw: list) -> list:
+    return [
+        PhoenixMessage(m["topic"], m["event"], m["payload"], str(i), "1")
+        for i, m in enumerate(raw)
+    ]
+
+def report(label: str, serializer, messages: list):
+    frames = [serializer.encode(m) for m in messages]
+    wire = sum(len(f.encode() if isinstance(f, str) else f) for f in frames)
+    encode = measure(lambda: [serializer.encode(m) for m in messages])
+    decode = measure(lambda: [serializer.decode(f) for f in frames])
+    count = len(messages)
+    print(f"{label:<28}{wire / count:>12,.1f}{encode / count * 1e9:>14,.0f}{decode / count * 1e9:>14,.0f}")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    messages = to_messages(sample_messages(count))
+
+    # Attachment-style binary payloads: base64 inside JSON (V1) vs binary push (V2)
+    blobs = [os.urandom(4096) for _ in range(200)]
+    v1_blobs = [PhoenixMessage("project:1", "attachment", {"data": base64.b64encode(b).decode()}, str(i), "1")
+                for i, b in enumerate(blobs)]
+    v2_blobs = [PhoenixMessage("project:1", "attachment", b, str(i), "1") for i, b in enumerate(blobs)]
+
+    print(f"{count} messages")
+    print(f"{'framing':<28}{'bytes/frame':>12}{'encode ns':>14}{'decode ns':>14}")
+    for name in available_decoders():
+        report(f"V1 objects ({name})", V1Serializer(get_decoder(name)), messages)
+        report(f"V2 arrays ({name})", V2Serializer(get_decoder(name)), messages)
+    report("V1 base64 4KB blob", V1Serializer(), v1_blobs)
+    report("V2 binary push 4KB blob", V2Serializer(), v2_blobs)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cold start of the desktop client, against a target time to first window.
+
+Launches the app offscreen with --startup-report --exit-after-startup
+several times and reports the median of each milestone: imported (core
+modules loaded), application, window_shown, connecting and ready (optional
+subsystems loaded). Milestones count from the app module's first line, so
+the bare interpreter start-up is measured separately and added for the
+target check. Then shows what each subsystem costs to import cold, split
+into what sits before the first window and what load_optional defers.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_startup [--runs 5] [--target 1.0]
+
+Exits non-zero if interpreter start plus window_shown exceeds --target seconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from ..startup import profile_imports
+
+MILESTONES = ("imported", "application", "window_shown", "connecting", "ready")
+
+# Imported before the window shows, by load_optional afterwards, and never by the client
+SUBSYSTEMS = {
+    "before window": ("PyQt6.QtWidgets", "PyQt6.QtWebSockets", "resolvinator.client.connection_manager"),
+    "deferred": ("cryptography.fernet", "sqlite3", "resolvinator.client.messaging_client",
+                 "resolvinator.client.notification_manager", "resolvinator.client.notification_center"),
+    "not loaded": ("websockets", "pandas", "sklearn")
+}
+
+def interpreter_start(runs: int) -> float:
+    """Median wall time of an interpreter that imports nothing"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+def launch(runs: int) -> List[Dict[str, float]]:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        child = subprocess.run([sys.executable, "-m", "resolvinator.client.app", "--startup-report",
+                                "--exit-after-startup"], capture_output=True, text=True, env=env, timeout=60)
+        wall = time.perf_counter() - started
+        reports = [line for line in child.stdout.splitlines() if line.startswith('{"startup"')]
+        if child.returncode != 0 or not reports:
+            lines = child.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"exit status {child.returncode}")
+        results.append(dict(json.loads(reports[-1])["startup"], wall=wall))
+    return results
+
+def cold_import(module: str, after: str = "") -> str:
+    """What importing module adds once `after` (comma-separated modules) is loaded"""
+    try:
+        timings = profile_imports(f"{after}, {module}" if after else module)
+    except ImportError as e:
+        return f"unavailable ({e})"
+    mine = [timing for timing in timings if timing.module == module]
+    return f"{mine[-1].cumulative_us / 1000:.1f} ms" if mine else "already loaded"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=1.0, help="seconds from process start to the first window")
+    args = parser.parse_args()
+
+    interpreter = interpreter_start(args.runs)
+    print(f"interpreter start {interpreter * 1000:.0f} ms (median of {args.runs})")
+
+    missed = False
+    try:
+        results = launch(args.runs)
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"app skipped: {e}")
+    else:
+        print(f"{'milestone':<14}{'median ms':>10}")
+        for name in MILESTONES + ("wall",):
+            print(f"{name:<14}{statistics.median(result[name] for result in results) * 1000:>10.0f}")
+        first_window = interpreter + statistics.median(result["window_shown"] for result in results)
+        missed = first_window > args.target
+        print(f"first window after {first_window * 1000:.0f} ms, target {args.target * 1000:.0f} ms: "
+              f"{'MISSED' if missed else 'met'}")
+
+    print()
+    print(f"{'cold import (later groups on top of Qt)':<48}{'cost':>10}")
+    for group, modules in SUBSYSTEMS.items():
+        print(f"{group}:")
+        for module in modules:
+            after = "" if group == "before window" else "PyQt6.QtWidgets, PyQt6.QtWebSockets"
+            print(f"  {module:<46}{cold_import(module, after):>10}")
+
+    if missed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
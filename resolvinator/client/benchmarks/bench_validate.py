@@ -0,0 +1,47 @@
+"""Per-frame validation cost before and after the single-pass FrameValidator.
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.bench_validate [frame_count]
+"""
+import json
+import logging
+import sys
+
+from ..codec import MAX_FRAME_SIZE, FrameValidator, available_decoders, get_decoder
+from .frames import measure, risk_payload, sample_frames
+
+def legacy_validate(frame: str) -> bool:
+    """Previous _validate_message: decode, then re-encode the payload to size it"""
+    data = json.loads(frame)
+    if not all(field in data for field in ["topic", "event", "payload"]):
+        return False
+    return len(json.dumps(data.get("payload", {}))) <= MAX_FRAME_SIZE
+
+def per_frame_ns(fn, frames: list) -> float:
+    def run():
+        for frame in frames:
+            fn(frame)
+
+    return measure(run) / len(frames) * 1e9
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    frames = sample_frames(count)
+    oversized = [json.dumps({
+        "topic": "risks:1",
+        "event": "risk:updated",
+        "payload": risk_payload(1, 1, description_size=MAX_FRAME_SIZE)
+    })] * 20
+    logging.disable(logging.WARNING)
+
+    print(f"{'validator':<22}{'ns/frame':>12}{'oversized ns/frame':>22}")
+    legacy = (per_frame_ns(legacy_validate, frames), per_frame_ns(legacy_validate, oversized))
+    print(f"{'legacy (json)':<22}{legacy[0]:>12,.0f}{legacy[1]:>22,.0f}")
+    for name in available_decoders():
+        validate = FrameValidator(get_decoder(name)).validate
+        normal, rejected = per_frame_ns(validate, frames), per_frame_ns(validate, oversized)
+        print(f"{'single-pass (' + name + ')':<22}{normal:>12,.0f}{rejected:>22,.0f}")
+
+if __name__ == "__main__":
+    main()
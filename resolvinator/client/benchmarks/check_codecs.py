@@ -0,0 +1,119 @@
+"""Decode/encode parity of the json, orjson and msgspec codec backends.
+
+Decodes the sample traffic from frames.py, in V1 object and V2 array form,
+plus envelope edge cases, with every available decoder and compares each
+result with the stdlib json decoder's. Then encodes the same messages with
+the V1 and V2 serializers, using both the compact json and the orjson
+encoder, and checks that every decoder reads them back unchanged. (Binary
+and compressed frames aren't round-tripped: client pushes and server
+pushes have different layouts; bench_compression covers those.)
+
+Run from the repository root:
+
+    python -m resolvinator.client.benchmarks.check_codecs [message_count]
+
+Exits non-zero on any mismatch. Backends that aren't installed are listed
+as skipped.
+"""
+import json
+import sys
+from typing import Any, List, Tuple
+
+from .. import codec
+from ..codec import FrameDecodeError, PhoenixMessage, V1Serializer, V2Serializer, get_decoder
+from .frames import sample_messages
+
+BACKENDS = ("json", "orjson", "msgspec")
+
+# Envelopes the sample traffic doesn't cover; each must decode (or fail) alike
+EDGE_CASES = [
+    '{"topic":"a","event":"b","payload":{},"ref":1}',
+    '{"topic":"a","event":"b","payload":{},"ref":null,"extra":3}',
+    '{"topic":5,"event":"b","payload":{}}',
+    '{"topic":"a"}',
+    '{"payload":[1,2]}',
+    '[null,"1","t","e",{"x":1}]',
+    '["1",2,"t","e",{}]',
+    '[1,2,3]',
+    '"x"',
+    '{"topic":"a","event":"b","payload":{"f":1.5e300,"u":"\\u00e9\\ud83d\\ude00","n":null,"l":[true,false]}}',
+    '{"topic":"a","event":',
+    '',
+]
+
+# Where a backend is known to differ from json: (backend, frame, reason)
+KNOWN_DIFFERENCES = [
+    ("orjson", '{"topic":"a","event":"b","payload":{"big":123456789012345678901234567890}}',
+     "orjson reads integers wider than 64 bits as floats"),
+]
+
+def decode(decoder: codec.FrameDecoder, frame: codec.Frame) -> Any:
+    try:
+        return decoder.decode(frame)
+    except FrameDecodeError:
+        return FrameDecodeError
+
+def as_frames(messages: List[dict]) -> List[str]:
+    v1 = [json.dumps(m) for m in messages]
+    v2 = [json.dumps([m.get("join_ref"), m["ref"], m["topic"], m["event"], m["payload"]]) for m in messages]
+    return v1 + v2 + EDGE_CASES
+
+def check_decoders(frames: List[str]) -> List[str]:
+    reference = get_decoder("json")
+    expected = [decode(reference, frame) for frame in frames]
+    failures = []
+    for name in BACKENDS[1:]:
+        if name not in codec.available_decoders():
+            print(f"decode  {name:<8} skipped (not installed)")
+            continue
+        decoder = get_decoder(name)
+        mismatches = [frame for frame, want in zip(frames, expected) if decode(decoder, frame) != want]
+        failures += [f"decode {name}: {frame[:80]}" for frame in mismatches]
+        print(f"decode  {name:<8} {len(frames) - len(mismatches):,}/{len(frames):,} match json")
+
+    for name, frame, reason in KNOWN_DIFFERENCES:
+        if name in codec.available_decoders():
+            same = decode(get_decoder(name), frame) == decode(reference, frame)
+            print(f"known   {name:<8} {'matches after all' if same else 'differs'}: {reason}")
+    return failures
+
+def check_encoders(messages: List[dict]) -> List[str]:
+    envelopes = [PhoenixMessage(m["topic"], m["event"], m["payload"], m["ref"], m.get("join_ref")) for m in messages]
+    encoders: List[Tuple[str, Any]] = [("json", codec._compact_dumps)]
+    if codec.orjson is not None:
+        encoders.append(("orjson", codec._orjson_dumps))
+
+    failures = []
+    for encoder_name, dumps in encoders:
+        serializers = [
+            ("V1", V1Serializer(dumps=dumps)),
+            ("V2", V2Serializer(dumps=dumps))
+        ]
+        for label, serializer in serializers:
+            for decoder_name in codec.available_decoders():
+                serializer.decoder = get_decoder(decoder_name)
+                bad = 0
+                for message in envelopes:
+                    if serializer.decode(serializer.encode(message)) != message:
+                        bad += 1
+                        failures.append(f"{label} {encoder_name} encode -> {decoder_name} decode: {message.topic} "
+                                        f"{message.event} ref={message.ref}")
+                print(f"encode  {label:<8} {encoder_name:<7}-> {decoder_name:<8} "
+                      f"{len(envelopes) - bad:,}/{len(envelopes):,} round-trip")
+    return failures
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    messages = sample_messages(count)
+    for n, message in enumerate(messages):
+        message["ref"] = str(n)
+        message["join_ref"] = str(n % 7) if n % 3 else None
+
+    failures = check_decoders(as_frames(messages)) + check_encoders(messages)
+    for failure in failures[:20]:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(f"{len(failures)} mismatches")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Synthetic Phoenix traffic shared by the client benchmarks"""
+import json
+import random
+import time
+from typing import Callable, List
+
+from ..rate_limiter import RateLimit, TopicRateLimiter
+
+# Vocabulary for descriptions, so compression sees text rather than "xxxx..."
+WORDS = ("supplier", "delay", "budget", "overrun", "regulatory", "approval", "vendor", "contract",
+         "integration", "testing", "resource", "shortage", "scope", "change", "security", "audit",
+         "migration", "downtime", "customer", "escalation", "schedule", "slip", "quality", "defect",
+         "the", "of", "and", "may", "cause", "due", "to", "in", "phase", "critical", "path")
+
+def description(size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = random.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+def risk_payload(risk_id: int, project_id: int, description_size: int = 200) -> dict:
+    return {
+        "id": risk_id,
+        "project_id": project_id,
+        "name": f"Risk {risk_id}",
+        "description": description(description_size),
+        "probability": round(random.random(), 3),
+        "impact": random.choice(["low", "medium", "high", "critical"]),
+        "status": random.choice(["identified", "analyzing", "mitigating", "closed"]),
+        "updated_at": "2024-05-01T12:00:00Z"
+    }
+
+def sample_messages(count: int, projects: int = 50, seed: int = 1) -> List[dict]:
+    """Mixed risk/project traffic, roughly what a bulk import produces"""
+    random.seed(seed)
+    messages = []
+    for i in range(count):
+        project_id = random.randrange(projects)
+        if i % 4 == 3:
+            messages.append({
+                "topic": f"project:{project_id}",
+                "event": "mitigation:updated",
+                "payload": {"id": i, "project_id": project_id, "status": "in_progress"},
+                "ref": None
+            })
+        else:
+            messages.append({
+                "topic": f"risks:{project_id}",
+                "event": random.choice(["risk:created", "risk:updated"]),
+                "payload": risk_payload(i, project_id),
+                "ref": None
+            })
+    return messages
+
+def sample_frames(count: int, projects: int = 50, seed: int = 1) -> List[str]:
+    """sample_messages() encoded as V1 JSON text frames"""
+    return [json.dumps(m) for m in sample_messages(count, projects, seed)]
+
+def measure(fn: Callable[[], None], repeat: int = 5) -> float:
+    """Best wall-clock time of fn() over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def unthrottled() -> TopicRateLimiter:
+    """Rate limiter that never drops, so benchmarks measure the message path only"""
+    return TopicRateLimiter(default=RateLimit(rate=1e12, burst=10 ** 12))
@@ -0,0 +1,120 @@
+"""Reconnect behaviour of a client fleet when the server restarts.
+
+    python -m resolvinator.client.benchmarks.reconnect_storm simulate [--clients 1000] [--downtime 20]
+    python -m resolvinator.client.benchmarks.reconnect_storm live [--clients 50] [--downtime 5]
+
+"simulate" replays the legacy fixed 5s/5 attempt timer and the jittered
+ReconnectScheduler against a virtual clock. "live" runs Qt WebSocketClients
+against the stand-in server, restarts it, and reports what both sides saw.
+"""
+import argparse
+import heapq
+import logging
+import random
+import sys
+from collections import Counter
+from typing import Dict, List
+
+from ..reconnect import BackoffPolicy, ConnectionHealth, ReconnectScheduler
+from .frames import percentile
+
+BUCKET = 0.1  # seconds per bucket when looking for stampedes
+
+def summarize(label: str, attempt_times: List[float], recovered: List[float], clients: int):
+    buckets = Counter(int(t / BUCKET) for t in attempt_times)
+    peak = max(buckets.values()) if buckets else 0
+    print(f"{label:<22}{len(attempt_times):>10}{peak:>14}{clients - len(recovered):>10}"
+          f"{percentile(recovered, 50):>10.2f}{percentile(recovered, 99):>10.2f}")
+
+def simulate_legacy(clients: int, downtime: float):
+    """Fixed 5s QTimer, max 5 attempts, every client disconnected at t=0"""
+    attempts, recovered = [], []
+    for _ in range(clients):
+        for n in range(1, 6):
+            t = 5.0 * n
+            attempts.append(t)
+            if t >= downtime:
+                recovered.append(t)
+                break
+    return attempts, recovered
+
+def simulate_backoff(clients: int, downtime: float, policy: BackoffPolicy):
+    now = [0.0]
+    schedulers: Dict[int, ReconnectScheduler] = {}
+    queue = []
+    for cid in range(clients):
+        scheduler = ReconnectScheduler(policy, clock=lambda: now[0], rng=random.Random(cid))
+        scheduler.connecting()
+        scheduler.connection_established()
+        schedulers[cid] = scheduler
+        heapq.heappush(queue, (scheduler.connection_lost(), cid))
+
+    attempts, recovered = [], []
+    while queue:
+        t, cid = heapq.heappop(queue)
+        now[0] = t
+        attempts.append(t)
+        scheduler = schedulers[cid]
+        if t >= downtime:
+            scheduler.connection_established()
+            recovered.append(scheduler.last_time_to_reconnect)
+            continue
+        delay = scheduler.connection_lost()
+        if delay is not None:
+            heapq.heappush(queue, (t + delay, cid))
+    return attempts, recovered
+
+def run_simulation(clients: int, downtime: float):
+    print(f"{clients} clients, server down for {downtime:.0f}s")
+    print(f"{'strategy':<22}{'attempts':>10}{'peak/100ms':>14}{'gave up':>10}{'p50 s':>10}{'p99 s':>10}")
+    summarize("fixed 5s x5 (legacy)", *simulate_legacy(clients, downtime), clients)
+    summarize("backoff + full jitter", *simulate_backoff(clients, downtime, BackoffPolicy()), clients)
+
+def run_live(clients: int, downtime: float):
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    from ..websocket_client3 import WebSocketClient
+    from .standin_server import StandinServer
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    server = StandinServer().start()
+    fleet = [WebSocketClient(server.url, f"client-{i}") for i in range(clients)]
+    for client in fleet:
+        client.connect_to_server()
+
+    restart_at = 2.0
+
+    def restart():
+        server.connect_times.clear()
+        server.restart(downtime)
+
+    def finish():
+        healthy = sum(c.reconnect.state == ConnectionHealth.HEALTHY for c in fleet)
+        recovered = [c.reconnect.last_time_to_reconnect for c in fleet
+                     if c.reconnect.last_time_to_reconnect is not None]
+        attempt_times = [t - server.connect_times[0] for t in server.connect_times] if server.connect_times else []
+        print(f"{clients} Qt clients, stand-in server down for {downtime:.0f}s, {healthy} healthy at end")
+        print(f"{'strategy':<22}{'attempts':>10}{'peak/100ms':>14}{'gave up':>10}{'p50 s':>10}{'p99 s':>10}")
+        summarize("live backoff", attempt_times, recovered, clients)
+        for client in fleet:
+            client.disconnect()
+        # The clients answer the close handshakes on this loop, so let it run before the server waits for them
+        QTimer.singleShot(500, lambda: (server.stop(), app.quit()))
+
+    QTimer.singleShot(int(restart_at * 1000), restart)
+    QTimer.singleShot(int((restart_at + downtime + 40) * 1000), finish)
+    app.exec()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", nargs="?", choices=("simulate", "live"), default="simulate")
+    parser.add_argument("--clients", type=int, help="fleet size (default 1000 simulated, 50 live)")
+    parser.add_argument("--downtime", type=float, help="seconds the server is down (default 20 simulated, 5 live)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    if args.mode == "live":
+        run_live(args.clients or 50, args.downtime if args.downtime is not None else 5.0)
+    else:
+        run_simulation(args.clients or 1000, args.downtime if args.downtime is not None else 20.0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Local stand-in for the Phoenix socket, for exercising the clients without a backend.
+
+Speaks enough of the channel protocol (V1 and V2 framing) to answer joins,
+leaves, heartbeats and pushes, sends presence_state on user channels, can
+stream risks:/project:/user:/system traffic at configured rates and payload
+sizes, and can drop or refuse connections on purpose.
+
+Run it on its own (prints its URL on the first line of stdout):
+
+    python -m resolvinator.client.benchmarks.standin_server [--port 4000] [--rate 50] [--payload-size 200]
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import websockets
+
+from ..codec import PhoenixMessage, get_serializer
+from .frames import description, risk_payload
+
+# Seconds between paced sends
+TICK = 0.005
+# Messages sent back to back by an unpaced (rate 0) stream before yielding
+BURST = 64
+
+@dataclass
+class Stream:
+    """Pushes `event` on every joined topic matching `topic`; entries ending in ":" match as prefixes"""
+    topic: str
+    event: str
+    rate: float = 50.0  # messages per second per joined topic; 0 sends as fast as the socket drains
+    payload_size: int = 200
+
+def default_streams(rate: float = 50.0, payload_size: int = 200) -> List[Stream]:
+    """Roughly the production mix: risk churn, fewer mitigations, chat, presence and status"""
+    return [
+        Stream("risks:", "risk:updated", rate, payload_size),
+        Stream("project:", "mitigation:updated", rate / 4, payload_size),
+        Stream("user:", "new_message", rate / 10, payload_size),
+        Stream("user:", "presence_diff", rate / 10),
+        Stream("system", "status", 1.0)
+    ]
+
+def topic_id(topic: str) -> int:
+    """Numeric id after the last ":" of a topic, or 0"""
+    tail = topic.rpartition(":")[2]
+    return int(tail) if tail.isdigit() else 0
+
+class StandinServer:
+    def __init__(self, host: str = "localhost", port: int = 0, streams: Iterable[Stream] = (),
+                 online_users: int = 0, cipher=None):
+        self.host = host
+        self.port = port
+        self.connections: Set = set()
+        self.connect_times: List[float] = []
+        self.accepting = True
+        self.streams = list(streams)
+        # Fernet used to encrypt message content, matching the clients' key; None sends plaintext
+        self.cipher = cipher
+        self.online: Set[int] = set(range(1, online_users + 1))
+        self.online_users = online_users
+        self.pushed = 0
+        # Connections that joined each topic, and the streams running for each connection
+        self.subscribers: Dict[str, Set] = {}
+        self._pumps: Dict[object, Dict[str, List[asyncio.Task]]] = {}
+        self._serializers: Dict[object, object] = {}
+        self._message_ids = itertools.count(1)
+        self._rng = random.Random(1)
+        self._server = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.payloads: Dict[str, Callable[[str, int], dict]] = {
+            "risk:updated": lambda topic, size: risk_payload(self._rng.randrange(1000), topic_id(topic), size),
+            "mitigation:updated": self.mitigation_payload,
+            "new_message": self.message_payload,
+            "presence_diff": self.presence_diff,
+            "status": lambda topic, size: {"connections": len(self.connections), "pushed": self.pushed}
+        }
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, ws, path: str = None):
+        self.connect_times.append(time.monotonic())
+        if not self.accepting:
+            # Server is "restarting": accept the TCP connection, then refuse it
+            await ws.close(code=1013, reason="try again later")
+            return
+
+        request_path = path or getattr(getattr(ws, "request", None), "path", "")
+        vsn = "1.0.0" if "vsn=1.0.0" in request_path else "2.0.0"
+        serializer = get_serializer(vsn)
+        self.connections.add(ws)
+        self._pumps[ws] = {}
+        self._serializers[ws] = serializer
+        try:
+            async for frame in ws:
+                await self.handle_frame(ws, serializer, serializer.decode(frame))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for topic in list(self._pumps.get(ws, ())):
+                self._leave(ws, topic)
+            self._pumps.pop(ws, None)
+            self._serializers.pop(ws, None)
+            self.connections.discard(ws)
+
+    async def reply(self, ws, serializer, message: PhoenixMessage, response: dict, status: str = "ok"):
+        reply = PhoenixMessage(message.topic, "phx_reply", {"status": status, "response": response},
+                               message.ref, message.join_ref)
+        await ws.send(serializer.encode(reply))
+
+    async def handle_frame(self, ws, serializer, message: PhoenixMessage):
+        """Reply ok to every join, leave, heartbeat and push, and act on the ones that matter"""
+        event = message.event
+        if event == "phx_join":
+            await self.reply(ws, serializer, message, {})
+            await self._join(ws, serializer, message)
+        elif event == "phx_leave":
+            self._leave(ws, message.topic)
+            await self.reply(ws, serializer, message, {})
+        elif event == "history":
+            await self.reply(ws, serializer, message, {"messages": self.history(message.topic, message.payload)})
+        elif event == "new_message":
+            payload = self.message_payload(f"user:{message.payload.get('recipient_id', 0)}", 0)
+            payload.update(content=message.payload.get("content", ""),
+                           encrypted=bool(message.payload.get("encrypted")), from_user_id=topic_id(message.topic))
+            await self.reply(ws, serializer, message, {"id": payload["id"]})
+            await self.broadcast(f"user:{payload['to_user_id']}", "new_message", payload)
+        else:
+            await self.reply(ws, serializer, message, {})
+
+    async def _join(self, ws, serializer, message: PhoenixMessage):
+        topic = message.topic
+        self.subscribers.setdefault(topic, set()).add(ws)
+        if topic.startswith("user:") and self.online_users:
+            state = {str(user_id): self.presence(user_id) for user_id in self.online}
+            await ws.send(serializer.encode(PhoenixMessage(topic, "presence_state", state, None, message.join_ref)))
+
+        pumps = self._pumps.setdefault(ws, {}).setdefault(topic, [])
+        for stream in self.streams:
+            if topic == stream.topic or (stream.topic.endswith(":") and topic.startswith(stream.topic)):
+                pumps.append(asyncio.create_task(self._pump(ws, serializer, topic, message.join_ref, stream)))
+
+    def _leave(self, ws, topic: str):
+        self.subscribers.get(topic, set()).discard(ws)
+        for task in self._pumps.get(ws, {}).pop(topic, ()):
+            task.cancel()
+
+    async def _pump(self, ws, serializer, topic: str, join_ref: Optional[str], stream: Stream):
+        """Push a stream's messages on one connection's topic at the stream's rate"""
+        build = self.payloads.get(stream.event, lambda topic, size: {"data": description(size)})
+        started = time.monotonic()
+        sent = 0
+        try:
+            while True:
+                if stream.rate:
+                    due = int((time.monotonic() - started) * stream.rate) - sent
+                    if due <= 0:
+                        await asyncio.sleep(TICK)
+                        continue
+                else:
+                    due = BURST
+                for _ in range(due):
+                    payload = build(topic, stream.payload_size)
+                    # Wall clock, so clients in another process can measure end-to-end latency
+                    payload["sent_at"] = time.time()
+                    await ws.send(serializer.encode(PhoenixMessage(topic, stream.event, payload, None, join_ref)))
+                sent += due
+                self.pushed += due
+                if not stream.rate:
+                    await asyncio.sleep(0)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def broadcast(self, topic: str, event: str, payload: dict):
+        for ws in list(self.subscribers.get(topic, ())):
+            await ws.send(self._serializers[ws].encode(PhoenixMessage(topic, event, payload)))
+
+    # Payloads
+
+    def mitigation_payload(self, topic: str, size: int) -> dict:
+        return {"id": self._rng.randrange(1000), "project_id": topic_id(topic),
+                "status": self._rng.choice(["planned", "in_progress", "done"]), "notes": description(size)}
+
+    def message_payload(self, topic: str, size: int) -> dict:
+        """A chat message to the topic's user from a random peer"""
+        user_id = topic_id(topic)
+        content = description(size)
+        if self.cipher is not None:
+            content = self.cipher.encrypt(content.encode()).decode()
+        return {
+            "id": f"m{next(self._message_ids)}",
+            "from_user_id": user_id + 1 + self._rng.randrange(50),
+            "to_user_id": user_id,
+            "content": content,
+            "encrypted": self.cipher is not None,
+            "read": False,
+            "created_at": datetime.now().isoformat()
+        }
+
+    def history(self, topic: str, params: dict) -> List[dict]:
+        limit = min(int(params.get("limit", 50)), 1000)
+        page = [self.message_payload(topic, 200) for _ in range(limit)]
+        for message in page:
+            message["read"] = True
+        return page
+
+    @staticmethod
+    def presence(user_id: int) -> dict:
+        return {"metas": [{"phx_ref": f"p{user_id}", "online_at": int(time.time())}]}
+
+    def presence_diff(self, topic: str, size: int) -> dict:
+        """Flip one user's presence, out of a population twice the initial online count"""
+        user_id = self._rng.randrange(1, max(self.online_users, 1) * 2 + 1)
+        if user_id in self.online:
+            self.online.discard(user_id)
+            return {"joins": {}, "leaves": {str(user_id): self.presence(user_id)}}
+        self.online.add(user_id)
+        return {"joins": {str(user_id): self.presence(user_id)}, "leaves": {}}
+
+    # Lifecycle
+
+    async def _start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def start(self) -> "StandinServer":
+        """Run the server on a background thread with its own event loop"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="standin-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        logging.info(f"Stand-in Phoenix server listening on {self.url}")
+        return self
+
+    def call(self, coro):
+        """Run a coroutine on the server loop from another thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _drop_all(self, downtime: float):
+        self.accepting = False
+        await asyncio.gather(*(ws.close(code=1012, reason="service restart") for ws in list(self.connections)),
+                             return_exceptions=True)
+        await asyncio.sleep(downtime)
+        self.accepting = True
+
+    def restart(self, downtime: float = 2.0):
+        """Drop every connection and refuse new ones for downtime seconds"""
+        return self.call(self._drop_all(downtime))
+
+    def stop(self):
+        if self._loop is None:
+            return
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+        self.call(shutdown()).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=4000, help="0 picks a free port")
+    parser.add_argument("--rate", type=float, default=50.0, help="risk updates per second per joined topic; 0 is unpaced")
+    parser.add_argument("--payload-size", type=int, default=200, help="description/content length in characters")
+    parser.add_argument("--online-users", type=int, default=100, help="users in presence_state")
+    parser.add_argument("--key", help="32-character message key, as passed to MessagingClient")
+    args = parser.parse_args()
+
+    cipher = None
+    if args.key:
+        from cryptography.fernet import Fernet
+        cipher = Fernet(base64.b64encode(args.key.encode()))
+
+    server = StandinServer(args.host, args.port, default_streams(args.rate, args.payload_size),
+                           args.online_users, cipher).start()
+    print(server.url, flush=True)
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+import time
+
+@dataclass
+class _Window:
+    args: tuple
+    length: float
+    ends: float
+    # Duplicates held back since the window opened
+    repeats: int = 0
+
+class Coalescer:
+    """Merge duplicate emissions that arrive within a window into one.
+
+    The first emission for a key goes out immediately and opens a window;
+    duplicates inside it are only counted. When the window closes, one
+    trailing emission carries the latest arguments and the number of
+    duplicates it stands for, and a new window opens in case the burst
+    continues, so a steady flood comes out at one emission per window.
+    Windows are chosen per group (a title, an event type), with
+    default_window for the rest; a window of 0 turns coalescing off.
+
+    schedule(delay, callback) should call back once the window has passed.
+    Windows that have expired are also closed by the next submit(), so
+    nothing is held forever if the callback never runs.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[tuple, int], None],
+        schedule: Callable[[float, Callable[[], None]], None],
+        default_window: float = 1.0,
+        windows: Optional[Dict[Hashable, float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.emit = emit
+        self.schedule = schedule
+        self.default_window = default_window
+        self.windows: Dict[Hashable, float] = dict(windows or {})
+        self.clock = clock
+        self._open: Dict[Hashable, _Window] = {}
+
+        self.submitted = 0
+        self.emitted = 0
+        self.suppressed = 0
+        self.suppressed_by_group: Dict[Any, int] = {}
+
+    def window_for(self, group: Hashable) -> float:
+        return self.windows.get(group, self.default_window)
+
+    def submit(self, group: Hashable, key: Hashable, args: tuple) -> bool:
+        """Emit now, or count as a duplicate of key; True if emitted now"""
+        self.submitted += 1
+        window = self.window_for(group)
+        if window <= 0:
+            self._emit(args, 0)
+            return True
+
+        now = self.clock()
+        pending = self._open.get(key)
+        if pending is not None and pending.ends <= now:
+            self._close(key)
+            pending = self._open.get(key)
+        if pending is not None:
+            pending.args = args
+            pending.repeats += 1
+            self.suppressed += 1
+            self.suppressed_by_group[group] = self.suppressed_by_group.get(group, 0) + 1
+            return False
+
+        self._emit(args, 0)
+        self._open_window(key, args, window)
+        return True
+
+    def _open_window(self, key: Hashable, args: tuple, window: float):
+        self._open[key] = _Window(args, window, self.clock() + window)
+        self.schedule(window, lambda: self._expire(key))
+
+    def _expire(self, key: Hashable):
+        pending = self._open.get(key)
+        if pending is None:
+            return
+        remaining = pending.ends - self.clock()
+        if remaining <= 0:
+            self._close(key)
+        else:
+            # Timers may fire a little early
+            self.schedule(remaining, lambda: self._expire(key))
+
+    def _close(self, key: Hashable):
+        pending = self._open.pop(key)
+        if pending.repeats:
+            self._emit(pending.args, pending.repeats)
+            # Still flapping, most likely; keep merging at one emission per window
+            self._open_window(key, pending.args, pending.length)
+
+    def _emit(self, args: tuple, repeats: int):
+        self.emitted += 1
+        self.emit(args, repeats)
+
+    def flush(self):
+        """Emit everything held back now, e.g. before shutting down"""
+        for key in list(self._open):
+            pending = self._open.pop(key)
+            if pending.repeats:
+                self._emit(pending.args, pending.repeats)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "emitted": self.emitted,
+            "suppressed": self.suppressed,
+            "open_windows": len(self._open),
+            "suppressed_by_group": dict(self.suppressed_by_group)
+        }
@@ -0,0 +1,334 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+import json
+import inspect
+import logging
+import zlib
+
+# Optional fast JSON backends, picked up automatically when installed
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Frame = Union[str, bytes]
+
+# Largest frame accepted from the server (prevent memory attacks)
+MAX_FRAME_SIZE = 1024 * 1024  # 1MB
+
+# Marks a zlib-compressed JSON payload inside a V2 binary frame
+COMPRESSED_PREFIX = b"zlib:"
+
+# Payload of a decoded frame that had no payload key at all, as opposed to "payload": null
+MISSING_PAYLOAD = object()
+
+@dataclass(slots=True)
+class PhoenixMessage:
+    """Typed Phoenix channel envelope"""
+    topic: Optional[str] = None
+    event: Optional[str] = None
+    payload: Any = None
+    ref: Optional[str] = None
+    join_ref: Optional[str] = None
+
+class FrameDecodeError(ValueError):
+    """Raised when a frame cannot be decoded into a PhoenixMessage"""
+
+class FrameDecoder:
+    """Decode raw Phoenix frames into PhoenixMessage envelopes"""
+    name = "json"
+
+    def __init__(self, loads: Callable[[Frame], Any] = json.loads):
+        self._loads = loads
+
+    def decode(self, frame: Frame) -> PhoenixMessage:
+        try:
+            data = self._loads(frame)
+        except ValueError as e:
+            raise FrameDecodeError(str(e)) from e
+
+        # V2 array form: [join_ref, ref, topic, event, payload]
+        if isinstance(data, list):
+            if len(data) != 5:
+                raise FrameDecodeError("V2 frame must have 5 elements")
+            return PhoenixMessage(data[2], data[3], data[4], data[1], data[0])
+
+        if not isinstance(data, dict):
+            raise FrameDecodeError("Frame is not a JSON object or array")
+
+        get = data.get
+        return PhoenixMessage(
+            get("topic"),
+            get("event"),
+            get("payload", MISSING_PAYLOAD),
+            get("ref"),
+            get("join_ref")
+        )
+
+class OrjsonFrameDecoder(FrameDecoder):
+    """FrameDecoder backed by orjson"""
+    name = "orjson"
+
+    def __init__(self):
+        super().__init__(orjson.loads)
+
+class MsgspecFrameDecoder(FrameDecoder):
+    """Decode frames straight into PhoenixMessage without an intermediate dict.
+
+    Frames whose fields don't match PhoenixMessage's types (an integer ref,
+    say), or whose payload is None and so may be missing, are decoded again
+    untyped, so the result matches the json decoder.
+    """
+    name = "msgspec"
+
+    def __init__(self):
+        super().__init__(msgspec.json.decode)
+        self._decoder = msgspec.json.Decoder(
+            Union[PhoenixMessage, Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Any]]
+        )
+
+    def decode(self, frame: Frame) -> PhoenixMessage:
+        try:
+            message = self._decoder.decode(frame)
+        except msgspec.ValidationError:
+            return super().decode(frame)
+        except msgspec.DecodeError as e:
+            raise FrameDecodeError(str(e)) from e
+
+        if type(message) is tuple:
+            join_ref, ref, topic, event, payload = message
+            return PhoenixMessage(topic, event, payload, ref, join_ref)
+        if message.payload is None:
+            return super().decode(frame)
+        return message
+
+# Registered decoder factories, in order of preference
+DECODERS: Dict[str, Callable[[], FrameDecoder]] = {}
+
+if msgspec is not None:
+    DECODERS["msgspec"] = MsgspecFrameDecoder
+if orjson is not None:
+    DECODERS["orjson"] = OrjsonFrameDecoder
+DECODERS["json"] = FrameDecoder
+
+def register_decoder(name: str, factory: Callable[[], FrameDecoder], preferred: bool = False):
+    """Register a decoder backend, optionally making it the default"""
+    if preferred:
+        others = {k: v for k, v in DECODERS.items() if k != name}
+        DECODERS.clear()
+        DECODERS[name] = factory
+        DECODERS.update(others)
+    else:
+        DECODERS[name] = factory
+
+def available_decoders() -> list:
+    """Names of the decoder backends usable in this environment"""
+    return list(DECODERS)
+
+def get_decoder(name: Optional[str] = None) -> FrameDecoder:
+    """Create a decoder by name, or the fastest available one"""
+    if name is None:
+        name = next(iter(DECODERS))
+    try:
+        factory = DECODERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown frame decoder: {name}")
+    logging.debug(f"Using {name} frame decoder")
+    return factory()
+
+def _compact_dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+def _orjson_dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode()
+
+# Fastest available JSON encoder for outgoing frames, and matching decoder for payloads
+dumps: Callable[[Any], str] = _orjson_dumps if orjson is not None else _compact_dumps
+loads: Callable[[Frame], Any] = orjson.loads if orjson is not None else json.loads
+
+class V1Serializer:
+    """Phoenix 1.0.0 framing: JSON objects with topic/event/payload/ref keys"""
+    vsn = "1.0.0"
+
+    def __init__(self, decoder: Optional[FrameDecoder] = None, dumps: Callable[[Any], str] = dumps):
+        self.decoder = decoder or get_decoder()
+        self._dumps = dumps
+
+    def encode(self, message: PhoenixMessage) -> Frame:
+        return self._dumps({
+            "topic": message.topic,
+            "event": message.event,
+            "payload": message.payload,
+            "ref": message.ref,
+            "join_ref": message.join_ref
+        })
+
+    def decode(self, frame: Frame) -> PhoenixMessage:
+        return self.decoder.decode(frame)
+
+class V2Serializer(V1Serializer):
+    """Phoenix 2.0.0 framing: [join_ref, ref, topic, event, payload] arrays plus binary frames.
+
+    With compress_threshold set, payloads whose JSON is larger than the
+    threshold go out as binary pushes holding COMPRESSED_PREFIX plus the
+    zlib-deflated JSON (see ResolvinatorWeb.CompressedPayload on the server).
+    Compressed payloads received from the server are always inflated.
+    """
+    vsn = "2.0.0"
+
+    # Binary frame kinds and header layout, as in phoenix.js
+    KIND_PUSH = 0
+    KIND_REPLY = 1
+    KIND_BROADCAST = 2
+
+    def __init__(self, decoder: Optional[FrameDecoder] = None, dumps: Callable[[Any], str] = dumps,
+                 compress_threshold: Optional[int] = None, compress_level: int = 6,
+                 max_inflated_size: int = MAX_FRAME_SIZE):
+        super().__init__(decoder, dumps)
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.max_inflated_size = max_inflated_size
+
+    def encode(self, message: PhoenixMessage) -> Frame:
+        """Encode a message; bytes payloads go out as binary push frames"""
+        if isinstance(message.payload, (bytes, bytearray, memoryview)):
+            return self.encode_binary(message)
+        if self.compress_threshold is None:
+            return self._dumps([message.join_ref, message.ref, message.topic, message.event, message.payload])
+
+        # Encode the payload once: it is either compressed or spliced into the array
+        body = self._dumps(message.payload)
+        if len(body) > self.compress_threshold:
+            compressed = COMPRESSED_PREFIX + zlib.compress(body.encode(), self.compress_level)
+            return self.encode_binary(
+                PhoenixMessage(message.topic, message.event, compressed, message.ref, message.join_ref)
+            )
+        header = self._dumps([message.join_ref, message.ref, message.topic, message.event])
+        return f"{header[:-1]},{body}]"
+
+    def encode_binary(self, message: PhoenixMessage) -> bytes:
+        """<<0, join_ref_size, ref_size, topic_size, event_size, join_ref, ref, topic, event, payload>>"""
+        join_ref = (message.join_ref or "").encode()
+        ref = (message.ref or "").encode()
+        topic = message.topic.encode()
+        event = message.event.encode()
+        for field in (join_ref, ref, topic, event):
+            if len(field) > 255:
+                raise ValueError("Binary frame fields are limited to 255 bytes")
+
+        header = bytes((self.KIND_PUSH, len(join_ref), len(ref), len(topic), len(event)))
+        return b"".join((header, join_ref, ref, topic, event, bytes(message.payload)))
+
+    def decode(self, frame: Frame) -> PhoenixMessage:
+        if isinstance(frame, str):
+            return self.decoder.decode(frame)
+        return self.decode_binary(frame)
+
+    def decode_binary(self, frame: bytes) -> PhoenixMessage:
+        """Decode a server push, reply or broadcast binary frame"""
+        try:
+            kind = frame[0]
+            if kind == self.KIND_PUSH:
+                # Server pushes carry no ref
+                join_ref_size, topic_size, event_size = frame[1], frame[2], frame[3]
+                offset = 4
+                join_ref, offset = _read(frame, offset, join_ref_size)
+                topic, offset = _read(frame, offset, topic_size)
+                event, offset = _read(frame, offset, event_size)
+                return PhoenixMessage(topic, event, self._inflate(frame[offset:]), None, join_ref)
+
+            if kind == self.KIND_REPLY:
+                join_ref_size, ref_size, topic_size, status_size = frame[1], frame[2], frame[3], frame[4]
+                offset = 5
+                join_ref, offset = _read(frame, offset, join_ref_size)
+                ref, offset = _read(frame, offset, ref_size)
+                topic, offset = _read(frame, offset, topic_size)
+                status, offset = _read(frame, offset, status_size)
+                payload = {"status": status, "response": self._inflate(frame[offset:])}
+                return PhoenixMessage(topic, "phx_reply", payload, ref, join_ref)
+
+            if kind == self.KIND_BROADCAST:
+                topic_size, event_size = frame[1], frame[2]
+                offset = 3
+                topic, offset = _read(frame, offset, topic_size)
+                event, offset = _read(frame, offset, event_size)
+                return PhoenixMessage(topic, event, self._inflate(frame[offset:]))
+        except (IndexError, UnicodeDecodeError) as e:
+            raise FrameDecodeError(f"Malformed binary frame: {e}") from e
+
+        raise FrameDecodeError(f"Unknown binary frame kind: {kind}")
+
+    def _inflate(self, payload: bytes) -> Any:
+        """Decompress and decode a compressed JSON payload; other binary passes through"""
+        if payload[:len(COMPRESSED_PREFIX)] != COMPRESSED_PREFIX:
+            return payload
+
+        inflater = zlib.decompressobj()
+        try:
+            # Bounded so a small frame can't inflate into unbounded memory
+            body = inflater.decompress(payload[len(COMPRESSED_PREFIX):], self.max_inflated_size)
+        except zlib.error as e:
+            raise FrameDecodeError(f"Malformed compressed payload: {e}") from e
+        if inflater.unconsumed_tail:
+            raise FrameDecodeError(f"Compressed payload inflates past {self.max_inflated_size} bytes")
+        try:
+            return loads(body)
+        except ValueError as e:
+            raise FrameDecodeError(f"Malformed compressed payload: {e}") from e
+
+def _read(frame: bytes, offset: int, size: int) -> Tuple[str, int]:
+    end = offset + size
+    if end > len(frame):
+        raise IndexError("field runs past end of frame")
+    return bytes(frame[offset:end]).decode(), end
+
+SERIALIZERS = {
+    V1Serializer.vsn: V1Serializer,
+    V2Serializer.vsn: V2Serializer
+}
+
+def get_serializer(vsn: str = V2Serializer.vsn, decoder: Optional[FrameDecoder] = None,
+                   **options) -> V1Serializer:
+    """Create the serializer for a Phoenix protocol version; options left as None are ignored"""
+    try:
+        serializer_class = SERIALIZERS[vsn]
+    except KeyError:
+        raise ValueError(f"Unsupported Phoenix serializer version: {vsn}")
+    options = {name: value for name, value in options.items() if value is not None}
+    accepted = inspect.signature(serializer_class.__init__).parameters
+    unsupported = sorted(name for name in options if name not in accepted)
+    if unsupported:
+        raise ValueError(f"The {vsn} serializer doesn't support {', '.join(unsupported)}")
+    return serializer_class(decoder, **options)
+
+class FrameValidator:
+    """Single-pass frame validation: raw size, then decode, then structure"""
+
+    def __init__(self, decoder: Union[FrameDecoder, V1Serializer, None] = None,
+                 max_frame_size: int = MAX_FRAME_SIZE):
+        # Anything with decode(frame) -> PhoenixMessage, usually the client's serializer
+        self.decoder = decoder or get_decoder()
+        self.max_frame_size = max_frame_size
+
+    def validate(self, frame: Frame) -> Optional[PhoenixMessage]:
+        """Return the decoded envelope, or None if the frame is rejected"""
+        # Reject oversized frames before spending any time parsing them. The limit
+        # is in bytes; only text long enough to exceed it once encoded is encoded.
+        size = len(frame)
+        if type(frame) is str and size * 4 > self.max_frame_size >= size:
+            size = len(frame.encode())
+        if size > self.max_frame_size:
+            logging.warning("Message payload too large")
+            return None
+
+        message = self.decoder.decode(frame)
+        if message.topic is None or message.event is None or message.payload is MISSING_PAYLOAD:
+            logging.warning("Invalid message structure")
+            return None
+
+        return message
@@ -0,0 +1,86 @@
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from riskkit.events import EventManager
+from .router import Handler
+from .websocket_client3 import WebSocketClient
+
+class ChannelHandle:
+    """One subscriber's reference to a channel on a shared socket.
+
+    Handlers registered with on() only see this channel's events and are
+    removed again by leave(), which also drops the channel reference.
+    """
+
+    def __init__(self, client: WebSocketClient, topic: str, joined: Optional[Future]):
+        self.client = client
+        self.topic = topic
+        # Resolves with the join reply; None if the socket wasn't connected yet
+        self.joined = joined
+        self.closed = False
+        self._routes: List[Tuple[str, Handler]] = []
+
+    def on(self, event: str, handler: Handler) -> "ChannelHandle":
+        """Call handler with every PhoenixMessage for event ("*" for all) on this channel"""
+        self.client.router.register(self.topic, event, handler)
+        self._routes.append((event, handler))
+        return self
+
+    def push(self, event: str, payload: Any = None) -> Future:
+        """Push an event; the future resolves with the server's reply"""
+        return self.client.protocol.request(self.topic, event, payload)
+
+    def leave(self):
+        if self.closed:
+            return
+        self.closed = True
+        for event, handler in self._routes:
+            self.client.router.unregister(self.topic, event, handler)
+        self._routes.clear()
+        self.client.leave_channel(self.topic)
+
+class ConnectionManager:
+    """One multiplexed WebSocketClient per server, shared by every part of the app.
+
+    Components ask for channel handles instead of opening their own sockets;
+    the protocol reference-counts joins, so a channel is joined once however
+    many handles hold it and left when the last one lets go.
+    """
+
+    def __init__(self, base_url: str, token: str, event_manager: EventManager = None, **client_options):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.event_manager = event_manager
+        self.client_options = client_options
+        self._clients: Dict[str, WebSocketClient] = {}
+
+    def client(self, base_url: Optional[str] = None) -> WebSocketClient:
+        """The shared client for a server, created on first use"""
+        base_url = (base_url or self.base_url).rstrip("/")
+        client = self._clients.get(base_url)
+        if client is None:
+            client = WebSocketClient(base_url, self.token, self.event_manager, **self.client_options)
+            self._clients[base_url] = client
+            logging.info(f"Opened shared connection to {base_url}")
+        return client
+
+    def channel(self, topic: str, params: Optional[dict] = None, base_url: Optional[str] = None) -> ChannelHandle:
+        """Take a handle on a channel, joining it if nobody holds it yet"""
+        client = self.client(base_url)
+        return ChannelHandle(client, topic, client.join_channel(topic, params))
+
+    def connect_all(self):
+        for client in self._clients.values():
+            client.connect_to_server()
+
+    def disconnect_all(self):
+        for client in self._clients.values():
+            client.disconnect()
+
+    def connection_count(self) -> int:
+        return len(self._clients)
+
+    def inbound_stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Inbound lane counters for each server"""
+        return {base_url: client.inbound_stats() for base_url, client in self._clients.items()}
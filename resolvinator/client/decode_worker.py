@@ -0,0 +1,133 @@
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+import logging
+import queue
+import threading
+
+from .codec import Frame, PhoenixMessage
+from .inbound_queue import InboundQueue
+
+_STOP = object()
+
+class _FifoOutbox:
+    """Arrival-order outbox used when no InboundQueue is given"""
+
+    def __init__(self):
+        self._items: Deque[PhoenixMessage] = deque()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, message: PhoenixMessage) -> bool:
+        self._items.append(message)
+        return True
+
+    def take(self, limit: Optional[int] = None) -> Tuple[List[PhoenixMessage], bool]:
+        items = self._items
+        if limit is None or limit >= len(items):
+            batch = list(items)
+            items.clear()
+        else:
+            batch = [items.popleft() for _ in range(limit)]
+        return batch, bool(items)
+
+class DecodeWorker:
+    """Decode and validate frames on a background thread, handing results back in batches.
+
+    The socket's thread calls submit() for every frame; the worker runs
+    decode() on it and appends the result to an outbox. notify() is called
+    only when the outbox goes from empty to non-empty, so however fast frames
+    arrive the consumer sees one wake-up per drain, and take() returns
+    everything decoded since. A single worker keeps frames in arrival order,
+    unless an InboundQueue outbox reorders them by priority lane.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[Frame], Optional[PhoenixMessage]],
+        notify: Callable[[], None],
+        name: str = "frame-decoder",
+        outbox: Optional[InboundQueue] = None
+    ):
+        self.decode = decode
+        self.notify = notify
+        self.name = name
+        self._inbox: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.outbox = outbox if outbox is not None else _FifoOutbox()
+        self._lock = threading.Lock()
+        self._notified = False
+        self._thread: Optional[threading.Thread] = None
+        # Set by stop(); a start() before the thread reaches _STOP cancels it
+        self._stopping = False
+
+        self.decoded = 0
+        self.rejected = 0
+        self.batches = 0
+        # Decoded but refused by the outbox's overflow policy
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            self._stopping = False
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Finish the frames already submitted, waiting at most timeout for the thread to exit"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        with self._lock:
+            self._stopping = True
+        self._inbox.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            logging.warning(f"{self.name} still decoding after {timeout}s; it exits when the backlog is done")
+
+    def submit(self, frame: Frame):
+        self._inbox.put(frame)
+
+    def take(self, limit: Optional[int] = None) -> Tuple[List[PhoenixMessage], bool]:
+        """Decoded messages in outbox order, and whether more are waiting past limit"""
+        with self._lock:
+            batch, more = self.outbox.take(limit)
+            if not more:
+                self._notified = False
+        if batch:
+            self.batches += 1
+        return batch, more
+
+    def _run(self):
+        while True:
+            frame = self._inbox.get()
+            if frame is _STOP:
+                with self._lock:
+                    if not self._stopping:
+                        continue
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                return
+            try:
+                message = self.decode(frame)
+            except Exception as e:
+                logging.error(f"Error decoding frame: {e}")
+                message = None
+            if message is None:
+                self.rejected += 1
+                continue
+
+            self.decoded += 1
+            with self._lock:
+                if not self.outbox.put(message):
+                    self.dropped += 1
+                    continue
+                wake = not self._notified
+                self._notified = True
+            if wake:
+                self.notify()
@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+import logging
+import time
+
+from .events import EventPriority
+from .instrumentation import Histogram
+
+class PriorityDispatcher:
+    """Deliver callbacks by priority in time-capped slices, one slice per event-loop tick.
+
+    post() queues a callback in its priority's lane and schedules a drain;
+    each drain runs the highest lanes first and stops once slice_budget
+    seconds have gone, leaving the rest for the next tick so the loop can
+    repaint and handle input in between. CRITICAL callbacks run at once,
+    ahead of anything queued. The time each callback spent queued is
+    recorded per priority. A drain entered again while one is running (from
+    a modal dialog's nested event loop, or a scheduler that calls at once)
+    does nothing; the outer drain schedules the next one once it returns,
+    so callbacks never interleave.
+    """
+
+    def __init__(
+        self,
+        schedule: Callable[[Callable[[], None]], None],
+        slice_budget: float = 0.004,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        self._schedule = schedule
+        self.slice_budget = slice_budget
+        self.clock = clock
+        # Highest priority first
+        self._lanes: Dict[EventPriority, Deque[Tuple[float, Callable, tuple]]] = {
+            priority: deque() for priority in sorted(EventPriority, key=lambda p: p.value, reverse=True)
+            if priority != EventPriority.CRITICAL
+        }
+        self._drain_scheduled = False
+        self._draining = False
+
+        self.waits: Dict[EventPriority, Histogram] = {priority: Histogram() for priority in EventPriority}
+        self.slices = Histogram()
+        self.dispatched = 0
+        self.deferred_ticks = 0
+
+    def post(self, priority: EventPriority, callback: Callable, *args: Any):
+        if priority == EventPriority.CRITICAL:
+            self.waits[priority].record(0.0)
+            self._run(callback, args)
+            return
+        self._lanes[priority].append((self.clock(), callback, args))
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            self._schedule(self.drain)
+
+    def _run(self, callback: Callable, args: tuple):
+        self.dispatched += 1
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Event handler {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def drain(self):
+        """Run queued callbacks until the slice budget is spent"""
+        if self._draining:
+            # Rescheduling from here would spin a 0 ms timer for as long as the dialog is open
+            return
+        self._drain_scheduled = False
+        self._draining = True
+        started = self.clock()
+        deadline = started + self.slice_budget
+        try:
+            for priority, lane in self._lanes.items():
+                waits = self.waits[priority]
+                while lane:
+                    queued_at, callback, args = lane.popleft()
+                    waits.record(self.clock() - queued_at)
+                    self._run(callback, args)
+                    if self.clock() >= deadline:
+                        break
+                if self.clock() >= deadline:
+                    break
+        finally:
+            self._draining = False
+        self.slices.record(self.clock() - started)
+
+        # Posts made by the callbacks may have scheduled drains that returned above
+        self._drain_scheduled = False
+        if self.pending():
+            self.deferred_ticks += 1
+            self._drain_scheduled = True
+            self._schedule(self.drain)
+
+    def pending(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def flush(self):
+        """Run everything queued now, ignoring the budget"""
+        for priority, lane in self._lanes.items():
+            while lane:
+                queued_at, callback, args = lane.popleft()
+                self.waits[priority].record(self.clock() - queued_at)
+                self._run(callback, args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "dispatched": self.dispatched,
+            "pending": {priority.name: len(lane) for priority, lane in self._lanes.items()},
+            "deferred_ticks": self.deferred_ticks,
+            "slice_p99": self.slices.quantile(0.99),
+            "wait": {priority.name: waits.snapshot() for priority, waits in self.waits.items()}
+        }
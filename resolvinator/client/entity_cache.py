@@ -0,0 +1,259 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+# Entity kinds carried by each topic prefix, in sync replies and events
+TOPIC_KINDS = {
+    "risks": ("risk",),
+    "project": ("mitigation", "task")
+}
+
+# Event actions that remove the entity; every other action upserts it
+DELETE_ACTIONS = ("deleted",)
+
+Key = Tuple[str, Any]
+
+def topic_project(topic: str) -> Optional[Any]:
+    """Project id of a "risks:12" / "risks:<uuid>" topic; numeric ids come back as ints"""
+    tail = topic.partition(":")[2]
+    if not tail:
+        return None
+    return int(tail) if tail.isdigit() else tail
+
+class EntityCache:
+    """Risks, mitigations and tasks kept by id, updated from channel events and resyncs.
+
+    Every entity carries a version: its "version" field if the server sends
+    one, else its "updated_at". An event older than what is stored, or a
+    repeat of it, changes nothing, so replays after a reconnect are
+    harmless; versioned deletes leave a tombstone so a late update can't
+    bring an entity back, kept until a rejoin's reply acknowledges a
+    "since" at or after it. Each topic remembers the newest version it has seen, and
+    join_params() sends it as "since" when the channel is rejoined. The
+    server then replies with only what changed, plus the ids that still
+    exist so deletions made while offline are dropped, or with a full
+    snapshot when it can't serve a delta.
+
+    Sync replies look like
+        {"version": V, "risk": {"changes": [...], "ids": [...]}}  or
+        {"version": V, "risk": {"snapshot": [...]}}
+    with one section per kind the topic carries.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[str, str, dict], None]] = None):
+        self.on_change = on_change
+        self._entities: Dict[Key, dict] = {}
+        self._versions: Dict[Key, Any] = {}
+        self._deleted: Dict[Key, Any] = {}
+        # topic -> keys tombstoned by its events, pruned once a rejoin acknowledges them
+        self._tombstoned: Dict[str, Set[Key]] = {}
+        # topic -> "since" sent with the join awaiting its reply
+        self._requested: Dict[str, Any] = {}
+        # project_id -> kind -> ids, for per-project views
+        self._by_project: Dict[Optional[int], Dict[str, Set[Any]]] = {}
+        self._project_of: Dict[Key, Optional[int]] = {}
+        # topic -> newest version seen on it
+        self.cursors: Dict[str, Any] = {}
+
+        self.applied = 0
+        self.ignored = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._entities
+
+    def get(self, kind: str, entity_id: Any) -> Optional[dict]:
+        return self._entities.get((kind, entity_id))
+
+    def by_project(self, project_id: int, kind: str = "risk") -> List[dict]:
+        """Cached entities of one kind in a project"""
+        ids = self._by_project.get(project_id, {}).get(kind, ())
+        return [self._entities[(kind, entity_id)] for entity_id in ids]
+
+    def project_ids(self) -> List[int]:
+        return [project_id for project_id, kinds in self._by_project.items()
+                if project_id is not None and any(kinds.values())]
+
+    # Versions
+
+    @staticmethod
+    def version_of(payload: dict) -> Any:
+        version = payload.get("version")
+        return version if version is not None else payload.get("updated_at")
+
+    @staticmethod
+    def _newer(version: Any, than: Any) -> bool:
+        """Whether version is at least `than`; unversioned data always wins"""
+        if version is None or than is None:
+            return True
+        try:
+            return version >= than
+        except TypeError:
+            return True
+
+    @staticmethod
+    def _after(version: Any, than: Any) -> bool:
+        """Whether version is strictly later than a tombstone's; unversioned data never is"""
+        if version is None or than is None:
+            return False
+        try:
+            return version > than
+        except TypeError:
+            return False
+
+    def _advance(self, topic: str, version: Any):
+        current = self.cursors.get(topic)
+        if version is not None and (current is None or self._newer(version, current)):
+            self.cursors[topic] = version
+
+    def join_params(self, topic: str) -> dict:
+        """Params for (re)joining topic: the newest version seen, if any"""
+        since = self.cursors.get(topic)
+        if since is None:
+            self._requested.pop(topic, None)
+            return {}
+        self._requested[topic] = since
+        return {"since": since}
+
+    # Updates
+
+    def apply(self, topic: str, event: str, payload: dict) -> Optional[dict]:
+        """Apply a "kind:action" event; returns the entity if anything changed"""
+        kind, _, action = event.partition(":")
+        entity_id = payload.get("id") if isinstance(payload, dict) else None
+        if entity_id is None:
+            return None
+        version = self.version_of(payload)
+        changed = self._remove(kind, entity_id, version, topic, payload) if action in DELETE_ACTIONS \
+            else self._upsert(kind, payload, topic_project(topic), version)
+        self._advance(topic, version)
+        if changed is None:
+            self.ignored += 1
+            return None
+        self.applied += 1
+        if self.on_change:
+            self.on_change(kind, action, changed)
+        return changed
+
+    def _upsert(self, kind: str, payload: dict, project_id: Optional[int], version: Any) -> Optional[dict]:
+        key = (kind, payload["id"])
+        if key in self._deleted and not self._after(version, self._deleted[key]):
+            return None
+        current = self._entities.get(key)
+        if current is not None and (current == payload or not self._newer(version, self._versions.get(key))):
+            return None
+
+        self._deleted.pop(key, None)
+        self._entities[key] = payload
+        self._versions[key] = version
+        project_id = payload.get("project_id", project_id)
+        previous = self._project_of.get(key)
+        if previous != project_id:
+            self._unindex(key)
+            self._by_project.setdefault(project_id, {}).setdefault(kind, set()).add(key[1])
+            self._project_of[key] = project_id
+        return payload
+
+    def _remove(self, kind: str, entity_id: Any, version: Any, topic: Optional[str] = None,
+                payload: Optional[dict] = None) -> Optional[dict]:
+        """Drop an entity; a delete event from topic with a version leaves a tombstone.
+
+        A delete for an id that isn't cached still counts, with the event's
+        payload as the entity, since views may show it from elsewhere; only
+        a repeat of a delete already tombstoned at that version or later is ignored.
+        """
+        key = (kind, entity_id)
+        entity = self._entities.pop(key, None)
+        if entity is None and (payload is None or
+                               (key in self._deleted and not self._after(version, self._deleted[key]))):
+            return None
+        # An unversioned tombstone could never be outdated, so it would block the id for good
+        if topic is not None and version is not None:
+            self._deleted[key] = version
+            self._tombstoned.setdefault(topic, set()).add(key)
+        if entity is None:
+            return payload
+        self._versions.pop(key, None)
+        self._unindex(key)
+        return entity
+
+    def _unindex(self, key: Key):
+        project_id = self._project_of.pop(key, None)
+        ids = self._by_project.get(project_id, {}).get(key[0])
+        if ids is not None:
+            ids.discard(key[1])
+
+    def apply_sync(self, topic: str, response: dict) -> int:
+        """Apply a join reply carrying changes or a snapshot; returns how many entities changed"""
+        if not isinstance(response, dict):
+            return 0
+        project_id = topic_project(topic)
+        acknowledged = self._requested.pop(topic, None)
+        changed = 0
+        for kind in TOPIC_KINDS.get(topic.partition(":")[0], ()):
+            section = response.get(kind)
+            if not isinstance(section, dict):
+                continue
+            if "snapshot" in section:
+                changed += self._replace(kind, project_id, section["snapshot"], topic)
+                continue
+            for payload in section.get("changes", ()):
+                if self.apply(topic, f"{kind}:updated", payload) is not None:
+                    changed += 1
+            if "ids" in section:
+                changed += self._retain(kind, project_id, section["ids"])
+
+        self._advance(topic, response.get("version"))
+        if acknowledged is not None:
+            self._prune(topic, acknowledged)
+        if changed:
+            logging.info(f"Resynced {topic}: {changed} entities changed")
+        return changed
+
+    def _replace(self, kind: str, project_id: Optional[int], snapshot: Iterable[dict], topic: str) -> int:
+        """Make the project's entities of `kind` exactly the snapshot"""
+        snapshot = list(snapshot)
+        for payload in snapshot:
+            self._deleted.pop((kind, payload["id"]), None)
+        changed = self._retain(kind, project_id, [payload["id"] for payload in snapshot])
+        for payload in snapshot:
+            if self.apply(topic, f"{kind}:updated", payload) is not None:
+                changed += 1
+        return changed
+
+    def _retain(self, kind: str, project_id: Optional[int], ids: Iterable[Any]) -> int:
+        """Drop cached entities of the project that the server no longer has"""
+        keep = set(ids)
+        gone = [entity_id for entity_id in self._by_project.get(project_id, {}).get(kind, ()) if entity_id not in keep]
+        for entity_id in gone:
+            # No tombstone: the server's list is authoritative, and a later snapshot may list the id again
+            entity = self._remove(kind, entity_id, None)
+            if self.on_change and entity is not None:
+                self.on_change(kind, "deleted", entity)
+        return len(gone)
+
+    def _prune(self, topic: str, since: Any):
+        """Forget the topic's tombstones at or before a "since" the server has answered"""
+        keys = self._tombstoned.get(topic)
+        if not keys:
+            return
+        for key in list(keys):
+            version = self._deleted.get(key)
+            if version is None or not self._after(version, since):
+                keys.discard(key)
+                self._deleted.pop(key, None)
+
+    def clear(self):
+        self._entities.clear()
+        self._versions.clear()
+        self._deleted.clear()
+        self._tombstoned.clear()
+        self._requested.clear()
+        self._by_project.clear()
+        self._project_of.clear()
+        self.cursors.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entities": len(self._entities), "tombstones": len(self._deleted),
+                "projects": len(self.project_ids()), "applied": self.applied, "ignored": self.ignored}
@@ -1,7 +1,12 @@
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, Qt, pyqtSignal
 from enum import Enum
 from typing import Optional, Dict, Any
 import logging
+from .heartbeat import LatencyHistogram
+from .events import EventPriority
+from .operations import DrainReport, Operation, OperationRegistry, OperationState
+from .coalesce import Coalescer
+from .dispatcher import PriorityDispatcher
 
 class SystemEvent(Enum):
     RESTART_REQUESTED = "restart_requested"
@@ -10,41 +15,159 @@ class SystemEvent(Enum):
     MAINTENANCE_ENDED = "maintenance_ended"
     NEWS_BROADCAST = "news_broadcast"
     ERROR_BROADCAST = "error_broadcast"
+    UPDATE_AVAILABLE = "update_available"
+    DISK_SPACE_LOW = "disk_space_low"
+    SESSION_EXPIRED = "session_expired"
 
-class EventPriority(Enum):
-    LOW = 0
-    NORMAL = 1
-    HIGH = 2
-    CRITICAL = 3
+# Published as CRITICAL unless the caller says otherwise: never merged or queued
+URGENT_EVENTS = (SystemEvent.RESTART_REQUESTED, SystemEvent.SHUTDOWN_REQUESTED)
 
 class EventManager(QObject):
     # System-wide signals
     system_event = pyqtSignal(SystemEvent, dict)  # event_type, event_data
     news_broadcast = pyqtSignal(str, str, EventPriority)  # title, message, priority
     operation_interrupted = pyqtSignal()
-    
-    def __init__(self):
+    operation_finished = pyqtSignal(str, str, float)  # name, final state, runtime seconds
+    # Raised from any thread when an operation with a deadline is registered
+    _deadline_added = pyqtSignal()
+
+    def __init__(self, drain_budget: float = 2.0, coalesce_window: float = 1.0,
+                 news_windows: Optional[Dict[str, float]] = None,
+                 system_windows: Optional[Dict[SystemEvent, float]] = None,
+                 dispatch_budget: float = 0.004):
         super().__init__()
-        self._active_operations: set = set()
+        # News and system events reach their handlers highest priority first, at
+        # most dispatch_budget seconds' worth per event-loop tick; CRITICAL at once
+        self.dispatcher = PriorityDispatcher(self._schedule_dispatch, dispatch_budget)
+
+        # Identical news and system events within a window (by title / event type,
+        # coalesce_window otherwise) go out once, then once more with a repeat count
+        self._news = Coalescer(self._emit_news, self._schedule_window, coalesce_window, news_windows)
+        self._system = Coalescer(self._emit_system_event, self._schedule_window, coalesce_window, system_windows)
+
+        # Running operations with their handles; finished from whichever thread runs them
+        self.operations = OperationRegistry(on_finished=self._on_operation_finished)
+        self.drain_budget = drain_budget
         self._is_shutting_down = False
+        # Heartbeat round trips recorded by the WebSocket clients
+        self.link_latency = LatencyHistogram()
+
+        # Cancels operations at their deadline; armed for the nearest one only
+        self._deadline_timer = QTimer(self)
+        self._deadline_timer.setSingleShot(True)
+        self._deadline_timer.timeout.connect(self._cancel_expired)
+        self._deadline_added.connect(self._arm_deadline_timer, Qt.ConnectionType.QueuedConnection)
+
+    def register_operation(self, operation_id: Optional[str] = None, handle: Any = None,
+                           timeout: Optional[float] = None, name: str = "") -> Operation:
+        """Register an ongoing operation.
 
-    def register_operation(self, operation_id: str):
-        """Register an ongoing operation"""
-        self._active_operations.add(operation_id)
+        handle is what runs it (asyncio task, concurrent Future, QThread or
+        anything with cancel()); its token is on the returned Operation for
+        work that checks cancellation itself. Safe to call from any thread.
+        """
+        operation = self.operations.register(operation_id, handle, name, timeout)
+        if timeout is not None:
+            self._deadline_added.emit()
+        return operation
 
-    def unregister_operation(self, operation_id: str):
-        """Mark an operation as completed"""
-        self._active_operations.discard(operation_id)
+    def unregister_operation(self, operation_id: str, state: OperationState = OperationState.DONE):
+        """Mark an operation as ended, completed unless state says otherwise"""
+        self.operations.finish(operation_id, state)
+
+    def cancel_operation(self, operation_id: str, reason: str = "cancelled") -> bool:
+        return self.operations.cancel(operation_id, reason)
 
     def has_active_operations(self) -> bool:
         """Check if there are any ongoing operations"""
-        return len(self._active_operations) > 0
+        return len(self.operations) > 0
+
+    def drain_operations(self, budget: Optional[float] = None, reason: str = "shutting down") -> DrainReport:
+        """Cancel every operation and wait at most budget seconds for them to stop"""
+        return self.operations.drain(self.drain_budget if budget is None else budget, reason)
+
+    def _on_operation_finished(self, operation: Operation):
+        self.operation_finished.emit(operation.name, operation.state.value, operation.runtime)
+
+    def _arm_deadline_timer(self):
+        deadline = self.operations.next_deadline()
+        if deadline is None:
+            self._deadline_timer.stop()
+            return
+        delay = max(0.0, deadline - self.operations.clock())
+        if not self._deadline_timer.isActive() or delay * 1000 < self._deadline_timer.remainingTime():
+            self._deadline_timer.start(int(delay * 1000) + 1)
+
+    def _cancel_expired(self):
+        expired = self.operations.cancel_expired()
+        if expired:
+            logging.warning(f"Cancelled {expired} operations past their deadline")
+        self._arm_deadline_timer()
+
+    def link_latency_stats(self) -> Dict[str, Optional[float]]:
+        """Rolling p50/p95/p99 heartbeat round-trip times, in seconds"""
+        return self.link_latency.snapshot()
 
     def broadcast_news(self, title: str, message: str, priority: EventPriority = EventPriority.NORMAL):
-        """Broadcast a news message to all components"""
-        self.news_broadcast.emit(title, message, priority)
+        """Broadcast a news message to all components; repeats within the title's window are merged"""
+        if priority == EventPriority.CRITICAL:
+            self._emit_news((title, message, priority), 0)
+            return
+        self._news.submit(title, (title, message, priority), (title, message, priority))
+
+    def _emit_news(self, args: tuple, repeats: int):
+        title, message, priority = args
+        if repeats:
+            message = f"{message} (repeated {repeats} more {'time' if repeats == 1 else 'times'})"
+        self.dispatcher.post(priority, self.news_broadcast.emit, title, message, priority)
         logging.info(f"News broadcast: {title} - {message}")
 
+    def publish_system_event(self, event: SystemEvent, data: Optional[dict] = None,
+                             priority: Optional[EventPriority] = None):
+        """Emit system_event, merging repeats within the event type's window.
+
+        The trailing emission for a burst carries "repeat_count" in its data.
+        """
+        data = data or {}
+        if priority is None:
+            priority = EventPriority.CRITICAL if event in URGENT_EVENTS else EventPriority.NORMAL
+        if priority == EventPriority.CRITICAL:
+            self._emit_system_event((event, data, priority), 0)
+            return
+        self._system.submit(event, (event, repr(sorted(data.items(), key=repr))), (event, data, priority))
+
+    def _emit_system_event(self, args: tuple, repeats: int):
+        event, data, priority = args
+        self.dispatcher.post(priority, self.system_event.emit, event,
+                             {**data, "repeat_count": repeats} if repeats else data)
+
+    @staticmethod
+    def _schedule_dispatch(drain):
+        # Without a Qt event loop (the asyncio client) events are delivered straight away
+        if QCoreApplication.instance() is not None:
+            QTimer.singleShot(0, drain)
+        else:
+            drain()
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """Queue depth per priority, slice times and how long events waited"""
+        return self.dispatcher.stats()
+
+    @staticmethod
+    def _schedule_window(delay: float, callback):
+        # Without a Qt event loop (the asyncio client) windows close on the next submit instead
+        if QCoreApplication.instance() is not None:
+            QTimer.singleShot(int(delay * 1000) + 1, callback)
+
+    def coalesce_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Submitted, emitted and suppressed counts for news and system events"""
+        return {"news": self._news.stats(), "system": self._system.stats()}
+
+    def flush_coalesced(self):
+        """Emit every held-back repeat now"""
+        self._news.flush()
+        self._system.flush()
+
     def request_restart(self, reason: str = "", force: bool = False):
         """Request application restart"""
         if self.has_active_operations() and not force:
@@ -56,12 +179,17 @@ class EventManager(QObject):
             return False
         
         self._is_shutting_down = True
-        self.system_event.emit(SystemEvent.RESTART_REQUESTED, {"reason": reason})
+        if self.has_active_operations():
+            # Bounded: whatever hasn't stopped within the budget is abandoned
+            self.drain_operations(reason=f"restart: {reason}" if reason else "restart")
+        self.dispatcher.post(EventPriority.CRITICAL, self.system_event.emit,
+                             SystemEvent.RESTART_REQUESTED, {"reason": reason})
         self.operation_interrupted.emit()
         return True
 
-    def interrupt_operations(self):
-        """Interrupt all ongoing operations"""
-        if self._active_operations:
+    def interrupt_operations(self) -> int:
+        """Cancel all ongoing operations without waiting; they unregister as they stop"""
+        cancelled = self.operations.cancel_all("interrupted")
+        if cancelled:
             self.operation_interrupted.emit()
-            self._active_operations.clear() 
\ No newline at end of file
+        return cancelled 
\ No newline at end of file
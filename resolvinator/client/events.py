@@ -45,6 +45,12 @@ class SystemEvent(Enum):
     HIGH_CPU_USAGE = auto()
     DISK_SPACE_LOW = auto()
 
+class EventPriority(Enum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+    CRITICAL = 3
+
 class NotificationPriority(Enum):
     DEBUG = 0
     INFO = 1
@@ -0,0 +1,93 @@
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import heapq
+import itertools
+import time
+
+class ExpiryScheduler:
+    """Deadlines in a min-heap, with one timer armed for the earliest.
+
+    schedule() and the expiry of each key cost O(log n); cancel() is O(1)
+    and leaves the heap entry behind, skipped when it reaches the top (the
+    heap is rebuilt once stale entries outnumber live ones). Whenever the
+    earliest deadline changes, arm() is called with the time to wake up,
+    or with None when nothing is left, so the owner can re-arm its single
+    timer. With a resolution, the wake-up comes that much after the
+    earliest deadline, so expiries close together share one wake-up and
+    none is later than the resolution.
+    """
+
+    def __init__(
+        self,
+        arm: Optional[Callable[[Optional[float]], None]] = None,
+        resolution: float = 0.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.arm = arm
+        self.resolution = resolution
+        self.clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._deadlines: Dict[Hashable, float] = {}
+        self._sequence = itertools.count()
+        self._armed: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        return self._deadlines.get(key)
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Expire key at deadline, replacing any deadline it had"""
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+        if self._armed is None or deadline < self._armed:
+            self._rearm()
+
+    def cancel(self, key: Hashable) -> bool:
+        if self._deadlines.pop(key, None) is None:
+            return False
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._deadlines):
+            self._compact()
+        return True
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._deadlines.get(entry[2]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_deadline(self) -> Optional[float]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now: Optional[float] = None) -> List[Hashable]:
+        """Keys whose deadline has passed, earliest first; re-arms for the next one"""
+        now = self.clock() if now is None else now
+        expired = []
+        heap, deadlines = self._heap, self._deadlines
+        while heap and heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(heap)
+            if deadlines.get(key) == deadline:
+                del deadlines[key]
+                expired.append(key)
+        # The owner's timer has just fired, so arm it even if the deadline is unchanged
+        self._rearm(force=True)
+        return expired
+
+    def _rearm(self, force: bool = False):
+        deadline = self.next_deadline()
+        if force or deadline != self._armed:
+            self._armed = deadline
+            if self.arm:
+                self.arm(None if deadline is None else deadline + self.resolution)
+
+    def clear(self):
+        self._heap.clear()
+        self._deadlines.clear()
+        self._rearm()
@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Callable, Dict, Optional
+import logging
+import time
+
+from .codec import PhoenixMessage
+
+HEARTBEAT_TOPIC = "phoenix"
+HEARTBEAT_EVENT = "heartbeat"
+
+class LatencyHistogram:
+    """Rolling window of round-trip samples with percentile queries.
+
+    Recording is O(1); percentiles sort the window when asked, which only
+    happens when someone looks at the numbers.
+    """
+
+    def __init__(self, size: int = 256):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+        self.last: Optional[float] = None
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+        self.last = seconds
+
+    @staticmethod
+    def _pick(ordered: list, pct: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        return self._pick(sorted(self._samples), pct)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 plus min/max/last of the current window, in seconds"""
+        if not self._samples:
+            return {"count": self.count, "p50": None, "p95": None, "p99": None,
+                    "min": None, "max": None, "last": None}
+        ordered = sorted(self._samples)
+        return {
+            "count": self.count,
+            "p50": self._pick(ordered, 50),
+            "p95": self._pick(ordered, 95),
+            "p99": self._pick(ordered, 99),
+            "min": ordered[0],
+            "max": ordered[-1],
+            "last": self.last
+        }
+
+    def describe(self) -> str:
+        stats = self.snapshot()
+        if stats["p50"] is None:
+            return "no samples"
+        return (f"p50={stats['p50'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms "
+                f"p99={stats['p99'] * 1000:.1f}ms over {len(self._samples)} heartbeats")
+
+class Heartbeat:
+    """Phoenix heartbeat bookkeeping, driven by the client's own timer.
+
+    Call tick() once per interval and send what it returns. If the previous
+    heartbeat is still unanswered when the next tick comes round, tick()
+    returns None and the connection should be treated as dead.
+    """
+
+    def __init__(
+        self,
+        next_ref: Callable[[], str],
+        interval: float = 30.0,
+        histogram: Optional[LatencyHistogram] = None,
+        clock: Callable[[], float] = time.monotonic,
+        log_every: int = 10
+    ):
+        self.next_ref = next_ref
+        self.interval = interval
+        self.histogram = histogram if histogram is not None else LatencyHistogram()
+        self.clock = clock
+        self.log_every = log_every
+        self.pending_ref: Optional[str] = None
+        self.sent_at = 0.0
+        self.missed = 0
+
+    def tick(self) -> Optional[PhoenixMessage]:
+        """Next heartbeat to send, or None if the last one was never answered"""
+        if self.pending_ref is not None:
+            self.missed += 1
+            self.pending_ref = None
+            logging.warning(f"Heartbeat not answered within {self.interval:.0f}s")
+            return None
+
+        self.pending_ref = self.next_ref()
+        self.sent_at = self.clock()
+        return PhoenixMessage(HEARTBEAT_TOPIC, HEARTBEAT_EVENT, {}, self.pending_ref, None)
+
+    def handle_reply(self, message: PhoenixMessage) -> Optional[float]:
+        """Record the round trip if this is our heartbeat's reply"""
+        if message.topic != HEARTBEAT_TOPIC or message.ref != self.pending_ref or message.ref is None:
+            return None
+
+        rtt = self.clock() - self.sent_at
+        self.pending_ref = None
+        self.histogram.record(rtt)
+        if self.log_every and self.histogram.count % self.log_every == 0:
+            logging.info(f"Link latency {self.histogram.describe()}")
+        return rtt
+
+    def reset(self):
+        """Forget the outstanding heartbeat, e.g. after a reconnect"""
+        self.pending_ref = None
@@ -0,0 +1,186 @@
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+import itertools
+
+from .codec import PhoenixMessage
+from .events import EventPriority
+from .rate_limiter import DEFAULT_EXEMPT_EVENTS
+
+class OverflowPolicy(Enum):
+    DROP_NEWEST = "drop_newest"  # refuse the arriving message
+    DROP_OLDEST = "drop_oldest"  # evict the longest-waiting message
+    COALESCE = "coalesce"        # replace the entity's latest queued message if it's the same event, else evict the oldest
+
+@dataclass(frozen=True)
+class Lane:
+    name: str
+    priority: EventPriority
+    capacity: int
+    policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    # Topics routed to this lane; entries ending in ":" match as prefixes
+    topics: Tuple[str, ...] = ()
+
+DEFAULT_LANES = (
+    Lane("system", EventPriority.CRITICAL, 1000, OverflowPolicy.DROP_NEWEST,
+         ("phoenix", "system", "system:", "security", "security:")),
+    Lane("user", EventPriority.HIGH, 5000, OverflowPolicy.DROP_OLDEST, ("user:",)),
+    Lane("project", EventPriority.NORMAL, 5000, OverflowPolicy.COALESCE, ("risks:", "project:")),
+    Lane("news", EventPriority.LOW, 1000, OverflowPolicy.DROP_OLDEST, ("news", "news:", "events", "events:"))
+)
+
+class _LaneQueue:
+    """Messages waiting in one lane, with its counters"""
+    __slots__ = ("lane", "items", "latest", "enqueued", "dropped", "coalesced", "high_water")
+
+    def __init__(self, lane: Lane):
+        self.lane = lane
+        # sequence number -> message, in arrival order
+        self.items: "OrderedDict[int, PhoenixMessage]" = OrderedDict()
+        # (topic, entity id) -> (sequence number, event) of the entity's latest queued message
+        self.latest: Dict[tuple, Tuple[int, str]] = {}
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+class InboundQueue:
+    """Bounded priority lanes between decoding and dispatch.
+
+    Each decoded message is put() in the lane its topic maps to, and take()
+    drains lanes from the highest EventPriority down, so a system shutdown
+    notice is handled ahead of any backlog of news. When a lane is full its
+    OverflowPolicy decides what is lost; COALESCE lanes also fold a newer
+    message into the same (topic, payload id)'s latest queued one when both
+    are the same event, keeping its place in line. An update never folds
+    past a delete or create queued after it, so each entity's events stay in
+    order. Channel control events (join and push replies) skip the lanes and
+    are never dropped.
+
+    Not thread-safe on its own; the DecodeWorker serializes access.
+    """
+
+    def __init__(
+        self,
+        lanes: Iterable[Lane] = DEFAULT_LANES,
+        default_lane: str = "project",
+        exempt_events: Iterable[str] = DEFAULT_EXEMPT_EVENTS
+    ):
+        self._lanes = [_LaneQueue(lane) for lane in sorted(lanes, key=lambda lane: lane.priority.value, reverse=True)]
+        self._by_name = {queue.lane.name: queue for queue in self._lanes}
+        self._default = self._by_name[default_lane]
+        self.exempt_events = frozenset(exempt_events)
+        self._control: Deque[PhoenixMessage] = deque()
+        # topic -> lane, resolved on first sight
+        self._routes: Dict[str, _LaneQueue] = {}
+        self._sequence = itertools.count()
+        self._depth = 0
+
+    def __len__(self) -> int:
+        return self._depth
+
+    def _lane_for(self, topic: str) -> _LaneQueue:
+        for queue in self._lanes:
+            for pattern in queue.lane.topics:
+                if topic == pattern or (pattern.endswith(":") and topic.startswith(pattern)):
+                    return queue
+        return self._default
+
+    @staticmethod
+    def _coalesce_key(message: PhoenixMessage) -> Optional[tuple]:
+        payload = message.payload
+        entity_id = payload.get("id") if isinstance(payload, dict) else None
+        if entity_id is None:
+            return None
+        return message.topic, entity_id
+
+    def _pop_oldest(self, queue: _LaneQueue) -> PhoenixMessage:
+        sequence, message = queue.items.popitem(last=False)
+        if queue.latest:
+            key = self._coalesce_key(message)
+            if key is not None and queue.latest.get(key, (None,))[0] == sequence:
+                del queue.latest[key]
+        return message
+
+    def put(self, message: PhoenixMessage) -> bool:
+        """Queue a decoded message; False if its lane's policy dropped it"""
+        if message.event in self.exempt_events:
+            self._control.append(message)
+            self._depth += 1
+            return True
+
+        try:
+            queue = self._routes[message.topic]
+        except KeyError:
+            queue = self._routes[message.topic] = self._lane_for(message.topic)
+        items = queue.items
+        lane = queue.lane
+
+        key = self._coalesce_key(message) if lane.policy is OverflowPolicy.COALESCE else None
+        if key is not None:
+            latest = queue.latest.get(key)
+            if latest is not None and latest[1] == message.event:
+                items[latest[0]] = message
+                queue.coalesced += 1
+                return True
+
+        if len(items) >= lane.capacity:
+            queue.dropped += 1
+            if lane.policy is OverflowPolicy.DROP_NEWEST:
+                return False
+            self._pop_oldest(queue)
+            self._depth -= 1
+
+        sequence = next(self._sequence)
+        items[sequence] = message
+        if key is not None:
+            queue.latest[key] = (sequence, message.event)
+        queue.enqueued += 1
+        self._depth += 1
+        if len(items) > queue.high_water:
+            queue.high_water = len(items)
+        return True
+
+    def take(self, limit: Optional[int] = None) -> Tuple[List[PhoenixMessage], bool]:
+        """Up to limit messages, highest priority first, and whether more are waiting"""
+        remaining = self._depth if limit is None else min(limit, self._depth)
+        batch: List[PhoenixMessage] = []
+        control = self._control
+        while control and remaining:
+            batch.append(control.popleft())
+            remaining -= 1
+        for queue in self._lanes:
+            items = queue.items
+            while items and remaining:
+                batch.append(self._pop_oldest(queue))
+                remaining -= 1
+            if not remaining:
+                break
+        self._depth -= len(batch)
+        return batch, self._depth > 0
+
+    def depth(self, lane: str) -> int:
+        return len(self._by_name[lane].items)
+
+    @property
+    def dropped(self) -> int:
+        return sum(queue.dropped for queue in self._lanes)
+
+    @property
+    def coalesced(self) -> int:
+        return sum(queue.coalesced for queue in self._lanes)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-lane depth, high-water mark and enqueued/dropped/coalesced counters"""
+        return {
+            queue.lane.name: {
+                "depth": len(queue.items),
+                "capacity": queue.lane.capacity,
+                "high_water": queue.high_water,
+                "enqueued": queue.enqueued,
+                "dropped": queue.dropped,
+                "coalesced": queue.coalesced
+            }
+            for queue in self._lanes
+        }
@@ -0,0 +1,264 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import time
+
+# Histogram bucket upper bounds in seconds, 1us to 10s
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stages timed by PhoenixProtocol and TopicRouter
+STAGES = ("decode", "validate", "dispatch", "handler")
+
+# Distinct topic labels kept before the label cache is reset
+LABEL_CACHE_LIMIT = 65536
+
+def topic_label(topic: str) -> str:
+    """Collapse numeric topic segments so "risks:42" and "risks:7" share a label"""
+    return ":".join("*" if segment.isdigit() else segment for segment in topic.split(":"))
+
+class Histogram:
+    """Fixed-bucket timing histogram; recording is a bisect and two additions"""
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        # One count per bound plus the overflow bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th sample (None if empty, inf past the last bound)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], list(self.counts)))
+        }
+
+class Metrics:
+    """Counters and timing histograms for the client's message path.
+
+    Opt-in: the protocol and clients only touch a Metrics when one is passed
+    to them, and check for None once per stage otherwise. Counters are
+    exact; stage timings are taken for one message in every sample_every,
+    since timing every message would double the cost of the path. Stages:
+    decode (size check, parse and envelope check), validate (rate-limit
+    admission), dispatch (routing a message, handlers included) and handler
+    (each handler, by topic and event). Counters are keyed by the raw topic
+    on the hot path and folded with topic_label() when read, so per-project
+    topics don't explode the series count.
+
+    Decoding may run on a worker thread while dispatch runs on the GUI
+    thread; each counter is only written from one of them.
+    """
+
+    def __init__(self, label: Callable[[str], str] = topic_label, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 sample_every: int = 16):
+        self.label = label
+        self.buckets = buckets
+        self.sample_every = max(1, sample_every)
+        self.started_at = time.time()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_in = 0
+        self.received = 0
+        self.rejected: Dict[str, int] = {}
+        # (topic, event) -> count
+        self._messages_in: Dict[Tuple[str, str], int] = {}
+        self._messages_out: Dict[Tuple[str, str], int] = {}
+        self.signals: Dict[str, int] = {}
+        self.stages: Dict[str, Histogram] = {stage: Histogram(buckets) for stage in STAGES}
+        # Bound directly so the hot path skips the dict lookup
+        self.decode = self.stages["decode"]
+        self.validate = self.stages["validate"]
+        self.dispatch = self.stages["dispatch"]
+        self.handler = self.stages["handler"]
+        self._handlers: Dict[Tuple[str, str], Histogram] = {}
+        self._labels: Dict[str, str] = {}
+
+    def _label(self, topic: str) -> str:
+        try:
+            return self._labels[topic]
+        except KeyError:
+            if len(self._labels) >= LABEL_CACHE_LIMIT:
+                self._labels.clear()
+            label = self._labels[topic] = self.label(topic)
+            return label
+
+    def _fold(self, counts: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, str], int]:
+        folded: Dict[Tuple[str, str], int] = {}
+        for (topic, event), n in dict(counts).items():
+            key = (self._label(topic), event)
+            folded[key] = folded.get(key, 0) + n
+        return folded
+
+    @property
+    def messages_in(self) -> Dict[Tuple[str, str], int]:
+        """(topic label, event) -> messages received"""
+        return self._fold(self._messages_in)
+
+    @property
+    def messages_out(self) -> Dict[Tuple[str, str], int]:
+        """(topic label, event) -> messages sent"""
+        return self._fold(self._messages_out)
+
+    @property
+    def handlers(self) -> Dict[Tuple[str, str], Histogram]:
+        """(topic label, event) -> handler timings"""
+        folded: Dict[Tuple[str, str], Histogram] = {}
+        for (topic, event), histogram in dict(self._handlers).items():
+            key = (self._label(topic), event)
+            merged = folded.get(key)
+            if merged is None:
+                merged = folded[key] = Histogram(self.buckets)
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.count += histogram.count
+            merged.sum += histogram.sum
+        return folded
+
+    def frame_in(self, size: int) -> bool:
+        """Count an incoming frame; True if its decode should be timed"""
+        self.frames_in += 1
+        self.bytes_in += size
+        return self.frames_in % self.sample_every == 0
+
+    def reject(self, reason: str):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def message_in(self, topic: str, event: str) -> bool:
+        """Count a received message; True if its dispatch should be timed"""
+        key = (topic, event)
+        self._messages_in[key] = self._messages_in.get(key, 0) + 1
+        self.received += 1
+        return self.received % self.sample_every == 0
+
+    def message_out(self, topic: str, event: str, size: int):
+        key = (topic, event)
+        self._messages_out[key] = self._messages_out.get(key, 0) + 1
+        self.bytes_out += size
+
+    def signal_emitted(self, name: str):
+        self.signals[name] = self.signals.get(name, 0) + 1
+
+    def observe_handler(self, topic: str, event: str, seconds: float):
+        key = (topic, event)
+        histogram = self._handlers.get(key)
+        if histogram is None:
+            histogram = self._handlers[key] = Histogram(self.buckets)
+        histogram.record(seconds)
+        self.handler.record(seconds)
+
+    def snapshot(self) -> dict:
+        """Plain-dict copy of every counter and histogram, safe to serialize"""
+        return {
+            "timestamp": time.time(),
+            "uptime": time.time() - self.started_at,
+            "sample_every": self.sample_every,
+            "frames_in": self.frames_in,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "rejected": dict(self.rejected),
+            "messages_in": {f"{topic}|{event}": n for (topic, event), n in self.messages_in.items()},
+            "messages_out": {f"{topic}|{event}": n for (topic, event), n in self.messages_out.items()},
+            "signals": dict(self.signals),
+            "stages": {stage: histogram.snapshot() for stage, histogram in self.stages.items()},
+            "handlers": {f"{topic}|{event}": histogram.snapshot()
+                         for (topic, event), histogram in self.handlers.items()}
+        }
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def prometheus_text(metrics: Metrics, prefix: str = "resolvinator_client") -> str:
+    """Metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+
+    def counter(name: str, help_text: str, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for labels, value in samples:
+            lines.append(f"{prefix}_{name}{labels} {value}")
+
+    def histogram(name: str, help_text: str, series):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} histogram")
+        for labels, hist in series:
+            cumulative = 0
+            for bound, count in zip(list(hist.bounds) + ["+Inf"], list(hist.counts)):
+                cumulative += count
+                lines.append(f"{prefix}_{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+            lines.append(f"{prefix}_{name}_sum{_labels(**labels)} {hist.sum}")
+            lines.append(f"{prefix}_{name}_count{_labels(**labels)} {hist.count}")
+
+    counter("frames_in_total", "Frames received", [("", metrics.frames_in)])
+    counter("bytes_in_total", "Frame bytes (characters for text frames) received", [("", metrics.bytes_in)])
+    counter("bytes_out_total", "Frame bytes (characters for text frames) sent", [("", metrics.bytes_out)])
+    counter("frames_rejected_total", "Frames dropped before dispatch",
+            [(_labels(reason=reason), n) for reason, n in dict(metrics.rejected).items()])
+    counter("messages_in_total", "Messages received",
+            [(_labels(topic=topic, event=event), n) for (topic, event), n in metrics.messages_in.items()])
+    counter("messages_out_total", "Messages sent",
+            [(_labels(topic=topic, event=event), n) for (topic, event), n in metrics.messages_out.items()])
+    counter("signals_emitted_total", "Qt signals emitted for incoming messages",
+            [(_labels(signal=name), n) for name, n in dict(metrics.signals).items()])
+    histogram("stage_seconds", "Time spent per message in each stage",
+              [({"stage": stage}, hist) for stage, hist in metrics.stages.items()])
+    histogram("handler_seconds", "Time spent in handlers per topic and event",
+              [({"topic": topic, "event": event}, hist) for (topic, event), hist in metrics.handlers.items()])
+    return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """Write Metrics to a local file: Prometheus text (replaced on every write) or JSON lines (appended).
+
+    The Prometheus file suits node_exporter's textfile collector; the JSON
+    lines file keeps one snapshot per write for later analysis. Call write()
+    every `interval` seconds from the client's own timer.
+    """
+    FORMATS = ("prometheus", "jsonl")
+
+    def __init__(self, metrics: Metrics, path: str, format: str = "prometheus", interval: float = 15.0):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown metrics format {format!r}; expected one of {', '.join(self.FORMATS)}")
+        self.metrics = metrics
+        self.path = path
+        self.format = format
+        self.interval = interval
+
+    def write(self):
+        try:
+            if self.format == "jsonl":
+                with open(self.path, "a") as out:
+                    out.write(json.dumps(self.metrics.snapshot()) + "\n")
+            else:
+                # Write aside and rename so scrapers never see a half-written file
+                temporary = f"{self.path}.tmp"
+                with open(temporary, "w") as out:
+                    out.write(prometheus_text(self.metrics))
+                os.replace(temporary, self.path)
+        except OSError as e:
+            logging.error(f"Failed to write metrics to {self.path}: {e}")
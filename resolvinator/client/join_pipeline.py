@@ -0,0 +1,156 @@
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import logging
+import time
+
+from .codec import PhoenixMessage
+
+class JoinError(Exception):
+    """A channel join was rejected by the server"""
+
+    def __init__(self, topic: str, response: dict):
+        super().__init__(f"Join rejected for {topic}: {response}")
+        self.topic = topic
+        self.response = response
+
+@dataclass
+class PendingJoin:
+    topic: str
+    ref: str
+    params: dict
+    future: Future = field(default_factory=Future)
+    queued_at: float = 0.0
+    sent_at: Optional[float] = None
+
+class JoinPipeline:
+    """Coalesce channel joins into one batched write and track their replies by ref.
+
+    Joins requested during the same event-loop tick are sent together on the
+    next flush; a second request for a topic that is already in flight gets
+    the same future. Every join's future resolves with the server response
+    when its phx_reply arrives (on_reply also sees each ok response, which
+    covers rejoins nobody holds the future of), and on_all_ready fires once
+    nothing is left outstanding, with the number of joins and the seconds
+    since the first was requested.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[PhoenixMessage]], None],
+        next_ref: Callable[[], str],
+        schedule: Callable[[Callable[[], None]], None],
+        on_joined: Optional[Callable[[str, float], None]] = None,
+        on_reply: Optional[Callable[[str, dict], None]] = None,
+        on_failed: Optional[Callable[[str, dict], None]] = None,
+        on_all_ready: Optional[Callable[[int, float], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._send_batch = send_batch
+        self._next_ref = next_ref
+        self._schedule = schedule
+        self.on_joined = on_joined
+        self.on_reply = on_reply
+        self.on_failed = on_failed
+        self.on_all_ready = on_all_ready
+        self.clock = clock
+
+        self._queued: List[PendingJoin] = []
+        self._by_topic: Dict[str, PendingJoin] = {}
+        self._by_ref: Dict[str, PendingJoin] = {}
+        self._flush_scheduled = False
+        self._round_started: Optional[float] = None
+        self._round_count = 0
+
+    def request(self, topic: str, params: Optional[dict] = None) -> PendingJoin:
+        """Queue a join, or return the one already in flight for this topic"""
+        existing = self._by_topic.get(topic)
+        if existing is not None:
+            return existing
+
+        now = self.clock()
+        if self._round_started is None:
+            self._round_started = now
+            self._round_count = 0
+
+        join = PendingJoin(topic, self._next_ref(), params or {}, queued_at=now)
+        self._queued.append(join)
+        self._by_topic[topic] = join
+        self._by_ref[join.ref] = join
+        self._round_count += 1
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._schedule(self.flush)
+        return join
+
+    def flush(self):
+        """Send every queued join in a single batch"""
+        self._flush_scheduled = False
+        if not self._queued:
+            return
+
+        batch, self._queued = self._queued, []
+        now = self.clock()
+        for join in batch:
+            join.sent_at = now
+        self._send_batch([
+            PhoenixMessage(join.topic, "phx_join", join.params, join.ref, join.ref)
+            for join in batch
+        ])
+        logging.info(f"Sent {len(batch)} channel joins")
+
+    def handle_reply(self, message: PhoenixMessage) -> bool:
+        """Resolve the join matching a phx_reply; False if the ref isn't a join"""
+        join = self._by_ref.pop(message.ref, None)
+        if join is None:
+            return False
+        del self._by_topic[join.topic]
+
+        payload = message.payload or {}
+        elapsed = self.clock() - join.queued_at
+        if payload.get("status") == "ok":
+            response = payload.get("response", {})
+            if self.on_reply:
+                self.on_reply(join.topic, response)
+            join.future.set_result(response)
+            logging.info(f"Successfully joined channel: {join.topic} ({elapsed * 1000:.1f} ms)")
+            if self.on_joined:
+                self.on_joined(join.topic, elapsed)
+        else:
+            response = payload.get("response", {})
+            join.future.set_exception(JoinError(join.topic, response))
+            logging.warning(f"Failed to join channel {join.topic}: {response}")
+            if self.on_failed:
+                self.on_failed(join.topic, response)
+
+        if not self._by_ref:
+            self._finish_round()
+        return True
+
+    def _finish_round(self):
+        started, count = self._round_started, self._round_count
+        self._round_started = None
+        self._round_count = 0
+        if started is None:
+            return
+        elapsed = self.clock() - started
+        logging.info(f"All {count} channels ready in {elapsed * 1000:.1f} ms")
+        if self.on_all_ready:
+            self.on_all_ready(count, elapsed)
+
+    def pending_count(self) -> int:
+        """Joins requested but not yet answered"""
+        return len(self._by_ref)
+
+    def reset(self, reason: str = "Connection lost"):
+        """Fail every outstanding join, e.g. when the socket drops"""
+        pending = list(self._by_ref.values())
+        self._queued.clear()
+        self._by_topic.clear()
+        self._by_ref.clear()
+        self._round_started = None
+        self._round_count = 0
+        for join in pending:
+            if not join.future.done():
+                join.future.set_exception(ConnectionError(reason))
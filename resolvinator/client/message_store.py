@@ -0,0 +1,180 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+import logging
+import sqlite3
+import threading
+
+# Position in a conversation: (created_at, id) of a stored message
+Cursor = Tuple[str, object]
+
+# Start of a range that reaches the first message of the conversation
+BEGINNING: Cursor = ("", "")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id PRIMARY KEY,
+    peer_id INTEGER NOT NULL,
+    from_user_id INTEGER NOT NULL,
+    to_user_id INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    encrypted INTEGER NOT NULL,
+    read INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_peer ON messages (peer_id, created_at, id);
+CREATE TABLE IF NOT EXISTS ranges (
+    peer_id INTEGER NOT NULL,
+    start_at TEXT NOT NULL,
+    start_id,
+    end_at TEXT NOT NULL,
+    end_id
+);
+CREATE INDEX IF NOT EXISTS ranges_by_peer ON ranges (peer_id);
+"""
+
+_COLUMNS = "id, from_user_id, to_user_id, content, encrypted, read, created_at"
+
+class MessageStore:
+    """On-disk cache of message payloads for instant scrollback.
+
+    Rows are kept exactly as the server sent them, so encrypted content
+    stays encrypted at rest and is decrypted when a page is shown. Pages
+    are read with keyset queries on the (peer_id, created_at, id) index,
+    so fetching any page is an index seek however long the history is.
+    Messages are deduplicated on id; a repeat only refreshes its read flag.
+
+    Live messages can leave gaps (whatever was sent while offline), so the
+    store also records ranges known to hold every message between their
+    ends: each history page the server sends is one, and ranges that meet
+    are merged. contiguous_page() only answers from inside such a range.
+    """
+
+    def __init__(self, path: str = ":memory:", user_id: Optional[int] = None):
+        self.path = path
+        self.user_id = user_id
+        # Written from the GUI thread and the history loader thread
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def _peer(self, payload: dict) -> int:
+        if payload["from_user_id"] == self.user_id:
+            return payload["to_user_id"]
+        return payload["from_user_id"]
+
+    def add(self, payloads: Iterable[dict]) -> Set[object]:
+        """Store message payloads; returns the ids that weren't stored before"""
+        rows = [
+            (p["id"], self._peer(p), p["from_user_id"], p["to_user_id"], p["content"],
+             int(bool(p.get("encrypted"))), int(bool(p.get("read"))),
+              self._timestamp(p))
+            for p in payloads
+        ]
+        if not rows:
+            return set()
+
+        with self._lock, self._db:
+            ids = [row[0] for row in rows]
+            known = set()
+            # Look up in slices to stay under SQLite's bound-parameter limit
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                known.update(r[0] for r in self._db.execute(
+                    f"SELECT id FROM messages WHERE id IN ({','.join('?' * len(part))})", part))
+            self._db.executemany(
+                "INSERT INTO messages (id, peer_id, from_user_id, to_user_id, content, encrypted, read, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET read = excluded.read",
+                rows
+            )
+        return set(ids) - known
+
+    def page(self, peer_id: int, before: Optional[Cursor] = None, limit: int = 50) -> List[dict]:
+        """The `limit` messages with peer_id just before `before` (default: the newest), oldest first"""
+        if before is None:
+            sql = (f"SELECT {_COLUMNS} FROM messages WHERE peer_id = ? "
+                   f"ORDER BY created_at DESC, id DESC LIMIT ?")
+            params = (peer_id, limit)
+        else:
+            sql = (f"SELECT {_COLUMNS} FROM messages WHERE peer_id = ? AND (created_at, id) < (?, ?) "
+                   f"ORDER BY created_at DESC, id DESC LIMIT ?")
+            params = (peer_id, before[0], before[1], limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        rows.reverse()
+        return [
+            {"id": r[0], "from_user_id": r[1], "to_user_id": r[2], "content": r[3],
+             "encrypted": bool(r[4]), "read": bool(r[5]), "created_at": r[6]}
+            for r in rows
+        ]
+
+    def contiguous_page(self, peer_id: int, before: Cursor, limit: int = 50) -> Tuple[List[dict], bool]:
+        """Stored messages just before `before` that are known to have no gap, and whether that's a full answer.
+
+        The answer is full when it has `limit` messages or reaches the start of
+        the conversation; otherwise the rest has to come from the server.
+        """
+        with self._lock:
+            ranges = self._ranges(peer_id)
+        start = next((r_start for r_start, r_end in ranges if r_start <= before <= r_end), None)
+        if start is None:
+            return [], False
+        rows = [row for row in self.page(peer_id, before, limit) if self.cursor(row) >= start]
+        return rows, len(rows) == limit or start == BEGINNING
+
+    def mark_contiguous(self, peer_id: int, payloads: List[dict], before: Optional[object] = None,
+                        reaches_start: bool = False):
+        """Record a server history page as gap-free, up to the message id `before` it was fetched with"""
+        end = self.cursor_of(before) if before is not None else None
+        if end is None and payloads:
+            end = self.cursor(payloads[-1])
+        if end is None or not (payloads or reaches_start):
+            return
+        start = BEGINNING if reaches_start else self.cursor(payloads[0])
+
+        with self._lock, self._db:
+            merged = []
+            for r_start, r_end in self._ranges(peer_id):
+                if r_start <= end and start <= r_end:
+                    start, end = min(start, r_start), max(end, r_end)
+                else:
+                    merged.append((r_start, r_end))
+            merged.append((start, end))
+            self._db.execute("DELETE FROM ranges WHERE peer_id = ?", (peer_id,))
+            self._db.executemany(
+                "INSERT INTO ranges (peer_id, start_at, start_id, end_at, end_id) VALUES (?, ?, ?, ?, ?)",
+                [(peer_id, r_start[0], r_start[1], r_end[0], r_end[1]) for r_start, r_end in merged]
+            )
+
+    def _ranges(self, peer_id: int) -> List[Tuple[Cursor, Cursor]]:
+        rows = self._db.execute("SELECT start_at, start_id, end_at, end_id FROM ranges WHERE peer_id = ?", (peer_id,))
+        return [((r[0], r[1]), (r[2], r[3])) for r in rows]
+
+    def cursor_of(self, message_id: object) -> Optional[Cursor]:
+        with self._lock:
+            row = self._db.execute("SELECT created_at FROM messages WHERE id = ?", (message_id,)).fetchone()
+        return None if row is None else (row[0], message_id)
+
+    @staticmethod
+    def _timestamp(payload: dict) -> str:
+        # Normalized so string order is time order
+        return datetime.fromisoformat(payload["created_at"]).isoformat()
+
+    @classmethod
+    def cursor(cls, payload: dict) -> Cursor:
+        """Cursor pointing at a stored payload, for paging further back"""
+        return cls._timestamp(payload), payload["id"]
+
+    def count(self, peer_id: Optional[int] = None) -> int:
+        with self._lock:
+            if peer_id is None:
+                return self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM messages WHERE peer_id = ?", (peer_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+        logging.info(f"Closed message store {self.path}")
@@ -0,0 +1,71 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Sequence
+import os
+
+from cryptography.fernet import Fernet
+
+@dataclass
+class Message:
+    id: str
+    content: str
+    from_user_id: int
+    to_user_id: int
+    read: bool
+    created_at: datetime
+
+def message_from_payload(payload: dict, decrypt: Callable[[str], str]) -> Message:
+    """Build a Message from a server payload, decrypting its content if needed"""
+    content = payload["content"]
+    if payload["encrypted"]:
+        content = decrypt(content)
+    return Message(
+        id=payload["id"],
+        content=content,
+        from_user_id=payload["from_user_id"],
+        to_user_id=payload["to_user_id"],
+        read=payload["read"],
+        created_at=datetime.fromisoformat(payload["created_at"])
+    )
+
+class HistoryDecryptor:
+    """Decrypt pages of message history on a thread pool, in server order.
+
+    A page is cut into chunks that are decrypted concurrently; stream()
+    yields each chunk's Messages as soon as it and every chunk before it
+    are done, so the first rows can be shown while the rest decrypt.
+    """
+    CHUNK_SIZE = 256
+
+    def __init__(self, cipher_suite: Fernet, workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                 executor: Optional[Executor] = None):
+        self.cipher_suite = cipher_suite
+        self.chunk_size = chunk_size
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                                       thread_name_prefix="history-decrypt")
+
+    def decrypt(self, encrypted_content: str) -> str:
+        return self.cipher_suite.decrypt(encrypted_content.encode()).decode()
+
+    def _build_chunk(self, payloads: Sequence[dict]) -> List[Message]:
+        decrypt = self.decrypt
+        return [message_from_payload(payload, decrypt) for payload in payloads]
+
+    def stream(self, payloads: Sequence[dict]) -> Iterator[List[Message]]:
+        """Chunks of Messages in the order of payloads"""
+        size = self.chunk_size
+        chunks = [payloads[i:i + size] for i in range(0, len(payloads), size)]
+        # Executor.map submits every chunk up front and yields results in order
+        return self.executor.map(self._build_chunk, chunks)
+
+    def decrypt_page(self, payloads: Sequence[dict]) -> List[Message]:
+        messages: List[Message] = []
+        for chunk in self.stream(payloads):
+            messages.extend(chunk)
+        return messages
+
+    def shutdown(self):
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,84 +1,138 @@
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from typing import Optional, List, Callable
-from .websocket_client import WebSocketClient
+from .codec import PhoenixMessage
+from .connection_manager import ChannelHandle, ConnectionManager
 from .event_manager import EventManager
+from .messages import HistoryDecryptor, Message, message_from_payload
+from .message_store import MessageStore
 from PyQt6.QtCore import QObject, pyqtSignal
 from cryptography.fernet import Fernet
 import base64
 
-@dataclass
-class Message:
-    id: str
-    content: str
-    from_user_id: int
-    to_user_id: int
-    read: bool
-    created_at: datetime
-
 class MessagingClient(QObject):
     message_received = pyqtSignal(Message)
+    presence_changed = pyqtSignal(list, list)  # user ids that came online, went offline
     user_presence_changed = pyqtSignal(int, bool)  # user_id, is_online
+    history_loaded = pyqtSignal(int, list)  # peer_id, next chunk of Messages in page order
 
-    def __init__(self, event_manager: EventManager, user_id: int, encryption_key: str):
+    def __init__(self, event_manager: EventManager, user_id: int, encryption_key: str,
+                 connections: ConnectionManager, decrypt_workers: Optional[int] = None,
+                 store: Optional[MessageStore] = None):
         super().__init__()
         self.event_manager = event_manager
         self.user_id = user_id
         self.cipher_suite = Fernet(base64.b64encode(encryption_key.encode()))
-        self.ws_client = WebSocketClient(
-            event_manager,
-            f"ws://localhost:4000/socket/websocket"
-        )
-        
-    async def connect(self):
-        await self.ws_client.connect()
-        await self.join_user_channel()
-
-    async def join_user_channel(self):
-        join_msg = {
-            "topic": f"user:{self.user_id}",
-            "event": "phx_join",
-            "payload": {},
-            "ref": "1"
-        }
-        await self.ws_client.ws.send(json.dumps(join_msg))
-
-    async def send_message(self, recipient_id: int, content: str):
+        # The user channel rides on the app's shared socket
+        self.connections = connections
+        self.channel: Optional[ChannelHandle] = None
+
+        # History pages are decrypted on a pool; one loader thread walks each
+        # page's chunks in order so they reach the GUI in order
+        self.decryptor = HistoryDecryptor(self.cipher_suite, decrypt_workers)
+        self._history_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-loader")
+
+        # Local copy of every message seen, so views fill before the network answers
+        self.store = store or MessageStore(user_id=user_id)
+
+    def connect(self) -> Optional[Future]:
+        """Join the user channel; the future resolves with the join reply"""
+        if self.channel is None:
+            self.channel = self.connections.channel(f"user:{self.user_id}")
+            self.channel.on("new_message", self.handle_message)
+            self.channel.client.presence_changed.connect(self.presence_changed)
+            self.channel.client.user_presence_changed.connect(self.user_presence_changed)
+        return self.channel.joined
+
+    def disconnect(self):
+        if self.channel is not None:
+            self.channel.client.presence_changed.disconnect(self.presence_changed)
+            self.channel.client.user_presence_changed.disconnect(self.user_presence_changed)
+            self.channel.leave()
+            self.channel = None
+
+    def close(self):
+        """Disconnect and stop the history threads"""
+        self.disconnect()
+        self._history_loader.shutdown(wait=False, cancel_futures=True)
+        self.decryptor.shutdown()
+        self.store.close()
+
+    def send_message(self, recipient_id: int, content: str) -> Future:
+        """Send an encrypted message; the future resolves with the server's reply"""
         encrypted_content = self.cipher_suite.encrypt(content.encode()).decode()
-        message = {
-            "topic": f"user:{self.user_id}",
-            "event": "new_message",
-            "payload": {
-                "recipient_id": recipient_id,
-                "content": encrypted_content,
-                "encrypted": True
-            },
-            "ref": "1"
-        }
-        await self.ws_client.ws.send(json.dumps(message))
-
-    async def handle_message(self, message):
-        if message.get("event") == "new_message":
-            payload = message["payload"]
-            if payload["encrypted"]:
-                msg = Message(
-                    id=payload["id"],
-                    content=self._decrypt_message(payload["content"]),
-                    from_user_id=payload["from_user_id"],
-                    to_user_id=payload["to_user_id"],
-                    read=payload["read"],
-                    created_at=datetime.fromisoformat(payload["created_at"])
-                )
-            else:
-                msg = Message(
-                    id=payload["id"],
-                    content=payload["content"],
-                    from_user_id=payload["from_user_id"],
-                    to_user_id=payload["to_user_id"],
-                    read=payload["read"],
-                    created_at=datetime.fromisoformat(payload["created_at"])
-                )
-            self.message_received.emit(msg)
+        return self.channel.push("new_message", {
+            "recipient_id": recipient_id,
+            "content": encrypted_content,
+            "encrypted": True
+        })
+
+    def open_conversation(self, peer_id: int, limit: int = 50) -> Future:
+        """Show the newest stored messages with peer_id at once, then fetch the latest page"""
+        cached = self.store.page(peer_id, limit=limit)
+        if cached:
+            self.history_loaded.emit(peer_id, self.decryptor.decrypt_page(cached))
+        return self.fetch_history(peer_id, limit=limit)
+
+    def load_older(self, peer_id: int, oldest: Message, limit: int = 50) -> Optional[Future]:
+        """Scroll back from `oldest`: stored messages with no gap first, the network for the rest"""
+        cached, complete = self.store.contiguous_page(peer_id, (oldest.created_at.isoformat(), oldest.id), limit)
+        if cached:
+            self.history_loaded.emit(peer_id, self.decryptor.decrypt_page(cached))
+        if complete:
+            return None
+        before = cached[0]["id"] if cached else oldest.id
+        # All of it is older than what's on screen, even the parts that were stored
+        return self.fetch_history(peer_id, before=before, limit=limit, skip_stored=False)
+
+    def fetch_history(self, peer_id: int, before: Optional[str] = None, limit: int = 200,
+                      skip_stored: bool = True) -> Future:
+        """Fetch a page of the conversation with peer_id, oldest first, ending before message id `before`.
+
+        The future resolves with the whole page; history_loaded fires for each
+        decrypted chunk along the way, leaving out messages already in the store
+        unless skip_stored is False.
+        """
+        result = Future()
+        params = {"peer_id": peer_id, "limit": limit}
+        if before is not None:
+            params["before"] = before
+        reply = self.channel.push("history", params)
+        reply.add_done_callback(partial(self._on_history_reply, peer_id, before, limit, skip_stored, result))
+        return result
+
+    def _on_history_reply(self, peer_id: int, before: Optional[str], limit: int, skip_stored: bool, result: Future,
+                          reply: Future):
+        if reply.exception() is not None:
+            result.set_exception(reply.exception())
+            return
+        payloads = reply.result().get("messages", [])
+        self._history_loader.submit(self._load_history, peer_id, payloads, before, limit, skip_stored, result)
+
+    def _load_history(self, peer_id: int, payloads: List[dict], before: Optional[str], limit: int,
+                      skip_stored: bool, result: Future):
+        messages: List[Message] = []
+        try:
+            fresh = self.store.add(payloads)
+            # A short page means the server has nothing older
+            self.store.mark_contiguous(peer_id, payloads, before, reaches_start=len(payloads) < limit)
+            for chunk in self.decryptor.stream(payloads):
+                messages.extend(chunk)
+                if skip_stored:
+                    chunk = [message for message in chunk if message.id in fresh]
+                if chunk:
+                    # Emitted off the GUI thread, so delivery is queued
+                    self.history_loaded.emit(peer_id, chunk)
+        except Exception as e:
+            result.set_exception(e)
+            return
+        result.set_result(messages)
+
+    def handle_message(self, message: PhoenixMessage):
+        # Redelivered messages are already in the store and on screen
+        if not self.store.add([message.payload]):
+            return
+        self.message_received.emit(message_from_payload(message.payload, self._decrypt_message))
 
     def _decrypt_message(self, encrypted_content: str) -> str:
-        return self.cipher_suite.decrypt(encrypted_content.encode()).decode()
\ No newline at end of file
+        return self.cipher_suite.decrypt(encrypted_content.encode()).decode()
@@ -0,0 +1,475 @@
+from PyQt6.QtCore import (
+    QAbstractListModel, QEvent, QModelIndex, QObject, QRect, QSize, Qt, QTimer, pyqtSignal
+)
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPalette
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QApplication, QComboBox, QHBoxLayout, QHeaderView, QLabel, QPushButton, QStyle,
+    QStyledItemDelegate, QStyleOptionButton, QStyleOptionViewItem, QTableView, QVBoxLayout, QWidget
+)
+from bisect import bisect_left, bisect_right
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+from .events import Notification, NotificationType, NotificationPriority
+
+# Adds and removals arriving within this many milliseconds reach the view together
+BATCH_INTERVAL_MS = 16
+# A flush touching more separate row ranges than this resets the model instead
+RESET_RANGES = 512
+
+TYPE_COLORS = {
+    NotificationType.SYSTEM: "#007AFF",
+    NotificationType.SECURITY: "#FF3B30",
+    NotificationType.UPDATE: "#5856D6",
+    NotificationType.NETWORK: "#FF9500",
+    NotificationType.DATA: "#4CD964",
+    NotificationType.USER: "#5AC8FA",
+    NotificationType.NEWS: "#FFCC00"
+}
+
+PRIORITY_COLORS = {
+    NotificationPriority.WARNING: "#FF9500",
+    NotificationPriority.ERROR: "#FF3B30",
+    NotificationPriority.CRITICAL: "#AF0000"
+}
+
+class NotificationSort(Enum):
+    NEWEST = "Newest first"
+    PRIORITY = "Priority"
+    TYPE = "Type"
+
+# Ascending keys from (id, timestamp, priority value, type value); the id
+# makes every key unique so a row can be found by bisection
+SORT_KEYS: Dict[NotificationSort, Callable[[str, float, int, str], tuple]] = {
+    NotificationSort.NEWEST: lambda nid, stamp, priority, type: (-stamp, nid),
+    NotificationSort.PRIORITY: lambda nid, stamp, priority, type: (-priority, -stamp, nid),
+    NotificationSort.TYPE: lambda nid, stamp, priority, type: (type, -stamp, nid)
+}
+
+def _ranges(rows: Iterable[int]) -> List[Tuple[int, int]]:
+    """Sorted row numbers as contiguous (first, last) runs"""
+    runs: List[Tuple[int, int]] = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+class NotificationModel(QAbstractListModel):
+    """Notifications as a sorted, filtered list model.
+
+    add() and remove() queue their changes and a short timer applies them
+    in one pass, so a burst becomes a few contiguous row insertions and
+    removals rather than one per notification. Rows are kept in sort
+    order and placed by bisection; sorting and filtering are done here in
+    Python with precomputed keys rather than through a proxy model, whose
+    lessThan/filterAcceptsRow would call back into Python per comparison.
+    """
+    NotificationRole = Qt.ItemDataRole.UserRole + 1
+
+    counts_changed = pyqtSignal(int, int)  # shown, total
+
+    def __init__(self, batch_interval_ms: int = BATCH_INTERVAL_MS, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.notifications: Dict[str, Notification] = {}
+        self._rows: List[Notification] = []
+        # Sort key of each row, in step with _rows, so bisection compares tuples in C
+        self._row_keys: List[tuple] = []
+        # (timestamp, priority value, type value) of each notification, read once;
+        # Enum attribute access is too slow to repeat per row on every sort
+        self._fields: Dict[str, Tuple[float, int, str]] = {}
+        self._keys: Dict[str, tuple] = {}
+        self._sort = NotificationSort.NEWEST
+        self._types: Optional[Set[str]] = None
+        self._min_priority = NotificationPriority.DEBUG.value
+
+        self._pending_add: Dict[str, Notification] = {}
+        self._pending_remove: Set[str] = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(batch_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        notification = self._rows[index.row()]
+        if role == self.NotificationRole:
+            return notification
+        if role == Qt.ItemDataRole.DisplayRole:
+            return notification.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return notification.message
+        return None
+
+    def notification(self, row: int) -> Notification:
+        return self._rows[row]
+
+    def add(self, notification: Notification):
+        if notification.id in self.notifications:
+            # Replaced: the old row goes before the new one is placed
+            self._pending_remove.add(notification.id)
+        self._pending_add[notification.id] = notification
+        self._schedule_flush()
+
+    def remove(self, notification_id: str):
+        self._pending_add.pop(notification_id, None)
+        if notification_id in self.notifications:
+            self._pending_remove.add(notification_id)
+            self._schedule_flush()
+
+    def pending(self) -> int:
+        return len(self._pending_add) + len(self._pending_remove)
+
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Apply queued adds and removals now"""
+        self._flush_timer.stop()
+        if not self._pending_add and not self._pending_remove:
+            return
+        if self._pending_remove:
+            self._apply_removals()
+        if self._pending_add:
+            self._apply_inserts()
+        self._emit_counts()
+
+    def _accepts(self, nid: str) -> bool:
+        _, priority, type = self._fields[nid]
+        return priority >= self._min_priority and (self._types is None or type in self._types)
+
+    def _apply_removals(self):
+        removed, self._pending_remove = self._pending_remove, set()
+        rows = sorted(
+            bisect_left(self._row_keys, self._keys[nid])
+            for nid in removed if self._accepts(nid)
+        )
+        runs = _ranges(rows)
+        if len(runs) > RESET_RANGES:
+            self.beginResetModel()
+            kept = [row for row, n in enumerate(self._rows) if n.id not in removed]
+            self._rows = [self._rows[row] for row in kept]
+            self._row_keys = [self._row_keys[row] for row in kept]
+            self.endResetModel()
+        else:
+            # Bottom up, so the rows above keep their numbers
+            for first, last in reversed(runs):
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self._rows[first:last + 1]
+                del self._row_keys[first:last + 1]
+                self.endRemoveRows()
+        for nid in removed:
+            del self.notifications[nid]
+            del self._fields[nid]
+            del self._keys[nid]
+
+    def _apply_inserts(self):
+        added, self._pending_add = list(self._pending_add.values()), {}
+        key_for = SORT_KEYS[self._sort]
+        for n in added:
+            fields = (n.timestamp.timestamp(), n.priority.value, n.type.value)
+            self.notifications[n.id] = n
+            self._fields[n.id] = fields
+            self._keys[n.id] = key_for(n.id, *fields)
+        visible = sorted((self._keys[n.id], n) for n in added if self._accepts(n.id))
+        if not visible:
+            return
+
+        # Consecutive new rows landing at the same place go in as one block
+        groups: List[Tuple[int, List[tuple], List[Notification]]] = []
+        position = 0
+        for key, n in visible:
+            position = bisect_right(self._row_keys, key, position)
+            if groups and groups[-1][0] == position:
+                groups[-1][1].append(key)
+                groups[-1][2].append(n)
+            else:
+                groups.append((position, [key], [n]))
+
+        if len(groups) > RESET_RANGES:
+            self.beginResetModel()
+            self._set_rows([n.id for n in self._rows] + [n.id for _, n in visible])
+            self.endResetModel()
+            return
+        for position, keys, block in reversed(groups):
+            self.beginInsertRows(QModelIndex(), position, position + len(block) - 1)
+            self._rows[position:position] = block
+            self._row_keys[position:position] = keys
+            self.endInsertRows()
+
+    def _visible(self) -> List[str]:
+        """Ids of the notifications the filter lets through, in no particular order"""
+        types, floor = self._types, self._min_priority
+        if types is None and floor <= NotificationPriority.DEBUG.value:
+            return list(self._fields)
+        return [
+            nid for nid, (_, priority, type) in self._fields.items()
+            if priority >= floor and (types is None or type in types)
+        ]
+
+    def _set_rows(self, ids: List[str]):
+        # Bound dict lookups keep the sort and both lists out of Python bytecode
+        ids.sort(key=self._keys.__getitem__)
+        self._row_keys = list(map(self._keys.__getitem__, ids))
+        self._rows = list(map(self.notifications.__getitem__, ids))
+
+    def set_sort(self, sort: NotificationSort):
+        self.flush()
+        if sort == self._sort:
+            return
+        self._sort = sort
+        key_for = SORT_KEYS[sort]
+        self._keys = {nid: key_for(nid, *fields) for nid, fields in self._fields.items()}
+        self._rebuild()
+
+    def set_filter(
+        self,
+        types: Optional[Iterable[NotificationType]] = None,
+        min_priority: Optional[NotificationPriority] = None
+    ):
+        """Show only the given types (all when None) at min_priority or above"""
+        self.flush()
+        self._types = {t.value for t in types} if types is not None else None
+        self._min_priority = (min_priority or NotificationPriority.DEBUG).value
+        self._rebuild()
+
+    def _rebuild(self):
+        self.beginResetModel()
+        self._set_rows(self._visible())
+        self.endResetModel()
+        self._emit_counts()
+
+    def clear(self):
+        self._flush_timer.stop()
+        self._pending_add.clear()
+        self._pending_remove.clear()
+        self.beginResetModel()
+        self.notifications.clear()
+        self._fields.clear()
+        self._keys.clear()
+        self._rows = []
+        self._row_keys = []
+        self.endResetModel()
+        self._emit_counts()
+
+    def _emit_counts(self):
+        self.counts_changed.emit(len(self._rows), len(self.notifications))
+
+class NotificationDelegate(QStyledItemDelegate):
+    """Paints a notification row and turns clicks on its buttons into signals.
+
+    Every row has the same height, so the view can place any number of
+    them without asking for each one's size, and only visible rows are
+    painted. The buttons are drawn, not widgets.
+    """
+    dismissed = pyqtSignal(str)  # notification_id
+    action_triggered = pyqtSignal(str, str)  # notification_id, action
+
+    PADDING = 6
+    SPACING = 4
+    DISMISS = "Dismiss"
+
+    def row_height(self, metrics: QFontMetrics) -> int:
+        return 2 * self.PADDING + self.SPACING + metrics.height() + self._button_height(metrics)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), self.row_height(option.fontMetrics))
+
+    def _button_height(self, metrics: QFontMetrics) -> int:
+        return metrics.height() + 2 * self.SPACING
+
+    def _buttons(self, option: QStyleOptionViewItem, notification: Notification) -> List[Tuple[Optional[str], QRect]]:
+        """(action, rect) for each button, right-aligned on the second line; None is Dismiss"""
+        metrics = option.fontMetrics
+        height = self._button_height(metrics)
+        top = option.rect.bottom() - self.PADDING - height + 1
+        right = option.rect.right() - self.PADDING
+        buttons = []
+        for action in (None, notification.action) if notification.action else (None,):
+            width = metrics.horizontalAdvance(action or self.DISMISS) + 4 * self.SPACING
+            buttons.append((action, QRect(right - width + 1, top, width, height)))
+            right -= width + self.SPACING
+        return buttons
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex):
+        notification: Notification = index.data(NotificationModel.NotificationRole)
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+
+        # Background, selection and hover, without the display text
+        background = QStyleOptionViewItem(option)
+        self.initStyleOption(background, index)
+        background.text = ""
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, background, painter, widget)
+
+        painter.save()
+        rect = option.rect
+        metrics = option.fontMetrics
+        palette = option.palette
+        stripe = PRIORITY_COLORS.get(notification.priority)
+        if stripe:
+            painter.fillRect(QRect(rect.left(), rect.top(), 3, rect.height()), QColor(stripe))
+
+        # Header: [type] title ... time
+        left = rect.left() + self.PADDING + 3
+        right = rect.right() - self.PADDING
+        header = QRect(left, rect.top() + self.PADDING, right - left, metrics.height())
+        tag = f"[{notification.type.value}]"
+        painter.setPen(QColor(TYPE_COLORS.get(notification.type, "#000000")))
+        painter.drawText(header, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, tag)
+
+        timestamp = notification.timestamp.strftime("%H:%M")
+        painter.setPen(QColor("gray"))
+        painter.drawText(header, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, timestamp)
+
+        bold = QFont(option.font)
+        bold.setBold(True)
+        painter.setFont(bold)
+        title_left = header.left() + metrics.horizontalAdvance(tag) + self.SPACING * 2
+        title_width = header.right() - title_left - metrics.horizontalAdvance(timestamp) - self.SPACING * 2
+        title = painter.fontMetrics().elidedText(notification.title, Qt.TextElideMode.ElideRight, max(0, title_width))
+        painter.setPen(palette.color(QPalette.ColorRole.Text))
+        painter.drawText(QRect(title_left, header.top(), max(0, title_width), header.height()),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, title)
+        painter.setFont(option.font)
+
+        # Second line: message, elided (the full text is the tooltip), then the buttons
+        buttons = self._buttons(option, notification)
+        button_top = buttons[0][1].top()
+        message_width = buttons[-1][1].left() - self.SPACING - left
+        message = metrics.elidedText(notification.message, Qt.TextElideMode.ElideRight, max(0, message_width))
+        painter.drawText(QRect(left, button_top, max(0, message_width), buttons[0][1].height()),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, message)
+
+        for action, button_rect in buttons:
+            button = QStyleOptionButton()
+            button.rect = button_rect
+            button.text = action or self.DISMISS
+            button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+            button.palette = palette
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, widget)
+
+        painter.setPen(palette.color(QPalette.ColorRole.Mid))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        painter.restore()
+
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            notification: Notification = index.data(NotificationModel.NotificationRole)
+            position = event.position().toPoint()
+            for action, rect in self._buttons(option, notification):
+                if rect.contains(position):
+                    if action is None:
+                        self.dismissed.emit(notification.id)
+                    else:
+                        self.action_triggered.emit(notification.id, action)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+class NotificationCenter(QWidget):
+    action_triggered = pyqtSignal(str, str)  # notification_id, action
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = NotificationModel(parent=self)
+        self.delegate = NotificationDelegate(self)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        # Header
+        header = QHBoxLayout()
+        title = QLabel("Notifications")
+        title.setStyleSheet("font-size: 14px; font-weight: bold;")
+        header.addWidget(title)
+
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("color: gray;")
+        header.addWidget(self.count_label)
+        header.addStretch()
+
+        clear_btn = QPushButton("Clear All")
+        clear_btn.clicked.connect(self.clear_all)
+        header.addWidget(clear_btn)
+
+        layout.addLayout(header)
+
+        # Filters and sort order
+        controls = QHBoxLayout()
+        self.type_filter = QComboBox()
+        self.type_filter.addItem("All types", None)
+        for notification_type in NotificationType:
+            self.type_filter.addItem(notification_type.value.capitalize(), notification_type)
+        self.type_filter.currentIndexChanged.connect(self.apply_filter)
+        controls.addWidget(self.type_filter)
+
+        self.priority_filter = QComboBox()
+        self.priority_filter.addItem("All priorities", None)
+        for priority in list(NotificationPriority)[1:]:
+            self.priority_filter.addItem(f"{priority.name.capitalize()} and above", priority)
+        self.priority_filter.currentIndexChanged.connect(self.apply_filter)
+        controls.addWidget(self.priority_filter)
+
+        self.sort_order = QComboBox()
+        for sort in NotificationSort:
+            self.sort_order.addItem(sort.value, sort)
+        self.sort_order.currentIndexChanged.connect(
+            lambda: self.model.set_sort(self.sort_order.currentData())
+        )
+        controls.addWidget(self.sort_order)
+
+        layout.addLayout(controls)
+
+        # A one-column table rather than a QListView: with fixed row heights its
+        # header tracks rows in spans, where QListView's layout visits every row
+        # (and calls rowCount in Python for each) whenever rows are inserted
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(self.delegate)
+        self.view.setShowGrid(False)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.view.horizontalHeader().hide()
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        rows = self.view.verticalHeader()
+        rows.hide()
+        rows.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        rows.setDefaultSectionSize(self.delegate.row_height(self.view.fontMetrics()))
+        layout.addWidget(self.view)
+
+        self.delegate.dismissed.connect(self.remove_notification)
+        self.delegate.action_triggered.connect(self.handle_action)
+        self.model.counts_changed.connect(self.update_count)
+        self.update_count(0, 0)
+
+    def add_notification(self, notification: Notification):
+        self.model.add(notification)
+
+    def remove_notification(self, notification_id: str):
+        self.model.remove(notification_id)
+
+    def clear_all(self):
+        self.model.clear()
+
+    def apply_filter(self):
+        selected = self.type_filter.currentData()
+        self.model.set_filter(
+            types=None if selected is None else {selected},
+            min_priority=self.priority_filter.currentData()
+        )
+
+    def update_count(self, shown: int, total: int):
+        self.count_label.setText(f"{total:,}" if shown == total else f"{shown:,} of {total:,}")
+
+    def handle_action(self, notification_id: str, action: str):
+        """Pass a clicked action button on to whoever handles it"""
+        logging.debug(f"Action {action} triggered for notification {notification_id}")
+        self.action_triggered.emit(notification_id, action)
@@ -1,135 +1,16 @@
 from PyQt6.QtCore import QObject, pyqtSignal, Qt, QTimer
-from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QLabel, QScrollArea, QFrame, QSizePolicy
-)
 from datetime import datetime, timedelta
+import time
 import uuid
 from typing import Dict, List
 from .events import Notification, NotificationType, NotificationPriority
+from .expiry import ExpiryScheduler
 from typing import Optional
 
-class NotificationWidget(QFrame):
-    dismissed = pyqtSignal(str)  # notification_id
-    action_triggered = pyqtSignal(str, str)  # notification_id, action
-
-    def __init__(self, notification: Notification, parent=None):
-        super().__init__(parent)
-        self.notification = notification
-        self.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
-        self.setup_ui()
-
-    def setup_ui(self):
-        layout = QVBoxLayout(self)
-        
-        # Header
-        header_layout = QHBoxLayout()
-        type_label = QLabel(f"[{self.notification.type.value}]")
-        type_label.setStyleSheet(self._get_type_style())
-        header_layout.addWidget(type_label)
-        
-        title_label = QLabel(self.notification.title)
-        title_label.setStyleSheet("font-weight: bold;")
-        header_layout.addWidget(title_label)
-        
-        header_layout.addStretch()
-        
-        timestamp = QLabel(self.notification.timestamp.strftime("%H:%M"))
-        timestamp.setStyleSheet("color: gray;")
-        header_layout.addWidget(timestamp)
-        
-        layout.addLayout(header_layout)
-        
-        # Message
-        message_label = QLabel(self.notification.message)
-        message_label.setWordWrap(True)
-        layout.addWidget(message_label)
-        
-        # Action button if available
-        if self.notification.action:
-            action_btn = QPushButton(self.notification.action)
-            action_btn.clicked.connect(
-                lambda: self.action_triggered.emit(
-                    self.notification.id, 
-                    self.notification.action
-                )
-            )
-            layout.addWidget(action_btn)
-
-        # Dismiss button
-        dismiss_btn = QPushButton("Dismiss")
-        dismiss_btn.clicked.connect(
-            lambda: self.dismissed.emit(self.notification.id)
-        )
-        layout.addWidget(dismiss_btn)
-
-    def _get_type_style(self) -> str:
-        colors = {
-            NotificationType.SYSTEM: "#007AFF",
-            NotificationType.SECURITY: "#FF3B30",
-            NotificationType.UPDATE: "#5856D6",
-            NotificationType.NETWORK: "#FF9500",
-            NotificationType.DATA: "#4CD964",
-            NotificationType.USER: "#5AC8FA",
-            NotificationType.NEWS: "#FFCC00"
-        }
-        return f"color: {colors.get(self.notification.type, '#000000')};"
-
-class NotificationCenter(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.notifications: Dict[str, NotificationWidget] = {}
-        self.setup_ui()
-
-    def setup_ui(self):
-        layout = QVBoxLayout(self)
-        
-        # Header
-        header = QHBoxLayout()
-        title = QLabel("Notifications")
-        title.setStyleSheet("font-size: 14px; font-weight: bold;")
-        header.addWidget(title)
-        
-        clear_btn = QPushButton("Clear All")
-        clear_btn.clicked.connect(self.clear_all)
-        header.addWidget(clear_btn)
-        
-        layout.addLayout(header)
-        
-        # Scroll area for notifications
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        self.notification_container = QWidget()
-        self.notification_layout = QVBoxLayout(self.notification_container)
-        self.notification_layout.addStretch()
-        
-        scroll.setWidget(self.notification_container)
-        layout.addWidget(scroll)
-
-    def add_notification(self, notification: Notification):
-        widget = NotificationWidget(notification)
-        widget.dismissed.connect(self.remove_notification)
-        widget.action_triggered.connect(self.handle_action)
-        
-        self.notifications[notification.id] = widget
-        self.notification_layout.insertWidget(0, widget)
-
-    def remove_notification(self, notification_id: str):
-        if notification_id in self.notifications:
-            widget = self.notifications.pop(notification_id)
-            self.notification_layout.removeWidget(widget)
-            widget.deleteLater()
-
-    def clear_all(self):
-        for widget in self.notifications.values():
-            widget.deleteLater()
-        self.notifications.clear()
-
-    def handle_action(self, notification_id: str, action: str):
-        # Handle notification actions here
-        print(f"Action {action} triggered for notification {notification_id}")
+# Longest interval a QTimer accepts, in milliseconds
+MAX_TIMER_MS = 2 ** 31 - 1
+# Notifications expiring this close together (seconds) are removed in one pass
+EXPIRY_RESOLUTION = 0.25
 
 class NotificationManager(QObject):
     notification_added = pyqtSignal(Notification)
@@ -138,9 +19,13 @@ class NotificationManager(QObject):
     def __init__(self):
         super().__init__()
         self.notifications: Dict[str, Notification] = {}
-        self.cleanup_timer = QTimer()
+        # One single-shot timer, always armed for the earliest expiry
+        self.expiry = ExpiryScheduler(arm=self._arm_cleanup, resolution=EXPIRY_RESOLUTION)
+        self.cleanup_timer = QTimer(self)
+        self.cleanup_timer.setSingleShot(True)
+        # Coarse timers may fire 5% of the interval late, an hour on a day-long expiry
+        self.cleanup_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.cleanup_timer.timeout.connect(self.cleanup_expired)
-        self.cleanup_timer.start(60000)  # Check every minute
 
     def add_notification(
         self,
@@ -170,22 +55,28 @@ class NotificationManager(QObject):
         )
 
         self.notifications[notification_id] = notification
+        if expires_at:
+            self.expiry.schedule(notification_id, expires_at.timestamp())
         self.notification_added.emit(notification)
         return notification_id
 
     def remove_notification(self, notification_id: str):
         if notification_id in self.notifications:
             del self.notifications[notification_id]
+            self.expiry.cancel(notification_id)
             self.notification_removed.emit(notification_id)
 
     def cleanup_expired(self):
-        now = datetime.now()
-        expired = [
-            nid for nid, notif in self.notifications.items()
-            if notif.expires_at and notif.expires_at <= now
-        ]
-        for nid in expired:
+        """Remove notifications whose expiry has passed; runs when the timer fires"""
+        for nid in self.expiry.pop_expired(time.time()):
             self.remove_notification(nid)
 
+    def _arm_cleanup(self, wake_at: Optional[float]):
+        if wake_at is None:
+            self.cleanup_timer.stop()
+            return
+        delay = max(0.0, wake_at - time.time())
+        self.cleanup_timer.start(min(MAX_TIMER_MS, int(delay * 1000) + 1))
+
     def get_active_notifications(self) -> List[Notification]:
         return list(self.notifications.values())
\ No newline at end of file
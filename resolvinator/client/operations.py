@@ -0,0 +1,279 @@
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+import threading
+import time
+
+class OperationCancelled(Exception):
+    """Raised by CancelToken.raise_if_cancelled() inside a cancelled operation"""
+
+class OperationState(Enum):
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    ABANDONED = "abandoned"  # still running when a drain ran out of time
+
+class CancelToken:
+    """Cooperative cancellation flag with an optional deadline, safe to check from any thread"""
+
+    def __init__(self, deadline: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.deadline = deadline
+        self.clock = clock
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or self.expired
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise OperationCancelled(self.reason or "deadline passed")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to timeout, waking early on cancellation; True if cancelled"""
+        return self._event.wait(timeout) or self.expired
+
+@dataclass
+class Operation:
+    id: str
+    name: str
+    token: CancelToken
+    handle: Any = None
+    started_at: float = 0.0
+    finished_at: Optional[float] = None
+    state: OperationState = OperationState.RUNNING
+
+    @property
+    def runtime(self) -> Optional[float]:
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+    @property
+    def running(self) -> bool:
+        return self.state == OperationState.RUNNING
+
+@dataclass
+class DrainReport:
+    elapsed: float
+    finished: List[Operation]
+    abandoned: List[Operation]
+
+    @property
+    def clean(self) -> bool:
+        return not self.abandoned
+
+def cancel_handle(handle: Any) -> bool:
+    """Ask whatever runs the operation to stop; True if the handle took the request"""
+    if handle is None:
+        return False
+    if isinstance(handle, asyncio.Future):
+        # Tasks may only be touched from their own loop's thread
+        handle.get_loop().call_soon_threadsafe(handle.cancel)
+        return True
+    if isinstance(handle, Future):
+        # Only stops futures that haven't started; running ones rely on the token
+        return handle.cancel()
+    if hasattr(handle, "requestInterruption"):
+        # QThread: the worker polls isInterruptionRequested()
+        handle.requestInterruption()
+        return True
+    cancel = getattr(handle, "cancel", None)
+    if callable(cancel):
+        cancel()
+        return True
+    return False
+
+class OperationRegistry:
+    """Running operations with real handles, cancellation tokens and deadlines.
+
+    A handle can be an asyncio task, a concurrent.futures Future, a QThread
+    or anything with a cancel() method; asyncio and concurrent futures are
+    finished automatically when they complete, other work calls finish().
+    Cancelling sets the operation's token and asks the handle to stop.
+    drain() cancels everything at once and then waits for the lot on a
+    single budget, so shutdown takes at most that long however many
+    operations are open; whatever is still running is reported abandoned.
+    Finished operations are kept in a short history with their runtimes.
+    """
+
+    def __init__(
+        self,
+        on_finished: Optional[Callable[[Operation], None]] = None,
+        history: int = 256,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.on_finished = on_finished
+        self.clock = clock
+        self._operations: Dict[str, Operation] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.history: Deque[Operation] = deque(maxlen=history)
+        self._counter = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._operations)
+
+    def __contains__(self, operation_id: str) -> bool:
+        with self._lock:
+            return operation_id in self._operations
+
+    def get(self, operation_id: str) -> Optional[Operation]:
+        with self._lock:
+            return self._operations.get(operation_id)
+
+    def active(self) -> List[Operation]:
+        with self._lock:
+            return list(self._operations.values())
+
+    def register(
+        self,
+        operation_id: Optional[str] = None,
+        handle: Any = None,
+        name: str = "",
+        timeout: Optional[float] = None,
+        token: Optional[CancelToken] = None
+    ) -> Operation:
+        """Track an operation; timeout sets a deadline after which it is cancelled.
+
+        Registering an id that is still running returns its existing Operation unchanged.
+        """
+        now = self.clock()
+        with self._lock:
+            if operation_id is None:
+                self._counter += 1
+                operation_id = f"op_{self._counter}"
+            existing = self._operations.get(operation_id)
+            if existing is not None:
+                return existing
+            if token is None:
+                token = CancelToken(clock=self.clock)
+            if timeout is not None:
+                token.deadline = now + timeout
+            operation = Operation(operation_id, name or operation_id, token, handle, started_at=now)
+            self._operations[operation_id] = operation
+
+        if isinstance(handle, (Future, asyncio.Future)):
+            handle.add_done_callback(lambda future: self._settle(operation, future))
+        return operation
+
+    def _settle(self, operation: Operation, future):
+        if future.cancelled():
+            state = OperationState.CANCELLED
+        elif future.exception() is not None:
+            cancelled = isinstance(future.exception(), OperationCancelled)
+            state = OperationState.CANCELLED if cancelled else OperationState.FAILED
+        else:
+            state = OperationState.DONE
+        self.finish(operation.id, state)
+
+    def finish(self, operation_id: str, state: OperationState = OperationState.DONE) -> Optional[Operation]:
+        """Record how an operation ended; work that stopped early on its token passes CANCELLED"""
+        with self._lock:
+            operation = self._operations.pop(operation_id, None)
+            if operation is None:
+                return None
+            operation.state = state
+            operation.finished_at = self.clock()
+            self.history.append(operation)
+            self._changed.notify_all()
+        logging.debug(f"Operation {operation.name} {state.value} after {operation.runtime * 1000:.1f} ms")
+        if self.on_finished:
+            self.on_finished(operation)
+        return operation
+
+    def cancel(self, operation_id: str, reason: str = "cancelled") -> bool:
+        operation = self.get(operation_id)
+        if operation is None:
+            return False
+        operation.token.cancel(reason)
+        cancel_handle(operation.handle)
+        return True
+
+    def cancel_all(self, reason: str = "cancelled") -> int:
+        operations = self.active()
+        for operation in operations:
+            operation.token.cancel(reason)
+        for operation in operations:
+            cancel_handle(operation.handle)
+        return len(operations)
+
+    def cancel_expired(self) -> int:
+        """Cancel operations past their deadline"""
+        expired = [operation for operation in self.active() if operation.token.expired]
+        for operation in expired:
+            self.cancel(operation.id, "deadline passed")
+        return len(expired)
+
+    def next_deadline(self) -> Optional[float]:
+        deadlines = [operation.token.deadline for operation in self.active() if operation.token.deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def _wait_qthreads(self, deadline: float):
+        """QThread completion is signalled on the GUI thread, which may be the one draining"""
+        for operation in self.active():
+            handle = operation.handle
+            if hasattr(handle, "isFinished") and hasattr(handle, "wait"):
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return
+                if handle.isFinished() or handle.wait(max(1, int(remaining * 1000))):
+                    self.finish(operation.id, OperationState.CANCELLED)
+
+    def drain(self, budget: float, reason: str = "shutting down") -> DrainReport:
+        """Cancel everything, wait up to budget seconds for it to stop, and report what did"""
+        started = self.clock()
+        deadline = started + budget
+        before = {operation.id: operation for operation in self.active()}
+        self.cancel_all(reason)
+        self._wait_qthreads(deadline)
+        with self._lock:
+            while self._operations:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self._report(started, before, reason)
+
+    async def drain_async(self, budget: float, reason: str = "shutting down", poll: float = 0.01) -> DrainReport:
+        """drain() for code on an asyncio loop, which must keep running for its own tasks to finish"""
+        started = self.clock()
+        deadline = started + budget
+        before = {operation.id: operation for operation in self.active()}
+        self.cancel_all(reason)
+        while len(self) and self.clock() < deadline:
+            await asyncio.sleep(min(poll, max(0.0, deadline - self.clock())))
+        return self._report(started, before, reason)
+
+    def _report(self, started: float, before: Dict[str, Operation], reason: str) -> DrainReport:
+        with self._lock:
+            abandoned = [operation for operation in before.values() if operation.id in self._operations]
+            for operation in abandoned:
+                # Left registered so a later finish() still lands, but marked for the report
+                operation.state = OperationState.ABANDONED
+        finished = [operation for operation in before.values() if operation.finished_at is not None]
+        elapsed = self.clock() - started
+        logging.info(f"Drained operations ({reason}) in {elapsed * 1000:.0f} ms: "
+                     f"{len(finished)} stopped, {len(abandoned)} abandoned")
+        for operation in abandoned:
+            logging.warning(f"Operation {operation.name} still running after "
+                            f"{(self.clock() - operation.started_at) * 1000:.0f} ms")
+        return DrainReport(elapsed, finished, abandoned)
+
+    def runtimes(self) -> Dict[str, float]:
+        """Runtime of each recently finished operation by name, seconds"""
+        return {operation.name: operation.runtime for operation in list(self.history)}
@@ -0,0 +1,85 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+# (came online, went offline) user ids
+PresenceChange = Tuple[List[int], List[int]]
+
+class PresenceStore:
+    """Who is online, kept up to date from Phoenix presence_state and presence_diff.
+
+    Each online user maps to the set of presence refs (one per connected
+    device), so a user is only reported offline when their last device
+    leaves, and a diff replayed after a reconnect is harmless. Every
+    snapshot or diff produces at most one on_change call carrying all the
+    users whose online status actually flipped.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[List[int], List[int]], None]] = None):
+        self.on_change = on_change
+        self._refs: Dict[int, Set[str]] = {}
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._refs
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def is_online(self, user_id: int) -> bool:
+        return user_id in self._refs
+
+    def online_count(self) -> int:
+        return len(self._refs)
+
+    def online_ids(self) -> Set[int]:
+        return set(self._refs)
+
+    @staticmethod
+    def _entries(presences: dict) -> Iterable[Tuple[int, Set[str]]]:
+        """(user_id, presence refs) from a Phoenix {id => %{metas: [...]}} map"""
+        for key, presence in presences.items():
+            try:
+                user_id = int(key)
+            except (TypeError, ValueError):
+                logging.warning(f"Ignoring presence for non-numeric key {key!r}")
+                continue
+            metas = presence.get("metas", ()) if isinstance(presence, dict) else ()
+            yield user_id, {str(meta.get("phx_ref", index)) for index, meta in enumerate(metas)}
+
+    def apply_state(self, state: dict) -> PresenceChange:
+        """Replace everything with a presence_state snapshot"""
+        refs = {user_id: user_refs for user_id, user_refs in self._entries(state) if user_refs}
+        joined = [user_id for user_id in refs if user_id not in self._refs]
+        left = [user_id for user_id in self._refs if user_id not in refs]
+        self._refs = refs
+        return self._changed(joined, left)
+
+    def apply_diff(self, diff: dict) -> PresenceChange:
+        """Apply a presence_diff's joins, then its leaves"""
+        was_online = {}
+        for user_id, user_refs in self._entries(diff.get("joins", {})):
+            was_online.setdefault(user_id, user_id in self._refs)
+            self._refs.setdefault(user_id, set()).update(user_refs)
+
+        for user_id, user_refs in self._entries(diff.get("leaves", {})):
+            current = self._refs.get(user_id)
+            if current is None:
+                continue
+            was_online.setdefault(user_id, True)
+            current.difference_update(user_refs)
+            if not current:
+                del self._refs[user_id]
+
+        joined = [user_id for user_id, before in was_online.items() if not before and user_id in self._refs]
+        left = [user_id for user_id, before in was_online.items() if before and user_id not in self._refs]
+        return self._changed(joined, left)
+
+    def clear(self) -> PresenceChange:
+        """Forget everyone, e.g. when leaving the channel"""
+        left = list(self._refs)
+        self._refs = {}
+        return self._changed([], left)
+
+    def _changed(self, joined: List[int], left: List[int]) -> PresenceChange:
+        if (joined or left) and self.on_change:
+            self.on_change(joined, left)
+        return joined, left
@@ -0,0 +1,317 @@
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import logging
+import time
+
+from .codec import Frame, FrameDecodeError, FrameDecoder, FrameValidator, PhoenixMessage, V1Serializer, get_serializer
+from .rate_limiter import TopicRateLimiter
+from .router import TopicRouter
+from .join_pipeline import JoinPipeline, PendingJoin
+from .heartbeat import Heartbeat, LatencyHistogram
+from .instrumentation import Metrics
+
+# Join params, or a function returning them, called on every (re)join
+JoinParams = Union[dict, Callable[[], dict]]
+
+# Events logged for the security audit trail
+AUDITED_EVENTS = ("user:join", "user:leave", "system:update")
+
+class ReplyError(Exception):
+    """A pushed event was answered with an error status"""
+
+    def __init__(self, topic: str, event: str, response):
+        super().__init__(f"{event} on {topic} failed: {response}")
+        self.topic = topic
+        self.event = event
+        self.response = response
+
+class PhoenixProtocol:
+    """Phoenix channel client state with no I/O of its own.
+
+    The owning transport feeds it frames with receive_frame() (or decode()
+    then receive(), when decoding happens on another thread), reports
+    connection_made()/connection_lost(), and calls heartbeat_tick() from its
+    own timer. Everything the protocol wants written goes to send() as a
+    list of frames to be flushed together; schedule() defers a callback to
+    the next event-loop tick so joins made in the same tick share a batch.
+
+    Joins are reference counted, so several subscribers can share a channel
+    on one socket: the first join() sends phx_join, and only the leave()
+    that drops the last reference sends phx_leave.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Frame]], None],
+        schedule: Callable[[Callable[[], None]], None] = lambda callback: callback(),
+        serializer: Optional[V1Serializer] = None,
+        decoder: Optional[FrameDecoder] = None,
+        rate_limiter: Optional[TopicRateLimiter] = None,
+        router: Optional[TopicRouter] = None,
+        heartbeat_interval: float = 30.0,
+        latency: Optional[LatencyHistogram] = None,
+        on_joined: Optional[Callable[[str, float], None]] = None,
+        on_join_reply: Optional[Callable[[str, dict], None]] = None,
+        on_join_failed: Optional[Callable[[str, dict], None]] = None,
+        on_all_ready: Optional[Callable[[int, float], None]] = None,
+        on_heartbeat: Optional[Callable[[float], None]] = None,
+        on_auth_failed: Optional[Callable[[str], None]] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        self.send = send
+        # Counters and stage timings; None keeps instrumentation off the hot path
+        self.metrics = metrics
+        # Phoenix framing; V2 arrays unless a V1Serializer is passed in
+        self.serializer = serializer or get_serializer(decoder=decoder)
+        self.validator = FrameValidator(self.serializer)
+        # Per-topic rate limiting; system topics are exempt
+        self.rate_limiter = rate_limiter or TopicRateLimiter()
+        # Topic/event dispatch; transports and downstream modules register routes here
+        self.router = router or TopicRouter()
+        self.on_heartbeat = on_heartbeat
+        self.on_auth_failed = on_auth_failed
+
+        self.connected = False
+        self.ref_counter = 0
+        # Joined topics and their join_ref
+        self.channels: Dict[str, str] = {}
+        # Topics to (re)join on every connect, with their join params
+        self.subscriptions: Dict[str, JoinParams] = {}
+        # Subscribers holding each topic, and the latest join sent for it
+        self.refcounts: Dict[str, int] = {}
+        self.joins: Dict[str, PendingJoin] = {}
+        # Pushes awaiting a phx_reply: ref -> (future, topic, event)
+        self._replies: Dict[str, Tuple[Future, str, str]] = {}
+
+        # Joins requested in the same event-loop tick go out together
+        self.join_pipeline = JoinPipeline(
+            send_batch=self.send_messages,
+            next_ref=self.next_ref,
+            schedule=schedule,
+            on_joined=on_joined,
+            on_reply=on_join_reply,
+            on_failed=on_join_failed,
+            on_all_ready=on_all_ready
+        )
+        self.heartbeat = Heartbeat(self.next_ref, heartbeat_interval, latency)
+
+    def next_ref(self) -> str:
+        """Get unique Phoenix message reference"""
+        self.ref_counter += 1
+        return str(self.ref_counter)
+
+    def send_messages(self, messages: List[PhoenixMessage]):
+        """Encode messages with the active serializer and hand them to the transport"""
+        encode = self.serializer.encode
+        frames = [encode(message) for message in messages]
+        if self.metrics is not None:
+            for message, frame in zip(messages, frames):
+                self.metrics.message_out(message.topic, message.event, len(frame))
+        self.send(frames)
+
+    # Connection lifecycle
+
+    def connection_made(self):
+        """The socket is open: rejoin every subscribed topic in one batch"""
+        self.connected = True
+        self.channels.clear()
+        self.heartbeat.reset()
+        for topic, params in list(self.subscriptions.items()):
+            self._request_join(topic, params)
+
+    def connection_lost(self, reason: str = "Connection lost"):
+        """The socket is gone: fail outstanding joins and forget joined channels"""
+        self.connected = False
+        self.channels.clear()
+        self.heartbeat.reset()
+        self.join_pipeline.reset(reason)
+
+        pending = list(self._replies.values())
+        self._replies.clear()
+        for future, _, _ in pending:
+            if not future.done():
+                future.set_exception(ConnectionError(reason))
+
+    # Outgoing
+
+    def join(self, topic: str, params: Optional[JoinParams] = None) -> Optional[PendingJoin]:
+        """Take a reference on a topic; joins now if connected, otherwise on the next connect.
+
+        params may be a function, called for every (re)join, so a rejoin can
+        carry state such as the last version seen. Returns the join in flight
+        or already answered for the topic, or None while disconnected.
+        """
+        self.refcounts[topic] = self.refcounts.get(topic, 0) + 1
+        if topic not in self.subscriptions:
+            self.subscriptions[topic] = params or {}
+        if not self.connected:
+            return None
+        if topic in self.channels:
+            return self.joins[topic]
+        return self._request_join(topic, self.subscriptions[topic])
+
+    def _request_join(self, topic: str, params: JoinParams) -> PendingJoin:
+        join = self.join_pipeline.request(topic, params() if callable(params) else params)
+        self.channels[topic] = join.ref
+        self.joins[topic] = join
+        logging.info(f"Joining channel: {topic}")
+        return join
+
+    def leave(self, topic: str) -> bool:
+        """Drop a reference on a topic; the last one leaves the channel and stops rejoining it"""
+        count = self.refcounts.get(topic, 0)
+        if count > 1:
+            self.refcounts[topic] = count - 1
+            return False
+
+        self.refcounts.pop(topic, None)
+        self.subscriptions.pop(topic, None)
+        self.joins.pop(topic, None)
+        join_ref = self.channels.pop(topic, None)
+        if join_ref is None:
+            return False
+        self.send_messages([PhoenixMessage(topic, "phx_leave", {}, self.next_ref(), join_ref)])
+        logging.info(f"Left channel: {topic}")
+        return True
+
+    def push(self, topic: str, event: str, payload=None) -> str:
+        """Send an event on a channel and return its ref"""
+        ref = self.next_ref()
+        message = PhoenixMessage(topic, event, {} if payload is None else payload, ref, self.channels.get(topic))
+        self.send_messages([message])
+        return ref
+
+    def request(self, topic: str, event: str, payload=None) -> Future:
+        """Push an event; the future resolves with the response of its phx_reply"""
+        future = Future()
+        ref = self.push(topic, event, payload)
+        self._replies[ref] = (future, topic, event)
+        return future
+
+    def _resolve_reply(self, message: PhoenixMessage) -> bool:
+        """Settle the request matching a phx_reply; False if the ref isn't one"""
+        pending = self._replies.pop(message.ref, None)
+        if pending is None:
+            return False
+        future, topic, event = pending
+        payload = message.payload or {}
+        if payload.get("status") == "ok":
+            future.set_result(payload.get("response", {}))
+        else:
+            future.set_exception(ReplyError(topic, event, payload.get("response")))
+        return True
+
+    def heartbeat_tick(self) -> bool:
+        """Send the next heartbeat; False if the last one went unanswered and the link is dead"""
+        message = self.heartbeat.tick()
+        if message is None:
+            return False
+        self.send_messages([message])
+        return True
+
+    # Incoming
+
+    def decode(self, frame: Frame) -> Optional[PhoenixMessage]:
+        """Validate an incoming frame and return its decoded envelope"""
+        metrics = self.metrics
+        if metrics is not None and metrics.frame_in(len(frame)):
+            return self._decode_measured(frame, metrics)
+        # Size, decode and structure checks in a single pass over the frame
+        try:
+            message = self.validator.validate(frame)
+        except FrameDecodeError:
+            logging.error(f"Invalid JSON message received")
+            if metrics is not None:
+                metrics.reject("malformed")
+            return None
+        if message is None:
+            if metrics is not None:
+                metrics.reject("invalid")
+            return None
+
+        # Rate limiting
+        if not self.rate_limiter.allow(message.topic, message.event):
+            logging.warning(f"Rate limit exceeded on {message.topic}")
+            if metrics is not None:
+                metrics.reject("rate_limited")
+            return None
+
+        return message
+
+    def _decode_measured(self, frame: Frame, metrics: Metrics) -> Optional[PhoenixMessage]:
+        """decode(), timing the decode and validate stages of a sampled frame"""
+        started = time.perf_counter()
+        try:
+            message = self.validator.validate(frame)
+        except FrameDecodeError:
+            logging.error(f"Invalid JSON message received")
+            metrics.reject("malformed")
+            return None
+        decoded = time.perf_counter()
+        if message is None:
+            metrics.decode.record(decoded - started)
+            metrics.reject("invalid")
+            return None
+
+        allowed = self.rate_limiter.allow(message.topic, message.event)
+        admitted = time.perf_counter()
+        metrics.decode.record(decoded - started)
+        metrics.validate.record(admitted - decoded)
+        if not allowed:
+            logging.warning(f"Rate limit exceeded on {message.topic}")
+            metrics.reject("rate_limited")
+            return None
+
+        return message
+
+    def receive_frame(self, frame: Frame) -> bool:
+        """Decode and handle one frame; False if it was rejected"""
+        message = self.decode(frame)
+        if message is None:
+            logging.warning("Message validation failed")
+            return False
+        self.receive(message)
+        return True
+
+    def receive(self, message: PhoenixMessage):
+        """Handle a decoded message: replies, errors, then the router"""
+        try:
+            event = message.event
+            payload = message.payload
+            metrics = self.metrics
+            # Counted always, timed when sampled
+            sampled = metrics is not None and metrics.message_in(message.topic, event)
+
+            # Handle join and heartbeat replies
+            if event == "phx_reply":
+                rtt = self.heartbeat.handle_reply(message)
+                if rtt is not None:
+                    if self.on_heartbeat:
+                        self.on_heartbeat(rtt)
+                elif self._resolve_reply(message):
+                    pass
+                elif not self.join_pipeline.handle_reply(message) and payload.get("status") != "ok":
+                    logging.warning(f"Request {message.ref} on {message.topic} failed: {payload.get('response')}")
+                return
+
+            # Handle authentication errors
+            if event == "phx_error" and "unauthorized" in str(payload):
+                logging.error("Authentication failed")
+                if self.on_auth_failed:
+                    self.on_auth_failed("Authentication failed")
+                return
+
+            # Add security audit logging for sensitive operations
+            if event in AUDITED_EVENTS:
+                logging.info(f"Security audit: {event} from {message.topic}")
+
+            # Hand off to the handlers registered for this topic and event
+            if not sampled:
+                self.router.dispatch(message)
+            else:
+                started = time.perf_counter()
+                self.router.dispatch_measured(message, metrics)
+                metrics.dispatch.record(time.perf_counter() - started)
+
+        except Exception as e:
+            logging.error(f"Error processing message: {str(e)}")
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+import time
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float  # tokens refilled per second
+    burst: int   # bucket capacity
+
+# Topics that are never throttled; entries ending in ":" match as prefixes
+DEFAULT_EXEMPT_TOPICS = ("phoenix", "system", "system:", "events:global")
+
+# Channel control events must always get through or joins never complete
+DEFAULT_EXEMPT_EVENTS = ("phx_reply", "phx_error", "phx_close")
+
+# Bucket count that triggers the first sweep for idle buckets
+MIN_SWEEP_SIZE = 1024
+
+class TokenBucket:
+    """Single token bucket with admitted/dropped counters"""
+    __slots__ = ("rate", "capacity", "tokens", "updated", "admitted", "dropped")
+
+    def __init__(self, limit: RateLimit, now: float):
+        self.rate = limit.rate
+        self.capacity = limit.burst
+        self.tokens = float(limit.burst)
+        self.updated = now
+        self.admitted = 0
+        self.dropped = 0
+
+    def idle(self, now: float) -> bool:
+        """True once the bucket has refilled completely, so dropping it changes nothing"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+    def take(self, now: float) -> bool:
+        """Consume one token if available"""
+        tokens = self.tokens + (now - self.updated) * self.rate
+        if tokens > self.capacity:
+            tokens = self.capacity
+        self.updated = now
+
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            self.admitted += 1
+            return True
+
+        self.tokens = tokens
+        self.dropped += 1
+        return False
+
+class TopicRateLimiter:
+    """Token-bucket rate limiting keyed per topic, with exempt critical topics"""
+
+    def __init__(
+        self,
+        default: RateLimit = RateLimit(rate=200.0, burst=1000),
+        limits: Optional[Dict[str, RateLimit]] = None,
+        exempt_topics: Iterable[str] = DEFAULT_EXEMPT_TOPICS,
+        exempt_events: Iterable[str] = DEFAULT_EXEMPT_EVENTS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.default = default
+        # Per-topic overrides; keys ending in ":" apply to every topic with that prefix
+        self.limits = dict(limits or {})
+        self.exempt_topics = tuple(exempt_topics)
+        self.exempt_events = frozenset(exempt_events)
+        self.clock = clock
+        self.exempted = 0
+        # topic -> TokenBucket, or None for exempt topics
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        # Counters of evicted buckets, kept so the totals stay accurate
+        self._evicted_admitted = 0
+        self._evicted_dropped = 0
+        self._sweep_at = MIN_SWEEP_SIZE
+
+    def allow(self, topic: str, event: Optional[str] = None) -> bool:
+        """Admit or drop one message on a topic"""
+        try:
+            bucket = self._buckets[topic]
+        except KeyError:
+            if len(self._buckets) >= self._sweep_at:
+                self._evict_idle()
+            bucket = self._buckets[topic] = self._create_bucket(topic)
+
+        if bucket is None or event in self.exempt_events:
+            self.exempted += 1
+            return True
+        return bucket.take(self.clock())
+
+    def _create_bucket(self, topic: str) -> Optional[TokenBucket]:
+        """Resolve a topic's limit once; later messages hit the bucket directly"""
+        if self._matches(topic, self.exempt_topics):
+            return None
+
+        limit = self.limits.get(topic)
+        if limit is None:
+            prefix = topic.partition(":")[0] + ":"
+            limit = self.limits.get(prefix, self.default)
+        return TokenBucket(limit, self.clock())
+
+    def _evict_idle(self):
+        """Drop full, idle buckets; the next sweep waits until the map doubles"""
+        now = self.clock()
+        for topic, bucket in list(self._buckets.items()):
+            if bucket is None or bucket.idle(now):
+                if bucket is not None:
+                    self._evicted_admitted += bucket.admitted
+                    self._evicted_dropped += bucket.dropped
+                del self._buckets[topic]
+        self._sweep_at = max(MIN_SWEEP_SIZE, 2 * len(self._buckets))
+
+    @staticmethod
+    def _matches(topic: str, patterns: Iterable[str]) -> bool:
+        for pattern in patterns:
+            if topic == pattern or (pattern.endswith(":") and topic.startswith(pattern)):
+                return True
+        return False
+
+    def set_limit(self, topic: str, limit: RateLimit):
+        """Change the limit for a topic or topic prefix"""
+        self.limits[topic] = limit
+        # Retune already resolved buckets in place so their counters survive
+        for key, bucket in self._buckets.items():
+            if bucket is None:
+                continue
+            if key == topic or (topic.endswith(":") and key.startswith(topic) and key not in self.limits):
+                bucket.rate = limit.rate
+                bucket.capacity = limit.burst
+
+    @property
+    def admitted(self) -> int:
+        return self.exempted + self._evicted_admitted + sum(b.admitted for b in self._buckets.values() if b is not None)
+
+    @property
+    def dropped(self) -> int:
+        return self._evicted_dropped + sum(b.dropped for b in self._buckets.values() if b is not None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-topic admitted/dropped counters of the buckets still held"""
+        return {
+            topic: {"admitted": bucket.admitted, "dropped": bucket.dropped}
+            for topic, bucket in self._buckets.items()
+            if bucket is not None
+        }
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional
+import logging
+import random
+import time
+
+class ConnectionHealth(Enum):
+    CONNECTING = "connecting"
+    HEALTHY = "healthy"
+    DEGRADED = "degraded"          # connected, but the link looks unwell
+    RECONNECTING = "reconnecting"  # waiting out a backoff delay or dialing
+    STOPPED = "stopped"            # closed on purpose
+    FAILED = "failed"              # gave up after max_attempts
+
+# Allowed health transitions; anything else is a bug in the caller
+_TRANSITIONS = {
+    ConnectionHealth.STOPPED: {ConnectionHealth.CONNECTING},
+    ConnectionHealth.CONNECTING: {ConnectionHealth.HEALTHY, ConnectionHealth.RECONNECTING,
+                                  ConnectionHealth.STOPPED, ConnectionHealth.FAILED},
+    ConnectionHealth.HEALTHY: {ConnectionHealth.DEGRADED, ConnectionHealth.RECONNECTING,
+                               ConnectionHealth.STOPPED},
+    ConnectionHealth.DEGRADED: {ConnectionHealth.HEALTHY, ConnectionHealth.RECONNECTING,
+                                ConnectionHealth.STOPPED},
+    ConnectionHealth.RECONNECTING: {ConnectionHealth.HEALTHY, ConnectionHealth.RECONNECTING,
+                                    ConnectionHealth.STOPPED, ConnectionHealth.FAILED},
+    ConnectionHealth.FAILED: {ConnectionHealth.CONNECTING, ConnectionHealth.STOPPED},
+}
+
+@dataclass
+class BackoffPolicy:
+    base: float = 2.0        # seconds, ceiling of the first delay
+    cap: float = 15.0        # seconds, largest delay ever used
+    multiplier: float = 2.0
+    max_attempts: Optional[int] = None  # None retries forever at the capped delay
+    stable_after: float = 10.0  # seconds connected before the backoff resets
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Full jitter: uniform between zero and the exponential ceiling"""
+        ceiling = min(self.cap, self.base * self.multiplier ** attempt)
+        return rng.uniform(0, ceiling)
+
+class ReconnectScheduler:
+    """Backoff bookkeeping and connection-health state machine, free of any event loop.
+
+    The owning client reports connection events and arms its own timer with
+    the delay returned by connection_lost(). A connection that drops again
+    before stable_after seconds keeps climbing the backoff instead of
+    starting over, so a flapping server doesn't get hammered by reconnects.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[BackoffPolicy] = None,
+        on_state_change: Optional[Callable[[ConnectionHealth], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        self.policy = policy or BackoffPolicy()
+        self.on_state_change = on_state_change
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.state = ConnectionHealth.STOPPED
+
+        self.attempts = 0
+        self.total_attempts = 0
+        self.reconnects = 0
+        self.last_delay: Optional[float] = None
+        self.last_time_to_reconnect: Optional[float] = None
+        self._lost_at: Optional[float] = None
+        self._connected_at: Optional[float] = None
+
+    def _set_state(self, state: ConnectionHealth):
+        if state == self.state:
+            return
+        if state not in _TRANSITIONS[self.state]:
+            logging.warning(f"Unexpected connection health transition {self.state.value} -> {state.value}")
+        self.state = state
+        if self.on_state_change:
+            self.on_state_change(state)
+
+    def connecting(self):
+        """A connection attempt was started"""
+        if self.state in (ConnectionHealth.STOPPED, ConnectionHealth.FAILED):
+            self._set_state(ConnectionHealth.CONNECTING)
+
+    def connection_established(self):
+        """The socket is up; record how long the outage lasted"""
+        now = self.clock()
+        if self._lost_at is not None:
+            self.last_time_to_reconnect = now - self._lost_at
+            self.reconnects += 1
+            logging.info(f"Reconnected after {self.last_time_to_reconnect:.2f}s and {self.attempts} attempts")
+        self._lost_at = None
+        self._connected_at = now
+        self._set_state(ConnectionHealth.HEALTHY)
+
+    def degraded(self):
+        """Connected, but something (e.g. a late heartbeat) looks wrong"""
+        if self.state == ConnectionHealth.HEALTHY:
+            self._set_state(ConnectionHealth.DEGRADED)
+
+    def recovered(self):
+        if self.state == ConnectionHealth.DEGRADED:
+            self._set_state(ConnectionHealth.HEALTHY)
+
+    def connection_lost(self) -> Optional[float]:
+        """Return the delay before the next attempt, or None to give up"""
+        if self.state == ConnectionHealth.STOPPED:
+            return None
+
+        now = self.clock()
+        if self._connected_at is not None:
+            # Only a connection that stayed up for a while earns a fresh backoff
+            if now - self._connected_at >= self.policy.stable_after:
+                self.attempts = 0
+            self._connected_at = None
+        if self._lost_at is None:
+            self._lost_at = now
+
+        if self.policy.max_attempts is not None and self.attempts >= self.policy.max_attempts:
+            self._set_state(ConnectionHealth.FAILED)
+            return None
+
+        delay = self.policy.delay(self.attempts, self.rng)
+        self.attempts += 1
+        self.total_attempts += 1
+        self.last_delay = delay
+        self._set_state(ConnectionHealth.RECONNECTING)
+        return delay
+
+    def stop(self):
+        """The connection was closed on purpose; don't reconnect"""
+        self._lost_at = None
+        self._connected_at = None
+        self.attempts = 0
+        self._set_state(ConnectionHealth.STOPPED)
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "state": self.state.value,
+            "attempts": self.attempts,
+            "total_attempts": self.total_attempts,
+            "reconnects": self.reconnects,
+            "last_delay": self.last_delay,
+            "last_time_to_reconnect": self.last_time_to_reconnect,
+            "down_for": None if self._lost_at is None else self.clock() - self._lost_at
+        }
@@ -0,0 +1,130 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import time
+
+from .codec import PhoenixMessage
+from .instrumentation import Metrics
+
+Handler = Callable[[PhoenixMessage], Any]
+
+# Matches any single topic segment, or every remaining segment when last
+WILDCARD = "*"
+SEPARATOR = ":"
+
+# Resolved (topic, event) entries kept before the cache is reset
+CACHE_LIMIT = 65536
+
+class _Node:
+    """Trie node: child segments plus handlers registered per event name"""
+    __slots__ = ("children", "wildcard", "events")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.wildcard: Optional["_Node"] = None
+        self.events: Dict[str, List[Handler]] = {}
+
+class TopicRouter:
+    """Route Phoenix messages to handlers registered per topic pattern and event.
+
+    Topic patterns are split on ":" into a prefix trie, so "system",
+    "risks:*" and "org:*:alerts" can all be registered side by side. Event
+    names are matched exactly, with "*" catching every event on the topic.
+    Matching handlers are resolved once per (topic, event) pair and cached,
+    so dispatch is a single dict lookup however many routes are registered.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._cache: Dict[Tuple[str, str], Tuple[Handler, ...]] = {}
+
+    def register(self, topic_pattern: str, event: str, handler: Handler):
+        """Call handler for event (or "*") on topics matching topic_pattern"""
+        node = self._root
+        for segment in topic_pattern.split(SEPARATOR):
+            if segment == WILDCARD:
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+        node.events.setdefault(event, []).append(handler)
+        self._cache.clear()
+
+    def unregister(self, topic_pattern: str, event: str, handler: Handler):
+        """Remove a previously registered handler"""
+        node = self._root
+        for segment in topic_pattern.split(SEPARATOR):
+            node = node.wildcard if segment == WILDCARD else node.children.get(segment)
+            if node is None:
+                return
+        handlers = node.events.get(event)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            self._cache.clear()
+
+    def route(self, topic_pattern: str, event: str = WILDCARD) -> Callable[[Handler], Handler]:
+        """Decorator form of register()"""
+        def decorator(handler: Handler) -> Handler:
+            self.register(topic_pattern, event, handler)
+            return handler
+        return decorator
+
+    def handlers_for(self, topic: str, event: str) -> Tuple[Handler, ...]:
+        """Handlers for a topic/event, most specific pattern first"""
+        key = (topic, event)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        handlers: List[Handler] = []
+        for node in self._match(topic.split(SEPARATOR)):
+            handlers.extend(node.events.get(event, ()))
+            if event != WILDCARD:
+                handlers.extend(node.events.get(WILDCARD, ()))
+        if len(self._cache) >= CACHE_LIMIT:
+            self._cache.clear()
+        result = self._cache[key] = tuple(handlers)
+        return result
+
+    def _match(self, segments: List[str]) -> List[_Node]:
+        """Trie nodes whose pattern matches the topic, exact segments first"""
+        matches = []
+
+        def walk(node: _Node, index: int):
+            if index == len(segments):
+                matches.append(node)
+                return
+            child = node.children.get(segments[index])
+            if child is not None:
+                walk(child, index + 1)
+            if node.wildcard is not None:
+                walk(node.wildcard, index + 1)
+                # A trailing wildcard also swallows the rest of the topic
+                if index + 1 < len(segments) and node.wildcard.events:
+                    matches.append(node.wildcard)
+
+        walk(self._root, 0)
+        return matches
+
+    def dispatch(self, message: PhoenixMessage) -> bool:
+        """Deliver a message to its handlers; False if nothing is registered"""
+        handlers = self.handlers_for(message.topic, message.event)
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception as e:
+                logging.error(f"Error in handler for {message.topic}/{message.event}: {e}")
+        return bool(handlers)
+
+    def dispatch_measured(self, message: PhoenixMessage, metrics: Metrics) -> bool:
+        """dispatch(), timing each handler into metrics"""
+        handlers = self.handlers_for(message.topic, message.event)
+        for handler in handlers:
+            started = time.perf_counter()
+            try:
+                handler(message)
+            except Exception as e:
+                logging.error(f"Error in handler for {message.topic}/{message.event}: {e}")
+            metrics.observe_handler(message.topic, message.event, time.perf_counter() - started)
+        return bool(handlers)
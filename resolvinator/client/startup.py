@@ -0,0 +1,97 @@
+"""Startup milestones and import-time profiles for the desktop client.
+
+Profile what importing a module costs, as a -X importtime breakdown:
+
+    python -m resolvinator.client.startup [module] [--top 25]
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import time
+
+class StartupTimer:
+    """Seconds from its creation to each named milestone of startup"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        elapsed = self.marks[name] = self.clock() - self.started
+        logging.info(f"Startup: {name} at {elapsed * 1000:.0f} ms")
+        return elapsed
+
+    def report(self) -> str:
+        """The milestones as one JSON line, for benchmarks reading the client's stdout"""
+        return json.dumps({"startup": self.marks})
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    # Nesting level in the import tree, 0 for imports made by the profiled code itself
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.partition(".")[0]
+
+def parse_importtime(text: str) -> List[ImportTiming]:
+    """Timings from python -X importtime output, in the order imports finished"""
+    timings = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+def profile_imports(module: str, python: str = sys.executable) -> List[ImportTiming]:
+    """Import module in a fresh interpreter with -X importtime and parse what it reports"""
+    child = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+    if child.returncode != 0:
+        errors = [line for line in child.stderr.splitlines() if not line.startswith("import time:")]
+        raise ImportError(errors[-1] if errors else f"importing {module} failed")
+    return parse_importtime(child.stderr)
+
+def import_report(timings: List[ImportTiming], top: int = 25, module: Optional[str] = None) -> str:
+    """Slowest imports by cumulative time, then self time summed per top-level package"""
+    total = sum(timing.self_us for timing in timings)
+    lines = [f"{len(timings)} modules, {total / 1000:.1f} ms" + (f" importing {module}" if module else "")]
+
+    lines.append("")
+    lines.append(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for timing in sorted(timings, key=lambda timing: timing.cumulative_us, reverse=True)[:top]:
+        lines.append(f"{timing.cumulative_us / 1000:>14.1f}{timing.self_us / 1000:>10.1f}  "
+                     f"{'  ' * timing.depth}{timing.module}")
+
+    packages: Dict[str, int] = {}
+    for timing in timings:
+        packages[timing.package] = packages.get(timing.package, 0) + timing.self_us
+    lines.append("")
+    lines.append(f"{'self ms':>14}{'share':>10}  package")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{self_us / 1000:>14.1f}{self_us / max(total, 1) * 100:>9.1f}%  {package}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of a module")
+    parser.add_argument("module", nargs="?", default="resolvinator.client.app")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+    try:
+        timings = profile_imports(args.module)
+    except ImportError as e:
+        sys.exit(f"Can't profile {args.module}: {e}")
+    print(import_report(timings, args.top, args.module))
+
+if __name__ == "__main__":
+    main()
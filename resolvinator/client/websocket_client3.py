@@ -1,13 +1,33 @@
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, Qt, pyqtSignal, QTimer, QUrl
 from PyQt6.QtWebSockets import QWebSocket
 from PyQt6.QtNetwork import QAbstractSocket
-import json
 import logging
-from typing import Optional, Dict, Any
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Callable
 from enum import Enum
+from functools import partial
 from riskkit.client import RiskkitClient
 from riskkit.enums import EventPriority
 from riskkit.events import EventManager, SystemEvent
+from .codec import Frame, FrameDecoder, PhoenixMessage, V1Serializer, V2Serializer, get_serializer
+from .rate_limiter import TopicRateLimiter
+from .router import WILDCARD, TopicRouter
+from .reconnect import BackoffPolicy, ConnectionHealth, ReconnectScheduler
+from .heartbeat import LatencyHistogram
+from .decode_worker import DecodeWorker
+from .inbound_queue import InboundQueue
+from .instrumentation import Metrics, MetricsExporter
+from .protocol import JoinParams, PhoenixProtocol
+from .presence import PresenceStore
+from .entity_cache import EntityCache
+
+# System topic events forwarded to the EventManager
+SYSTEM_EVENTS = {
+    "system:maintenance_start": SystemEvent.MAINTENANCE_STARTED,
+    "system:maintenance_end": SystemEvent.MAINTENANCE_ENDED,
+    "system:update_available": SystemEvent.UPDATE_AVAILABLE,
+    "system:disk_space_warning": SystemEvent.DISK_SPACE_LOW
+}
 
 class WebSocketState(Enum):
     CONNECTING = "connecting"
@@ -41,9 +61,39 @@ class WebSocketClient(QObject):
     event_received = pyqtSignal(dict)
     notification_received = pyqtSignal(dict)
     system_status_updated = pyqtSignal(dict)
-    user_presence_changed = pyqtSignal(int, bool)  # user_id, is_online
-
-    def __init__(self, base_url: str, token: str, event_manager: EventManager = None):
+    presence_changed = pyqtSignal(list, list)  # user ids that came online, went offline
+    user_presence_changed = pyqtSignal(int, bool)  # user_id, is_online; once per user in presence_changed
+
+    # Channel join tracking
+    channel_joined = pyqtSignal(str, float)  # topic, seconds until reply
+    channel_join_failed = pyqtSignal(str, dict)  # topic, server response
+    all_channels_ready = pyqtSignal(int, float)  # channel count, seconds since first join
+    entities_synced = pyqtSignal(str, int)  # topic, entities changed by its join reply
+
+    # Reconnect tracking
+    health_changed = pyqtSignal(ConnectionHealth)
+    reconnected = pyqtSignal(float, int)  # seconds offline, attempts used
+    latency_measured = pyqtSignal(float)  # heartbeat round trip, seconds
+
+    # Raised by the decode worker thread when decoded frames are waiting
+    frames_decoded = pyqtSignal()
+
+    def __init__(self, base_url: str, token: str, event_manager: EventManager = None,
+                 decoder: Optional[FrameDecoder] = None,
+                 rate_limiter: Optional[TopicRateLimiter] = None,
+                 serializer: Optional[V1Serializer] = None,
+                 vsn: str = V2Serializer.vsn,
+                 router: Optional[TopicRouter] = None,
+                 reconnect_policy: Optional[BackoffPolicy] = None,
+                 heartbeat_interval: float = 30.0,
+                 degraded_rtt: float = 2.0,
+                 compress_threshold: Optional[int] = None,
+                 decode_in_background: bool = True,
+                 max_batch: int = 500,
+                 inbound: Optional[InboundQueue] = None,
+                 entity_cache: Optional[EntityCache] = None,
+                 metrics: Optional[Metrics] = None,
+                 metrics_exporter: Optional[MetricsExporter] = None):
         super().__init__()
         # Enforce WSS for non-localhost
         if not base_url.startswith(('wss://', 'ws://')):
@@ -59,21 +109,54 @@ class WebSocketClient(QObject):
         self.socket = QWebSocket()
         self.socket.setProperty("Authorization", f"Bearer {self.token}")
         self.socket.setProperty("X-Client-Version", "1.0.0")
-        
-        # Add message validation tracking
-        self.last_message_time = 0
-        self.message_count = 0
-        self.rate_limit_window = 60  # 60 seconds
-        self.rate_limit_max = 100    # max 100 messages per minute
+
+        # Opt-in counters and stage timings, one Metrics per client
+        if metrics is None and metrics_exporter is not None:
+            metrics = metrics_exporter.metrics
+        self.metrics = metrics
+        self.metrics_exporter = metrics_exporter
+
+        # Channel state, framing, joins, heartbeats and routing. QWebSocket can't
+        # negotiate permessage-deflate, so large payloads can be zlib-compressed
+        # by the serializer instead (compress_threshold, 2.0.0 framing only)
+        self.protocol = PhoenixProtocol(
+            send=self._write,
+            schedule=lambda flush: QTimer.singleShot(0, flush),
+            serializer=serializer or get_serializer(vsn, decoder, compress_threshold=compress_threshold),
+            rate_limiter=rate_limiter,
+            router=router,
+            heartbeat_interval=heartbeat_interval,
+            # Round trips land in the event manager's histogram when it has one
+            latency=getattr(event_manager, "link_latency", None) or LatencyHistogram(),
+            on_joined=self._counted("channel_joined", self.channel_joined.emit),
+            on_join_reply=self._on_join_reply,
+            on_join_failed=self._counted("channel_join_failed", self.channel_join_failed.emit),
+            on_all_ready=self._counted("all_channels_ready", self.all_channels_ready.emit),
+            on_heartbeat=self._on_heartbeat_reply,
+            on_auth_failed=self._counted("auth_failed", self.auth_failed.emit),
+            metrics=metrics
+        )
+        self.serializer = self.protocol.serializer
+
+        # Risks, mitigations and tasks by id and by project. Entity signals fire
+        # from here, once per actual change, whether it came from a live event
+        # or from the delta a rejoin brings back
+        self.entities = entity_cache if entity_cache is not None else EntityCache()
+        self.entities.on_change = self._on_entity_change
+
+        # Topic/event dispatch; downstream modules can register more routes
+        self.router = self.protocol.router
+        self._register_default_routes()
         
         # Connection state
         self.current_state = WebSocketState.DISCONNECTED
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 5
-        
-        # Setup reconnection timer
+
+        # Exponential backoff with full jitter; retries forever at the capped delay by default
+        self.reconnect = ReconnectScheduler(reconnect_policy, on_state_change=self.health_changed.emit)
+
+        # Setup reconnection timer, re-armed with a fresh delay after every failure
         self.reconnect_timer = QTimer(self)
-        self.reconnect_timer.setInterval(5000)  # 5 seconds
+        self.reconnect_timer.setSingleShot(True)
         self.reconnect_timer.timeout.connect(self._try_reconnect)
         
         # Track subscriptions
@@ -86,13 +169,38 @@ class WebSocketClient(QObject):
         
         # Operation tracking
         self.operation_counter = 0
-        self.ref_counter = 0
-        self.channels = {}
+
+        # Online users from presence_state/presence_diff, one signal per change
+        self.presence = PresenceStore(on_change=self._counted("presence_changed", self._emit_presence))
+
+        # Phoenix heartbeats, sent by our timer
+        self.degraded_rtt = degraded_rtt
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(int(heartbeat_interval * 1000))
+        self.heartbeat_timer.timeout.connect(self._send_heartbeat)
+
+        # Frames are parsed and validated off the GUI thread; the GUI thread
+        # wakes once per drained batch and handles at most max_batch per tick.
+        # Decoded messages wait in bounded priority lanes, so under overload
+        # system notices go first and each lane sheds load by its own policy
+        self.max_batch = max_batch
+        self.inbound = inbound if inbound is not None else InboundQueue()
+        self.decode_worker: Optional[DecodeWorker] = None
+        if decode_in_background:
+            self.decode_worker = DecodeWorker(self.protocol.decode, self.frames_decoded.emit, outbox=self.inbound)
+            self.frames_decoded.connect(self._deliver_decoded, Qt.ConnectionType.QueuedConnection)
+
+        # Write metrics to disk periodically
+        self.metrics_timer = QTimer(self)
+        if metrics_exporter is not None:
+            self.metrics_timer.setInterval(int(metrics_exporter.interval * 1000))
+            self.metrics_timer.timeout.connect(metrics_exporter.write)
 
         # Connect socket signals
         self.socket.connected.connect(self._on_connected)
         self.socket.disconnected.connect(self._on_disconnected)
         self.socket.textMessageReceived.connect(self._on_message)
+        self.socket.binaryMessageReceived.connect(self._on_binary_message)
         self.socket.error.connect(self._on_error)
 
     def connect_to_server(self):
@@ -103,35 +211,50 @@ class WebSocketClient(QObject):
             # Add security parameters
             params = {
                 "token": self.token,
-                "vsn": "2.0.0",
+                "vsn": self.serializer.vsn,
                 "client_version": "1.0.0"
             }
             param_string = "&".join(f"{k}={v}" for k, v in params.items())
             url = f"{self.base_url}/socket/websocket?{param_string}"
             
-            self.socket.open(url)
+            if self.decode_worker:
+                self.decode_worker.start()
+            if self.metrics_exporter and not self.metrics_timer.isActive():
+                self.metrics_timer.start()
+            self.reconnect.connecting()
+            self.socket.open(QUrl(url))
 
     def disconnect(self):
         """Cleanly disconnect from server"""
         self.reconnect_timer.stop()
+        self.heartbeat_timer.stop()
+        self.reconnect.stop()
         if self.socket.state() == QAbstractSocket.SocketState.ConnectedState:
             self.socket.close()
+        if self.decode_worker:
+            self.decode_worker.stop()
+        if self.metrics_exporter:
+            self.metrics_timer.stop()
+            self.metrics_exporter.write()
 
-    def subscribe_to_project(self, project_id: int):
+    def subscribe_to_project(self, project_id: int) -> List[Future]:
         """Subscribe to project-specific channels"""
-        self.join_channel(f"risks:{project_id}")
-        self.join_channel(f"project:{project_id}")
+        topics = [f"risks:{project_id}", f"project:{project_id}"]
+        if str(project_id) in self.subscribed_channels["projects"]:
+            # Already holding these topics; don't take another reference
+            futures = [self._current_join(topic) for topic in topics]
+        else:
+            self.subscribed_channels["projects"].add(str(project_id))
+            # Rejoins ask only for what changed since the newest version cached
+            futures = [self.join_channel(topic, partial(self.entities.join_params, topic)) for topic in topics]
+        return [f for f in futures if f is not None]
 
-    def subscribe_to_channel(self, channel: str, **kwargs):
+    def subscribe_to_channel(self, channel: str, **kwargs) -> Optional[Future]:
         """Subscribe to a specific channel type"""
         if self.current_state == WebSocketState.CONNECTED:
-            message = {
-                "topic": f"{channel}",
-                "event": "phx_join",
-                "payload": kwargs,
-                "ref": channel
-            }
-            self.socket.sendTextMessage(json.dumps(message))
+            if self.subscribed_channels.get(channel):
+                return self._current_join(channel)
+            future = self.join_channel(channel, kwargs)
             
             if channel == "news":
                 self.subscribed_channels["news"] = True
@@ -140,6 +263,8 @@ class WebSocketClient(QObject):
             elif channel == "system":
                 self.subscribed_channels["system"] = True
             logging.info(f"Subscribed to channel: {channel}")
+            return future
+        return None
 
     def subscribe_to_all_channels(self):
         """Subscribe to all available channels"""
@@ -150,15 +275,12 @@ class WebSocketClient(QObject):
 
     def unsubscribe_from_project(self, project_id: int):
         """Unsubscribe from a project's updates"""
-        if self.current_state == WebSocketState.CONNECTED:
-            message = {
-                "topic": f"project:{project_id}",
-                "event": "phx_leave",
-                "payload": {},
-                "ref": str(project_id)
-            }
-            self.socket.sendTextMessage(json.dumps(message))
-            self.subscribed_channels["projects"].discard(str(project_id))
+        if str(project_id) not in self.subscribed_channels["projects"]:
+            return
+        # Leaving also drops the topics from the rejoin list while disconnected
+        self.leave_channel(f"risks:{project_id}")
+        self.leave_channel(f"project:{project_id}")
+        self.subscribed_channels["projects"].discard(str(project_id))
 
     def _set_state(self, new_state: WebSocketState):
         """Update connection state and emit signal"""
@@ -170,27 +292,26 @@ class WebSocketClient(QObject):
         """Handle successful connection"""
         self._set_state(WebSocketState.CONNECTED)
         self.connected.emit()
-        self.reconnect_attempts = 0
         self.reconnect_timer.stop()
+        recovering = self.reconnect.state == ConnectionHealth.RECONNECTING
+        attempts = self.reconnect.attempts
+        self.reconnect.connection_established()
+        if recovering:
+            self.reconnected.emit(self.reconnect.last_time_to_reconnect, attempts)
 
-        # Resubscribe to previous channels
-        for project_id in self.subscribed_channels["projects"]:
-            self.subscribe_to_project(int(project_id))
-        
-        # Resubscribe to all channels
-        if self.subscribed_channels["news"]:
-            self.subscribe_to_channel("news")
-        if self.subscribed_channels["events"]:
-            self.subscribe_to_channel("events")
-        if self.subscribed_channels["system"]:
-            self.subscribe_to_channel("system")
+        self.heartbeat_timer.start()
+
+        # Resubscribe to previous channels; the pipeline sends them as one
+        # batch and emits all_channels_ready once every reply is in
+        self.protocol.connection_made()
 
     def _on_disconnected(self):
         """Handle disconnection"""
         self._set_state(WebSocketState.DISCONNECTED)
         self.disconnected.emit()
-        if self.reconnect_attempts < self.max_reconnect_attempts:
-            self.reconnect_timer.start()
+        self.heartbeat_timer.stop()
+        self.protocol.connection_lost()
+        self._schedule_reconnect()
 
     def _on_error(self, error_code):
         """Enhanced error handling with event manager"""
@@ -207,155 +328,162 @@ class WebSocketClient(QObject):
         
         logging.error(error_msg)
 
+    def _schedule_reconnect(self):
+        """Arm the reconnect timer with the next backoff delay"""
+        if self.reconnect_timer.isActive():
+            return
+        delay = self.reconnect.connection_lost()
+        if delay is None:
+            if self.reconnect.state == ConnectionHealth.FAILED:
+                self.error.emit("Max reconnection attempts reached")
+            return
+        logging.info(f"Reconnecting in {delay:.2f}s (attempt {self.reconnect.attempts})")
+        self.reconnect_timer.start(int(delay * 1000))
+
     def _try_reconnect(self):
         """Attempt to reconnect to server"""
-        if self.reconnect_attempts < self.max_reconnect_attempts:
-            self.reconnect_attempts += 1
-            logging.info(f"Attempting reconnection {self.reconnect_attempts}/{self.max_reconnect_attempts}")
-            self.connect_to_server()
+        logging.info(f"Attempting reconnection {self.reconnect.attempts}")
+        self.connect_to_server()
+
+    def _send_heartbeat(self):
+        """Send the next heartbeat, or drop the connection if the last one went unanswered"""
+        if not self.protocol.heartbeat_tick():
+            self.reconnect.degraded()
+            # Abort emits disconnected, which schedules the reconnect
+            self.socket.abort()
+
+    def _on_heartbeat_reply(self, rtt: float):
+        """Track link health from a heartbeat round trip"""
+        if rtt > self.degraded_rtt:
+            self.reconnect.degraded()
         else:
-            self.reconnect_timer.stop()
-            self.error.emit("Max reconnection attempts reached")
-
-    def _validate_message(self, data: dict) -> bool:
-        """Validate incoming messages for rate limiting and structure"""
-        current_time = time.time()
-        
-        # Rate limiting
-        if current_time - self.last_message_time > self.rate_limit_window:
-            self.message_count = 0
-            self.last_message_time = current_time
-        
-        self.message_count += 1
-        if self.message_count > self.rate_limit_max:
-            logging.warning("Rate limit exceeded")
-            return False
-
-        # Message structure validation
-        required_fields = ["topic", "event", "payload"]
-        if not all(field in data for field in required_fields):
-            logging.warning("Invalid message structure")
-            return False
-
-        # Payload size validation (prevent memory attacks)
-        payload_size = len(json.dumps(data.get("payload", {})))
-        if payload_size > 1024 * 1024:  # 1MB limit
-            logging.warning("Message payload too large")
-            return False
-
-        return True
-
-    def _on_message(self, message: str):
+            self.reconnect.recovered()
+        self.latency_measured.emit(rtt)
+
+    def latency_stats(self) -> Dict[str, Optional[float]]:
+        """Rolling p50/p95/p99 heartbeat round-trip times, in seconds"""
+        return self.protocol.heartbeat.histogram.snapshot()
+
+    def inbound_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-lane queue depth, high-water mark and drop/coalesce counters"""
+        return self.inbound.stats()
+
+    def metrics_snapshot(self) -> Optional[dict]:
+        """Counters and stage timings, or None when instrumentation is off"""
+        return self.metrics.snapshot() if self.metrics is not None else None
+
+    def reconnect_metrics(self) -> Dict[str, Any]:
+        """Attempts, time-to-reconnect and current health of the connection"""
+        return self.reconnect.metrics()
+
+    def _write(self, frames: List[Frame]):
+        """Write frames back to back and flush the socket once"""
+        for frame in frames:
+            if isinstance(frame, bytes):
+                self.socket.sendBinaryMessage(frame)
+            else:
+                self.socket.sendTextMessage(frame)
+        self.socket.flush()
+
+    def _on_binary_message(self, message):
+        """Handle V2 binary frames (QByteArray)"""
+        self._on_message(bytes(message))
+
+    def _on_message(self, message: Frame):
         """Handle Phoenix channel messages with security validation"""
-        try:
-            data = json.loads(message)
-            
-            # Validate message before processing
-            if not self._validate_message(data):
-                logging.warning("Message validation failed")
-                return
-                
-            # Handle authentication errors
-            if data.get("event") == "phx_error":
-                if "unauthorized" in str(data.get("payload")):
-                    self.auth_failed.emit("Authentication failed")
-                    return
-
-            topic = data.get("topic", "")
-            event = data.get("event")
-            payload = data.get("payload", {})
-
-            # Add security audit logging for sensitive operations
-            if event in ["user:join", "user:leave", "system:update"]:
-                logging.info(f"Security audit: {event} from {topic}")
-
-            # Handle join responses
-            if event == "phx_reply":
-                if payload.get("status") == "ok":
-                    logging.info(f"Successfully joined channel: {topic}")
-                return
-
-            # Handle different types of messages
-            if topic.startswith("risks:"):
-                self._handle_risk_event(event, payload)
-            elif topic.startswith("project:"):
-                self._handle_project_event(event, payload)
-            elif topic.startswith("user:"):
-                self._handle_user_message(event, payload)
-            elif topic == "system":
-                self._handle_system_event(event, payload)
-
-        except json.JSONDecodeError:
-            logging.error(f"Invalid JSON message received")
-        except Exception as e:
-            logging.error(f"Error processing message: {str(e)}")
-
-    def _handle_risk_event(self, event: str, payload: dict):
-        """Handle risk-related events"""
-        if event == "risk:created":
-            self.risk_created.emit(payload)
-        elif event == "risk:updated":
-            self.risk_updated.emit(payload)
-        elif event == "risk:deleted":
-            self.risk_deleted.emit(payload.get("id"))
-
-    def _handle_project_event(self, event: str, payload: dict):
-        """Handle project-specific events"""
-        if event == "mitigation:created":
-            self.mitigation_created.emit(payload)
-        elif event == "mitigation:updated":
-            self.mitigation_updated.emit(payload)
-        elif event == "task:completed":
-            self.task_completed.emit(payload)
-
-    def _handle_system_event(self, event: str, payload: dict):
-        """Enhanced system message handler with event manager integration"""
-        if not self.event_manager:
-            return
+        if self.decode_worker:
+            self.decode_worker.submit(message)
+        else:
+            # Handled as it arrives, so nothing queues up to prioritize
+            self.protocol.receive_frame(message)
+
+    def _deliver_decoded(self):
+        """Handle a batch from the decode worker, yielding to the event loop between batches"""
+        batch, more = self.decode_worker.take(self.max_batch)
+        for data in batch:
+            self.protocol.receive(data)
+        if more:
+            QTimer.singleShot(0, self._deliver_decoded)
+
+    def _counted(self, name: str, emit: Callable) -> Callable:
+        """emit, counted as signal `name` when metrics are on; chosen once so it costs nothing when off"""
+        if self.metrics is None:
+            return emit
+        signal_emitted = self.metrics.signal_emitted
+
+        def counted(*args):
+            signal_emitted(name)
+            emit(*args)
+        return counted
+
+    def _emit_presence(self, joined: List[int], left: List[int]):
+        """presence_changed for the batch, then user_presence_changed for each user in it"""
+        self.presence_changed.emit(joined, left)
+        for user_id in joined:
+            self.user_presence_changed.emit(user_id, True)
+        for user_id in left:
+            self.user_presence_changed.emit(user_id, False)
+
+    def _register_default_routes(self):
+        """Register the client's own handlers; other modules add theirs via self.router"""
+        route = self.router.register
+        # (kind, action) -> signal, fired by the entity cache
+        self._entity_signals = {
+            tuple(name.split("_", 1)): self._counted(name, getattr(self, name).emit) for name in (
+                "risk_created", "risk_updated", "risk_deleted", "mitigation_created", "mitigation_updated",
+                "mitigation_deleted", "task_created", "task_updated", "task_completed")}
+        for event in ("risk:created", "risk:updated", "risk:deleted"):
+            route("risks:*", event, self._apply_entity)
+        for event in ("mitigation:created", "mitigation:updated", "task:completed"):
+            route("project:*", event, self._apply_entity)
+        self._emit_status = self._counted("system_status_updated", self.system_status_updated.emit)
+
+        route("user:*", WILDCARD, self._handle_user_message)
+
+        for event, system_event in SYSTEM_EVENTS.items():
+            route("system", event, partial(self._emit_system_event, system_event))
+        route("system", WILDCARD, self._handle_system_status)
+
+    def _apply_entity(self, message: PhoenixMessage):
+        """Update the entity cache; it signals if anything changed"""
+        self.entities.apply(message.topic, message.event, message.payload)
+
+    def _on_entity_change(self, kind: str, action: str, entity: dict):
+        emit = self._entity_signals.get((kind, action))
+        if emit is not None:
+            emit(entity.get("id") if action == "deleted" else entity)
+
+    def _on_join_reply(self, topic: str, response: dict):
+        """Apply the changes or snapshot a risks:/project: join reply carries"""
+        if topic.startswith(("risks:", "project:")):
+            changed = self.entities.apply_sync(topic, response)
+            self.entities_synced.emit(topic, changed)
+
+    def _emit_system_event(self, system_event: SystemEvent, message: PhoenixMessage):
+        """Forward a system topic event to the event manager"""
+        if self.event_manager:
+            self.event_manager.publish_system_event(system_event, message.payload)
 
-        if event == "system:maintenance_start":
-            self.event_manager.system_event.emit(
-                SystemEvent.MAINTENANCE_STARTED,
-                payload
-            )
-        elif event == "system:maintenance_end":
-            self.event_manager.system_event.emit(
-                SystemEvent.MAINTENANCE_ENDED,
-                payload
-            )
-        elif event == "system:update_available":
-            self.event_manager.system_event.emit(
-                SystemEvent.UPDATE_AVAILABLE,
-                payload
-            )
-        elif event == "system:disk_space_warning":
-            self.event_manager.system_event.emit(
-                SystemEvent.DISK_SPACE_LOW,
-                payload
-            )
-        
-        self.system_status_updated.emit(payload)
+    def _handle_system_status(self, message: PhoenixMessage):
+        """Publish every system topic payload as a status update"""
+        if self.event_manager:
+            self._emit_status(message.payload)
 
-    def _handle_user_message(self, event: str, payload: dict):
+    def _handle_user_message(self, message: PhoenixMessage):
         """Handle user-related messages with security checks"""
+        payload = message.payload
         # Validate user IDs
         if "from_user_id" in payload and not isinstance(payload["from_user_id"], int):
             logging.warning("Invalid user ID in message")
             return
             
-        if event == "presence_diff":
-            for user_id in payload.get("joins", {}):
-                self.user_presence_changed.emit(int(user_id), True)
-            for user_id in payload.get("leaves", {}):
-                self.user_presence_changed.emit(int(user_id), False)
-
-    @staticmethod
-    def _sanitize_content(content: str) -> str:
-        """Basic content sanitization"""
-        # Add basic sanitization - extend as needed
-        import html
-        content = html.escape(content)
-        return content
+        if message.event == "presence_state":
+            self.presence.apply_state(payload)
+        elif message.event == "presence_diff":
+            self.presence.apply_diff(payload)
+
+    def is_user_online(self, user_id: int) -> bool:
+        return self.presence.is_online(user_id)
 
     def _get_operation_id(self) -> str:
         """Generate unique operation ID"""
@@ -367,34 +495,15 @@ class WebSocketClient(QObject):
         if self.event_manager:
             self.event_manager.unregister_operation(op_id)
 
-    def _get_ref(self) -> str:
-        """Get unique Phoenix message reference"""
-        self.ref_counter += 1
-        return str(self.ref_counter)
-
-    def join_channel(self, topic: str, params: dict = None):
-        """Join a Phoenix channel"""
-        if self.current_state == WebSocketState.CONNECTED:
-            ref = self._get_ref()
-            message = {
-                "topic": topic,
-                "event": "phx_join",
-                "payload": params or {},
-                "ref": ref
-            }
-            self.socket.sendTextMessage(json.dumps(message))
-            self.channels[topic] = ref
-            logging.info(f"Joining channel: {topic}")
+    def join_channel(self, topic: str, params: Optional[JoinParams] = None) -> Optional[Future]:
+        """Take a reference on a Phoenix channel; the future resolves with the join reply"""
+        join = self.protocol.join(topic, params)
+        return join.future if join is not None else None
 
     def leave_channel(self, topic: str):
-        """Leave a Phoenix channel"""
-        if topic in self.channels:
-            message = {
-                "topic": topic,
-                "event": "phx_leave",
-                "payload": {},
-                "ref": self._get_ref()
-            }
-            self.socket.sendTextMessage(json.dumps(message))
-            del self.channels[topic]
-            logging.info(f"Left channel: {topic}")
\ No newline at end of file
+        """Drop a reference on a Phoenix channel, leaving it with the last one"""
+        self.protocol.leave(topic)
+
+    def _current_join(self, topic: str) -> Optional[Future]:
+        join = self.protocol.joins.get(topic) if topic in self.protocol.channels else None
+        return join.future if join is not None else None
@@ -58,4 +58,64 @@ defmodule Resolvinator.MessagesTest do
       assert %Ecto.Changeset{} = Messages.change_message(message)
     end
   end
+
+  describe "list_conversation/3" do
+    alias Resolvinator.Messages.Message
+
+    # inserted_at is set directly so the order doesn't depend on the clock
+    defp insert_message(from, to, seconds, attrs \\ %{}) do
+      Repo.insert!(
+        struct(
+          %Message{
+            content: "message #{seconds}",
+            from_user_id: from,
+            to_user_id: to,
+            inserted_at: DateTime.add(~U[2024-11-01 12:00:00Z], seconds)
+          },
+          attrs
+        )
+      )
+    end
+
+    setup do
+      me = Ecto.UUID.generate()
+      peer = Ecto.UUID.generate()
+      # Alternating senders, one second apart, plus another conversation's message
+      messages = for n <- 1..5, do: if(rem(n, 2) == 0, do: insert_message(me, peer, n), else: insert_message(peer, me, n))
+      insert_message(me, Ecto.UUID.generate(), 3)
+      %{me: me, peer: peer, messages: messages}
+    end
+
+    defp ids(messages), do: Enum.map(messages, & &1.id)
+
+    test "returns the newest page, oldest first", %{me: me, peer: peer, messages: messages} do
+      assert ids(Messages.list_conversation(me, peer, limit: 3)) == ids(Enum.slice(messages, 2..4))
+      assert ids(Messages.list_conversation(peer, me)) == ids(messages)
+    end
+
+    test "pages backwards from the oldest message loaded", %{me: me, peer: peer, messages: messages} do
+      [oldest | _] = page = Messages.list_conversation(me, peer, limit: 2)
+      assert ids(page) == ids(Enum.slice(messages, 3..4))
+
+      [oldest | _] = page = Messages.list_conversation(me, peer, limit: 2, before: oldest.id)
+      assert ids(page) == ids(Enum.slice(messages, 1..2))
+
+      assert ids(Messages.list_conversation(me, peer, limit: 2, before: oldest.id)) == ids(Enum.take(messages, 1))
+      assert Messages.list_conversation(me, peer, before: hd(messages).id) == []
+    end
+
+    test "breaks ties on inserted_at by id without skipping or repeating", %{me: me, peer: peer} do
+      tied = for _ <- 1..4, do: insert_message(me, peer, 10)
+      expected = tied |> ids() |> Enum.sort()
+
+      first = Messages.list_conversation(me, peer, limit: 2)
+      second = Messages.list_conversation(me, peer, limit: 2, before: hd(first).id)
+      assert ids(second) ++ ids(first) == expected
+    end
+
+    test "returns an empty page for an unknown or malformed cursor", %{me: me, peer: peer} do
+      assert Messages.list_conversation(me, peer, before: Ecto.UUID.generate()) == []
+      assert Messages.list_conversation(me, peer, before: "42") == []
+    end
+  end
 end
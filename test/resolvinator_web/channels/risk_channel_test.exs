@@ -0,0 +1,62 @@
+defmodule ResolvinatorWeb.RiskChannelTest do
+  use ResolvinatorWeb.ChannelCase
+
+  alias Resolvinator.Repo
+  alias ResolvinatorWeb.{RiskChannel, UserSocket}
+
+  # Project.changeset doesn't cast creator_id, so insert the row directly
+  defp insert_project(creator_id) do
+    id = Ecto.UUID.generate()
+    now = DateTime.utc_now() |> DateTime.truncate(:second)
+
+    Repo.insert_all("projects", [
+      %{
+        id: Ecto.UUID.dump!(id),
+        name: "project #{id}",
+        status: "active",
+        risk_appetite: "cautious",
+        settings: %{},
+        creator_id: Ecto.UUID.dump!(creator_id),
+        inserted_at: now,
+        updated_at: now
+      }
+    ])
+
+    id
+  end
+
+  defp user_socket(user_id) do
+    socket(UserSocket, "user_socket:#{user_id}", %{user_id: user_id})
+  end
+
+  setup do
+    creator_id = Ecto.UUID.generate()
+    %{creator_id: creator_id, project_id: insert_project(creator_id)}
+  end
+
+  describe "join risks:<project_id>" do
+    test "returns a snapshot to the project's creator", %{creator_id: creator_id, project_id: project_id} do
+      assert {:ok, reply, socket} =
+               subscribe_and_join(user_socket(creator_id), RiskChannel, "risks:" <> project_id, %{})
+
+      assert %{version: version, risk: %{snapshot: []}} = reply
+      assert {:ok, _, _} = DateTime.from_iso8601(version)
+      assert socket.assigns.project_id == project_id
+    end
+
+    test "rejects a user who may not access the project", %{project_id: project_id} do
+      assert {:error, %{reason: "unauthorized"}} =
+               subscribe_and_join(user_socket(Ecto.UUID.generate()), RiskChannel, "risks:" <> project_id, %{})
+    end
+
+    test "rejects a project that doesn't exist", %{creator_id: creator_id} do
+      assert {:error, %{reason: "unauthorized"}} =
+               subscribe_and_join(user_socket(creator_id), RiskChannel, "risks:" <> Ecto.UUID.generate(), %{})
+    end
+
+    test "rejects a malformed project id", %{creator_id: creator_id} do
+      assert {:error, %{reason: "invalid project"}} =
+               subscribe_and_join(user_socket(creator_id), RiskChannel, "risks:42", %{})
+    end
+  end
+end
@@ -0,0 +1,62 @@
+defmodule ResolvinatorWeb.UserChannelTest do
+  use ResolvinatorWeb.ChannelCase
+
+  alias Resolvinator.Messages
+  alias ResolvinatorWeb.{UserChannel, UserSocket}
+
+  setup do
+    me = Ecto.UUID.generate()
+    peer = Ecto.UUID.generate()
+
+    {:ok, _, socket} =
+      UserSocket
+      |> socket("user_socket:#{me}", %{user_id: me, client_version: "1.0.0"})
+      |> subscribe_and_join(UserChannel, "user:#{me}")
+
+    %{socket: socket, me: me, peer: peer}
+  end
+
+  defp send_message(from, to, content, encrypted) do
+    {:ok, message} =
+      Messages.create_message(%{from_user_id: from, to_user_id: to, content: content, encrypted: encrypted})
+
+    message
+  end
+
+  describe "history" do
+    test "replies with the conversation and each message's stored encrypted flag",
+         %{socket: socket, me: me, peer: peer} do
+      ciphertext = send_message(me, peer, "gAAAAAB-ciphertext", true)
+      plaintext = send_message(peer, me, "sent by the web client", false)
+
+      ref = push(socket, "history", %{"peer_id" => peer})
+      assert_reply ref, :ok, %{messages: messages}
+
+      entries = Map.new(messages, &{&1.id, &1})
+      assert map_size(entries) == 2
+      assert %{content: "gAAAAAB-ciphertext", from_user_id: ^me, encrypted: true} = entries[ciphertext.id]
+      assert %{content: "sent by the web client", from_user_id: ^peer, encrypted: false} = entries[plaintext.id]
+
+      assert Enum.all?(messages, &match?({:ok, _, _}, DateTime.from_iso8601(&1.created_at)))
+    end
+
+    test "pages with before and limit", %{socket: socket, me: me, peer: peer} do
+      for n <- 1..3, do: send_message(me, peer, "message #{n}", true)
+
+      ref = push(socket, "history", %{"peer_id" => peer, "limit" => 2})
+      assert_reply ref, :ok, %{messages: [oldest, _] = newest}
+
+      ref = push(socket, "history", %{"peer_id" => peer, "before" => oldest.id, "limit" => 2})
+      assert_reply ref, :ok, %{messages: [earlier]}
+
+      refute earlier.id in Enum.map(newest, & &1.id)
+    end
+
+    test "only returns the joined user's conversations", %{socket: socket, peer: peer} do
+      send_message(peer, Ecto.UUID.generate(), "not for this user", true)
+
+      ref = push(socket, "history", %{"peer_id" => peer})
+      assert_reply ref, :ok, %{messages: []}
+    end
+  end
+end
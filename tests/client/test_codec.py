@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+from resolvinator.client.codec import FrameValidator, available_decoders, get_decoder
+
+@pytest.fixture(params=available_decoders())
+def validator(request):
+    return FrameValidator(get_decoder(request.param), max_frame_size=128)
+
+def test_null_payload_is_accepted(validator):
+    message = validator.validate(json.dumps({"topic": "system", "event": "ping", "payload": None, "ref": None}))
+    assert message is not None and message.payload is None
+
+def test_missing_payload_is_rejected(validator):
+    assert validator.validate(json.dumps({"topic": "system", "event": "ping", "ref": None})) is None
+
+def test_size_limit_counts_bytes(validator):
+    frame = json.dumps({"topic": "t", "event": "e", "payload": "é" * 50}, ensure_ascii=False)
+    assert len(frame) <= 128 < len(frame.encode())
+    assert validator.validate(frame) is None
+    assert validator.validate(frame.replace("é", "e")) is not None
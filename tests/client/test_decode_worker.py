@@ -0,0 +1,62 @@
+import threading
+import time
+
+from resolvinator.client.decode_worker import DecodeWorker
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+def test_stop_finishes_submitted_frames():
+    worker = DecodeWorker(lambda frame: frame, lambda: None)
+    worker.start()
+    for i in range(100):
+        worker.submit(i)
+    worker.stop()
+    assert not worker.running
+    assert worker.take() == (list(range(100)), False)
+
+def test_stop_times_out_on_a_busy_thread():
+    release = threading.Event()
+
+    def decode(frame):
+        if frame == "slow":
+            release.wait()
+        return frame
+
+    worker = DecodeWorker(decode, lambda: None)
+    worker.start()
+    worker.submit("slow")
+    started = time.monotonic()
+    worker.stop(timeout=0.05)
+    assert time.monotonic() - started < 1
+    assert worker.running
+
+    release.set()
+    wait_for(lambda: not worker.running)
+    assert worker.take() == (["slow"], False)
+
+def test_start_cancels_a_pending_stop():
+    release = threading.Event()
+
+    def decode(frame):
+        if frame == "slow":
+            release.wait()
+        return frame
+
+    worker = DecodeWorker(decode, lambda: None, name="decoder-under-test")
+    worker.start()
+    worker.submit("slow")
+    worker.stop(timeout=0.05)
+    worker.start()
+    worker.submit("after")
+
+    release.set()
+    wait_for(lambda: worker.decoded == 2)
+    assert worker.running
+    assert [t.name for t in threading.enumerate()].count("decoder-under-test") == 1
+    assert worker.take() == (["slow", "after"], False)
+    worker.stop()
+    assert not worker.running
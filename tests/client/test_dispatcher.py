@@ -0,0 +1,44 @@
+from resolvinator.client.dispatcher import PriorityDispatcher
+from resolvinator.client.events import EventPriority
+
+def test_handler_that_posts_does_not_stall_the_dispatcher():
+    scheduled = []
+    dispatcher = PriorityDispatcher(scheduled.append)
+    delivered = []
+
+    def handler(n):
+        delivered.append(n)
+        if n == 1:
+            dispatcher.post(EventPriority.NORMAL, handler, 2)
+            # The drain that post() scheduled runs while this one is still going
+            scheduled.pop()()
+
+    dispatcher.post(EventPriority.NORMAL, handler, 1)
+    dispatcher.post(EventPriority.NORMAL, handler, 3)
+    scheduled.pop()()
+    while scheduled:
+        scheduled.pop()()
+
+    assert delivered == [1, 3, 2]
+    assert dispatcher.pending() == 0
+
+    dispatcher.post(EventPriority.LOW, handler, 4)
+    assert scheduled, "a post after the drain must schedule another"
+    scheduled.pop()()
+    assert delivered == [1, 3, 2, 4]
+
+def test_immediate_scheduler_with_reposting_handler():
+    dispatcher = PriorityDispatcher(lambda drain: drain())
+    delivered = []
+
+    def handler(n):
+        delivered.append(n)
+        if n == 1:
+            dispatcher.post(EventPriority.HIGH, handler, 2)
+
+    dispatcher.post(EventPriority.NORMAL, handler, 1)
+    dispatcher.post(EventPriority.NORMAL, handler, 3)
+    dispatcher.post(EventPriority.LOW, handler, 4)
+
+    assert sorted(delivered) == [1, 2, 3, 4]
+    assert dispatcher.pending() == 0
@@ -0,0 +1,36 @@
+import pytest
+
+from resolvinator.client.codec import PhoenixMessage, V1Serializer, V2Serializer, get_serializer
+
+FRAMINGS = [V1Serializer.vsn, V2Serializer.vsn]
+
+@pytest.fixture(scope="module")
+def qt_app():
+    QtCore = pytest.importorskip("PyQt6.QtCore")
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+@pytest.mark.parametrize("vsn", FRAMINGS)
+def test_qt_client_builds_with_each_framing(qt_app, vsn):
+    websocket_client3 = pytest.importorskip("resolvinator.client.websocket_client3")
+    client = websocket_client3.WebSocketClient("ws://localhost:4000", "token", vsn=vsn,
+                                               decode_in_background=False)
+    assert client.serializer.vsn == vsn
+
+@pytest.mark.parametrize("vsn", FRAMINGS)
+def test_asyncio_client_builds_with_each_framing(vsn):
+    websocket_client = pytest.importorskip("resolvinator.client.websocket_client")
+    from resolvinator.client.event_manager import EventManager
+    pytest.importorskip("PyQt6.QtCore")
+    client = websocket_client.WebSocketClient(EventManager(), "ws://localhost:4000/socket/websocket", vsn=vsn)
+    assert client.serializer.vsn == vsn
+
+@pytest.mark.parametrize("vsn", FRAMINGS)
+def test_unset_options_are_ignored(vsn):
+    serializer = get_serializer(vsn, compress_threshold=None)
+    message = PhoenixMessage("risks:1", "risk:updated", {"id": 1}, "2", "1")
+    assert serializer.decode(serializer.encode(message)) == message
+
+def test_compression_needs_v2():
+    assert get_serializer(V2Serializer.vsn, compress_threshold=1024).compress_threshold == 1024
+    with pytest.raises(ValueError, match="compress_threshold"):
+        get_serializer(V1Serializer.vsn, compress_threshold=1024)
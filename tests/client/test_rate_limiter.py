@@ -0,0 +1,35 @@
+from resolvinator.client.rate_limiter import MIN_SWEEP_SIZE, RateLimit, TopicRateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_idle_buckets_are_evicted():
+    clock = FakeClock()
+    limiter = TopicRateLimiter(default=RateLimit(rate=10.0, burst=5), clock=clock)
+    for i in range(MIN_SWEEP_SIZE):
+        assert limiter.allow(f"risks:{i}")
+
+    # Each bucket gave one token, which is back after 1 / rate seconds
+    clock.now = 0.1
+    assert limiter.allow("risks:new")
+    assert len(limiter._buckets) == 1
+    assert limiter.admitted == MIN_SWEEP_SIZE + 1
+
+def test_busy_buckets_are_kept():
+    clock = FakeClock()
+    limiter = TopicRateLimiter(default=RateLimit(rate=10.0, burst=5), clock=clock)
+    for _ in range(6):
+        limiter.allow("risks:busy")
+    for i in range(MIN_SWEEP_SIZE - 1):
+        limiter.allow(f"risks:{i}")
+
+    clock.now = 0.2
+    limiter.allow("risks:new")
+    # The drained bucket keeps its empty state and counters
+    assert set(limiter._buckets) == {"risks:busy", "risks:new"}
+    assert limiter.stats()["risks:busy"] == {"admitted": 5, "dropped": 1}
+    assert limiter.dropped == 1